@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Benchmarks of the parts of Escambo that don't need a display: response
+formatting, cookies, URL validation and the override store. Each case
+reports its median time and peak memory, compared with baseline.json.
+Network cases talk to an HTTP server running in this process.
+
+    python3 benchmarks/run.py                 # compare with the baseline
+    python3 benchmarks/run.py --save          # store a new baseline
+    python3 benchmarks/run.py -k cookie       # only matching cases
+"""
+
+import argparse
+import gettext
+import http.server
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+KB = 1024
+MB = 1024 * KB
+BODY_SIZES = [KB, 100 * KB, 10 * MB, 100 * MB]
+COOKIE_COUNT = 5000
+URL_COUNT = 10000
+OVERRIDE_COUNT = 50000
+
+# A case runs at least this many times, and until this many seconds
+MIN_RUNS = 3
+MAX_RUNS = 50
+MIN_SECONDS = 1.0
+# Slower or bigger than the baseline by more than this is a regression
+TOLERANCE = 0.25
+# Differences below these are noise, whatever the ratio
+TIME_FLOOR = 0.0005
+MEMORY_FLOOR = 64 * KB
+
+
+def import_escambo() -> None:
+    """Make src/ importable as the escambo package, as meson installs it"""
+    spec = importlib.util.spec_from_file_location(
+        "escambo",
+        os.path.join(ROOT, "src", "__init__.py"),
+        submodule_search_locations=[os.path.join(ROOT, "src")],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["escambo"] = module
+    spec.loader.exec_module(module)
+
+
+def json_body(size: int) -> bytes:
+    record = (
+        '{"id": %d, "name": "Escambo", "active": true, '
+        '"tags": ["http", "gtk"], "score": 12.5}'
+    )
+    parts, length, index = [], 1, 0
+    while length < size:
+        parts.append(record % index)
+        length += len(parts[-1]) + 2
+        index += 1
+    return ("[" + ", ".join(parts) + "]").encode()
+
+
+def html_body(size: int) -> bytes:
+    head, tail = "<html><body>", "</body></html>"
+    line = "<p class='row'>Escambo means exchange or barter.</p>\n"
+    count = max((size - len(head) - len(tail)) // len(line), 1)
+    return (head + line * count + tail).encode()
+
+
+class BodyServer(http.server.ThreadingHTTPServer):
+    """Serves /json/<size> and /html/<size> from memory"""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), BodyHandler)
+        self.bodies = {}
+
+    def add(self, kind: str, size: int) -> str:
+        make = json_body if kind == "json" else html_body
+        self.bodies[f"/{kind}/{size}"] = make(size)
+        return f"http://127.0.0.1:{self.server_port}/{kind}/{size}"
+
+
+class BodyHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    content_types = {"json": "application/json", "html": "text/html"}
+
+    def do_GET(self) -> None:
+        body = self.server.bodies.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        kind = self.path.split("/")[1]
+        self.send_response(200)
+        self.send_header(
+            "Content-Type", f"{self.content_types[kind]}; charset=utf-8"
+        )
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def format_size(size: int) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+
+
+def response_cases(server: BodyServer, sizes: list) -> list:
+    transport = None
+
+    def case(kind: str, size: int):
+        from escambo.response_body import ResponseBody
+        from escambo.restapi import ResolveRequests
+        from escambo.transport import Transport
+
+        nonlocal transport
+        transport = transport or Transport()
+        url = server.add(kind, size)
+
+        def run() -> None:
+            body = ResolveRequests(
+                url, transport.request_session()
+            ).resolve_get()[0]
+            if isinstance(body, ResponseBody):
+                body.close()
+
+        return run
+
+    return [
+        (
+            f"formatted_response {kind} {format_size(size)}",
+            lambda kind=kind, size=size: case(kind, size),
+        )
+        for kind in ["json", "html"]
+        for size in sizes
+    ]
+
+
+def saved_cookies() -> dict:
+    return {
+        f"cookie-{index}": [
+            f"Cookie {index}",
+            f"name{index}=value{index}; "
+            "Expires=Wed, 21 Oct 2099 07:28:00 GMT; "
+            f"Domain={'api.' if index % 2 else ''}example.com; "
+            f"Path=/{'v1' if index % 3 else ''}",
+        ]
+        for index in range(COOKIE_COUNT)
+    }
+
+
+def cookie_cases() -> list:
+    def parse():
+        from escambo.common_scripts import str_to_dict_cookie
+
+        cookies = saved_cookies()
+
+        def run() -> None:
+            for cookie in cookies.values():
+                str_to_dict_cookie(cookie)
+
+        return run
+
+    def load():
+        from escambo.cookie_jar import CookieJar
+
+        cookies = saved_cookies()
+        return lambda: CookieJar().load(cookies)
+
+    def matching():
+        from escambo.cookie_jar import CookieJar
+
+        jar = CookieJar()
+        jar.load(saved_cookies())
+        return lambda: jar.matching("https://api.example.com/v1/items")
+
+    return [
+        (f"str_to_dict_cookie x{COOKIE_COUNT}", parse),
+        (f"CookieJar.load x{COOKIE_COUNT}", load),
+        (f"CookieJar.matching of {COOKIE_COUNT}", matching),
+    ]
+
+
+def url_cases() -> list:
+    def validate():
+        from escambo.common_scripts import is_valid_url
+
+        count = URL_COUNT // 4
+        urls = [
+            f"https://api{index}.example.com:8080/v1/items/{index}?page=1"
+            for index in range(count)
+        ]
+        urls += [f"http://192.168.0.{index % 256}/" for index in range(count)]
+        urls += [f"localhost:{index}/path" for index in range(count)]
+        urls += [f"not a url {index}" for index in range(count)]
+
+        def run() -> None:
+            for url in urls:
+                is_valid_url(url)
+
+        return run
+
+    def long_host():
+        from escambo.common_scripts import is_valid_url
+
+        url = "https://" + "a." * 10000 + "c"
+        return lambda: is_valid_url(url)
+
+    return [
+        (f"is_valid_url x{URL_COUNT}", validate),
+        ("is_valid_url 20 KB host", long_host),
+    ]
+
+
+def override_cases(directory: str) -> list:
+    store = None
+    records = [
+        ("headers", f"Header-{index}", f"value {index}")
+        for index in range(OVERRIDE_COUNT)
+    ]
+
+    def filled_store():
+        from escambo.storage import WriteBehindStore
+
+        nonlocal store
+        if not store:
+            store = WriteBehindStore(os.path.join(directory, "overrides.db"))
+            store.put_many(records)
+            store.flush()
+        return store
+
+    def write_all():
+        store = filled_store()
+
+        def run() -> None:
+            store.put_many(records)
+            store.flush()
+
+        return run
+
+    def load():
+        store = filled_store()
+        return lambda: store.load("headers")
+
+    def edit_one():
+        store = filled_store()
+        edits = iter(range(sys.maxsize))
+
+        def run() -> None:
+            store.put("body", "key", f"value {next(edits)}")
+            store.flush()
+
+        return run
+
+    return [
+        (f"overrides write x{OVERRIDE_COUNT}", write_all),
+        (f"overrides load of {OVERRIDE_COUNT}", load),
+        (f"overrides single edit of {OVERRIDE_COUNT}", edit_one),
+    ]
+
+
+def measure(run) -> dict:
+    """Median time of several runs, then the peak memory of one more"""
+    times = []
+    started = time.perf_counter()
+    while len(times) < MIN_RUNS or (
+        len(times) < MAX_RUNS and time.perf_counter() - started < MIN_SECONDS
+    ):
+        before = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - before)
+
+    # Tracing slows everything down, so it is kept out of the timed runs
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "time": statistics.median(times),
+        "peak": peak,
+        "runs": len(times),
+    }
+
+
+def regressed(result: dict, baseline: dict, tolerance: float) -> list:
+    """Which of time and peak got worse than the baseline allows"""
+    worse = []
+    for key, floor in [("time", TIME_FLOOR), ("peak", MEMORY_FLOOR)]:
+        if key not in baseline:
+            continue
+        limit = max(baseline[key] * (1 + tolerance), baseline[key] + floor)
+        if result[key] > limit:
+            worse.append(key)
+    return worse
+
+
+def change(value: float, base: float | None) -> str:
+    if not base:
+        return ""
+    return f"{(value - base) / base:+.0%}"
+
+
+def parse_arguments(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "-k", "--keyword", default="", help="only run cases containing this"
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="store the results as baseline"
+    )
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=TOLERANCE,
+        help="allowed slowdown, 0.25 is 25%%",
+    )
+    parser.add_argument(
+        "--max-size",
+        type=int,
+        default=BODY_SIZES[-1],
+        help="largest response body in bytes",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list) -> int:
+    arguments = parse_arguments(argv)
+    gettext.install("escambo")
+    import_escambo()
+
+    baseline = {}
+    if os.path.exists(arguments.baseline):
+        with open(arguments.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    server = BodyServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    directory = tempfile.TemporaryDirectory()
+
+    cases = []
+    for group in [
+        lambda: response_cases(
+            server,
+            [size for size in BODY_SIZES if size <= arguments.max_size],
+        ),
+        cookie_cases,
+        url_cases,
+        lambda: override_cases(directory.name),
+    ]:
+        cases += group()
+
+    results, regressions = {}, []
+    print(
+        f"{'case':<44} {'time':>10} {'change':>7} {'peak':>10} {'change':>7}"
+    )
+    for name, make in cases:
+        if arguments.keyword.lower() not in name.lower():
+            continue
+        result = results[name] = measure(make())
+        base = baseline.get(name, {})
+        worse = regressed(result, base, arguments.tolerance)
+        if worse:
+            regressions.append(name)
+        print(
+            f"{name:<44} "
+            f"{result['time'] * 1000:>8.2f}ms "
+            f"{change(result['time'], base.get('time')):>7} "
+            f"{format_size(result['peak']):>10} "
+            f"{change(result['peak'], base.get('peak')):>7}"
+            + (f"  REGRESSION ({', '.join(worse)})" if worse else "")
+        )
+
+    server.shutdown()
+    directory.cleanup()
+
+    if arguments.save:
+        baseline.update(results)
+        with open(arguments.baseline, "w") as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        print(f"Baseline saved to {arguments.baseline}")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) against the baseline")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
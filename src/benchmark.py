@@ -0,0 +1,92 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+HISTOGRAM_BINS = 10
+HISTOGRAM_WIDTH = 24
+
+
+def percentile(values: list, rank: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    position = max(math.ceil(rank / 100 * len(values)) - 1, 0)
+    return values[position]
+
+
+def histogram(values: list, bins: int = HISTOGRAM_BINS) -> list:
+    """Return (lower bound, count) pairs of an already sorted list"""
+    if not values:
+        return []
+    low, high = values[0], values[-1]
+    width = (high - low) / bins or 1
+    counts = [0] * bins
+    for value in values:
+        counts[min(int((value - low) / width), bins - 1)] += 1
+    return [(low + width * index, count) for index, count in enumerate(counts)]
+
+
+def format_histogram(bars: list) -> str:
+    peak = max((count for bound, count in bars), default=0) or 1
+    return "\n".join(
+        f"{bound * 1000:>9.1f} ms "
+        f"{'█' * round(count / peak * HISTOGRAM_WIDTH):<{HISTOGRAM_WIDTH}} "
+        f"{count}"
+        for bound, count in bars
+    )
+
+
+def run_benchmark(
+    send: Callable[[], bool],
+    total: int,
+    concurrency: int,
+    stop_event: threading.Event,
+) -> dict:
+    """
+    Call send total times from concurrency threads and summarize the
+    latencies. send returns whether the response was successful, any
+    exception it raises counts as an error.
+    """
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def worker() -> None:
+        nonlocal errors
+        if stop_event.is_set():
+            return
+
+        started = time.perf_counter()
+        try:
+            succeeded = send()
+        except Exception:
+            succeeded = False
+        elapsed = time.perf_counter() - started
+
+        with lock:
+            latencies.append(elapsed)
+            errors += not succeeded
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _each in range(total):
+            executor.submit(worker)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "completed": len(latencies),
+        "errors": errors,
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p99": percentile(latencies, 99),
+        "max": latencies[-1] if latencies else 0.0,
+        "histogram": histogram(latencies),
+    }
@@ -0,0 +1,300 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import requests
+from escambo.transport import Timings, body_errors
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Same directory as GLib.get_user_cache_dir(), without importing GLib
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME")
+    or os.path.join(os.path.expanduser("~"), ".cache"),
+    "escambo",
+    "responses",
+)
+
+# The stored body is already decoded, so these no longer describe it
+DROPPED_HEADERS = ["content-encoding", "content-length", "transfer-encoding"]
+
+
+class CacheEntry:
+    def __init__(self, cache, key, status, headers, vary, expires) -> None:
+        self.cache = cache
+        self.key = key
+        self.status = status
+        self.headers = CaseInsensitiveDict(headers)
+        self.vary = vary
+        self.expires = expires
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires
+
+    def to_response(
+        self, request: requests.PreparedRequest
+    ) -> requests.models.Response | None:
+        """
+        Build a response whose body is read from the cached file. None
+        when the file is gone, the entry is then forgotten.
+        """
+        try:
+            file = open(self.cache.path_of(self.key), "rb")
+        except FileNotFoundError:
+            self.cache.forget(self.key)
+            return None
+
+        response = requests.models.Response()
+        response.status_code = self.status
+        response.headers = self.headers
+        response.encoding = get_encoding_from_headers(self.headers)
+        response.raw = _CachedBody(file)
+        response.url = request.url
+        response.request = request
+        response.timings = Timings()
+        return response
+
+
+class _CachedBody:
+    """File-backed stand-in for the urllib3 response of a cache hit"""
+
+    def __init__(self, file) -> None:
+        self._file = file
+
+    def read(self, amt: int = None, **kwargs) -> bytes:
+        with body_errors():
+            return self._file.read(amt)
+
+    def tell(self) -> int:
+        # Nothing came from the network
+        return 0
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _CachingBody:
+    """
+    Mirror everything read from the network into a cache file. Errors
+    are raised as requests exceptions, as iter_content would.
+    """
+
+    def __init__(self, raw, directory: str, on_complete) -> None:
+        self._raw = raw
+        self._on_complete = on_complete
+        self._file = tempfile.NamedTemporaryFile(dir=directory, delete=False)
+
+    def read(self, amt: int = None, **kwargs) -> bytes:
+        with body_errors():
+            data = self._raw.read(amt, decode_content=True)
+        if data:
+            self._file.write(data)
+        elif not self._file.closed:
+            self._file.close()
+            self._on_complete(self._file.name)
+        return data
+
+    def tell(self) -> int:
+        return self._raw.tell()
+
+    def release_conn(self) -> None:
+        self._raw.release_conn()
+
+    def close(self) -> None:
+        self._raw.close()
+        # The body was abandoned halfway, it can't be cached
+        if not self._file.closed:
+            self._file.close()
+            os.unlink(self._file.name)
+
+
+class ResponseCache:
+    """
+    On-disk cache of GET responses, revalidated with ETag and
+    Last-Modified and evicted least recently used first.
+    """
+
+    def __init__(self, max_size: int, directory: str = CACHE_DIR) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            os.path.join(directory, "index.db"), check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " status INTEGER NOT NULL,"
+                " headers TEXT NOT NULL,"
+                " vary TEXT NOT NULL,"
+                " expires REAL NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+
+    def path_of(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def key_of(self, request: requests.PreparedRequest) -> str:
+        return hashlib.sha256(
+            f"{request.method} {request.url}".encode()
+        ).hexdigest()
+
+    def lookup(self, request: requests.PreparedRequest) -> CacheEntry | None:
+        key = self.key_of(request)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status, headers, vary, expires FROM entries "
+                "WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if not row:
+                return None
+
+            status, headers, vary, expires = row
+            vary = json.loads(vary)
+            # A different variant of the resource was stored
+            if any(
+                request.headers.get(name) != value
+                for name, value in vary.items()
+            ):
+                return None
+
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE entries SET accessed = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+
+        return CacheEntry(
+            self, key, status, json.loads(headers), vary, expires
+        )
+
+    def forget(self, key: str) -> None:
+        """Drop an entry whose file went missing"""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM entries WHERE key = ?", (key,)
+            )
+
+    def revalidate(
+        self, request: requests.PreparedRequest, entry: CacheEntry
+    ) -> None:
+        """Make the request conditional on the cached validators"""
+        if "etag" in entry.headers:
+            request.headers["If-None-Match"] = entry.headers["etag"]
+        if "last-modified" in entry.headers:
+            request.headers["If-Modified-Since"] = entry.headers[
+                "last-modified"
+            ]
+
+    def refresh(
+        self, entry: CacheEntry, response: requests.models.Response
+    ) -> None:
+        """Extend the lifetime of an entry after a 304 Not Modified"""
+        entry.expires = self.__expires_of(response.headers)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE entries SET expires = ? WHERE key = ?",
+                (entry.expires, entry.key),
+            )
+
+    def store(
+        self,
+        request: requests.PreparedRequest,
+        response: requests.models.Response,
+    ) -> bool:
+        """
+        Tee the body of a cacheable response into the cache while it is
+        read. Return whether the response will be cached.
+        """
+        cache_control = response.headers.get("cache-control", "").lower()
+        if (
+            response.status_code != 200
+            or "no-store" in cache_control
+            or not (
+                "etag" in response.headers
+                or "last-modified" in response.headers
+                or "max-age" in cache_control
+            )
+        ):
+            return False
+
+        key = self.key_of(request)
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in DROPPED_HEADERS
+        }
+        vary = {
+            name.strip(): request.headers.get(name.strip())
+            for name in response.headers.get("vary", "").split(",")
+            if name.strip() and name.strip() != "*"
+        }
+        expires = self.__expires_of(response.headers)
+
+        def on_complete(path: str) -> None:
+            os.replace(path, self.path_of(key))
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO entries VALUES "
+                    "(?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        response.status_code,
+                        json.dumps(headers),
+                        json.dumps(vary),
+                        expires,
+                        os.path.getsize(self.path_of(key)),
+                        time.time(),
+                    ),
+                )
+            self.__evict()
+
+        response.raw = _CachingBody(response.raw, self.directory, on_complete)
+        return True
+
+    def __expires_of(self, headers: CaseInsensitiveDict) -> float:
+        for directive in headers.get("cache-control", "").lower().split(","):
+            name, _sep, value = directive.strip().partition("=")
+            if name == "no-cache":
+                return 0.0
+            if name == "max-age" and value.isdigit():
+                return time.time() + int(value)
+        return 0.0
+
+    def __evict(self) -> None:
+        """Drop least recently used entries until under max_size"""
+        with self._lock, self._connection:
+            total = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()[0]
+            rows = self._connection.execute(
+                "SELECT key, size FROM entries ORDER BY accessed"
+            ).fetchall()
+            evicted = []
+            for key, size in rows:
+                if total <= self.max_size:
+                    break
+                evicted.append((key,))
+                total -= size
+            self._connection.executemany(
+                "DELETE FROM entries WHERE key = ?", evicted
+            )
+
+        for (key,) in evicted:
+            try:
+                os.unlink(self.path_of(key))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,63 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import socket
+import threading
+
+
+class Cancelled(Exception):
+    """The send was cancelled before it could finish"""
+
+
+class Cancellation:
+    """
+    Lets another thread abort a send. The sockets the send is using are
+    shut down, so a read blocked on a hung server returns at once and
+    the worker thread can finish.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._connections = set()
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def attach(self, connection) -> None:
+        """Called by the connection before a request is written to it"""
+        with self._lock:
+            self._connections.add(connection)
+
+    def detach(self, connection) -> None:
+        """Called once the connection's response is released or closed"""
+        with self._lock:
+            self._connections.discard(connection)
+
+    def release(self) -> None:
+        """The send is over, its connections may now serve other sends"""
+        with self._lock:
+            self._connections.clear()
+
+    def cancel(self) -> None:
+        self._event.set()
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for connection in connections:
+            sock = getattr(connection, "sock", None)
+            if sock is None:
+                continue
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def wait(self, seconds: float) -> None:
+        """Sleep, raising Cancelled as soon as the send is cancelled"""
+        self._event.wait(seconds)
+        self.check()
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise Cancelled(_("Cancelled"))
@@ -0,0 +1,321 @@
+# cli.py
+#
+# Copyright 2023 Cleo Menezes Jr.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Headless runner sharing ResolveRequests and the saved overrides with
+the application. Nothing here may import GTK: it has to start fast
+and work without a display.
+"""
+
+import argparse
+import json
+import sys
+
+METHODS = ["get", "post", "put", "patch", "delete"]
+AUTH_TYPES = {"api-key": "Api Key", "bearer-token": "Bearer Token"}
+
+
+def parse_arguments(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="escambo-cli",
+        description=_("Send HTTP requests using Escambo's saved overrides."),
+    )
+    parser.add_argument("urls", nargs="*", metavar="URL")
+    parser.add_argument(
+        "-X", "--method", default="get", choices=METHODS, type=str.lower
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        help=_("read one request per line, as “[METHOD] URL”"),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=4,
+        help=_("number of requests sent in parallel"),
+    )
+    parser.add_argument("-d", "--data", help=_("JSON body"))
+    parser.add_argument(
+        "--headers", action="store_true", help=_("send the saved headers")
+    )
+    parser.add_argument(
+        "--cookies", action="store_true", help=_("send the saved cookies")
+    )
+    parser.add_argument(
+        "--params", action="store_true", help=_("send the saved parameters")
+    )
+    parser.add_argument(
+        "--body", action="store_true", help=_("send the saved form body")
+    )
+    parser.add_argument(
+        "--auth",
+        choices=AUTH_TYPES,
+        help=_("send the saved authorization of this type"),
+    )
+    parser.add_argument(
+        "--upload", metavar="FILE", help=_("stream a file as the body")
+    )
+    parser.add_argument(
+        "--upload-mode",
+        default="raw",
+        choices=["raw", "chunked", "multipart"],
+        help=_("how the file is sent"),
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help=_("negotiate HTTP/2 for https:// URLs"),
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=10.0,
+        metavar="SECONDS",
+        help=_("give up when connecting takes longer than this"),
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=30.0,
+        metavar="SECONDS",
+        help=_("give up when the server sends nothing for this long"),
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=1,
+        metavar="ATTEMPTS",
+        help=_("send up to this many times on errors and retried statuses"),
+    )
+    parser.add_argument(
+        "--retry-on",
+        default="429,502,503,504",
+        metavar="STATUSES",
+        help=_("comma separated status codes that are retried"),
+    )
+    parser.add_argument(
+        "--backoff",
+        type=float,
+        default=0.5,
+        help=_("seconds before the first retry, doubled after each one"),
+    )
+    parser.add_argument(
+        "--hedge",
+        type=float,
+        default=0,
+        metavar="PERCENTILE",
+        help=_("send a second request past this latency percentile"),
+    )
+    parser.add_argument(
+        "--compress",
+        choices=["gzip", "deflate", "zstd"],
+        help=_("compress the request body with this Content-Encoding"),
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help=_("write where the time went, as a Chrome trace or .jsonl"),
+    )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help=_("print only status and timing"),
+    )
+    return parser.parse_args(argv)
+
+
+def read_requests(arguments: argparse.Namespace) -> list:
+    """Return (method, url) pairs from the command line and --file"""
+    pending = [(arguments.method, url) for url in arguments.urls]
+    if arguments.file:
+        with open(arguments.file) as file:
+            for line in file:
+                words = line.split()
+                if not words or words[0].startswith("#"):
+                    continue
+                if len(words) > 1 and words[0].lower() in METHODS:
+                    pending.append((words[0].lower(), words[1]))
+                else:
+                    pending.append((arguments.method, words[0]))
+    return pending
+
+
+def request_arguments(arguments: argparse.Namespace) -> dict:
+    """Keyword arguments of ResolveRequests, as the window builds them"""
+    from escambo.cookie_jar import CookieJar
+    from escambo.retry import RetryPolicy, parse_statuses
+    from escambo.upload import FileUpload
+    from escambo.storage import (
+        AUTHS,
+        BODY,
+        COOKIES,
+        HEADERS,
+        PARAM,
+        OverrideStore,
+    )
+
+    store = OverrideStore()
+    cookie_jar = None
+    if arguments.cookies:
+        cookie_jar = CookieJar()
+        cookie_jar.load(store.load(COOKIES))
+
+    body = None
+    if arguments.data:
+        body = json.loads(arguments.data)
+    elif arguments.body:
+        body = {value[0]: value[1] for value in store.load(BODY).values()}
+
+    result = {
+        "cookies": cookie_jar,
+        "headers": arguments.headers
+        and {value[0]: value[1] for value in store.load(HEADERS).values()},
+        "body": body,
+        "parameters": store.load(PARAM) if arguments.params else {},
+        "authorization": arguments.auth
+        and [AUTH_TYPES[arguments.auth], store.load(AUTHS)],
+        "compression": arguments.compress,
+        "upload": arguments.upload
+        and FileUpload(arguments.upload, arguments.upload_mode),
+        "retry": (arguments.retries > 1 or arguments.hedge > 0)
+        and RetryPolicy(
+            arguments.retries,
+            parse_statuses(arguments.retry_on),
+            arguments.backoff,
+            arguments.hedge,
+        ),
+        "timeout": (arguments.connect_timeout, arguments.read_timeout),
+    }
+    store.close()
+    return result
+
+
+def send(transport, method: str, url: str, arguments: dict) -> tuple:
+    """Send one request and return (url, summary, body)"""
+    from escambo.cancellation import Cancelled
+    from escambo.restapi import ResolveRequests
+    from escambo.retry import describe_attempts
+    from escambo.tracing import tracer
+    from requests import exceptions
+
+    resolve_requests = ResolveRequests(
+        url,
+        transport.request_session(),
+        **arguments | {"parameters": dict(arguments["parameters"])},
+    )
+    try:
+        with tracer.span("send", method=method, url=url):
+            body, status, _code_type = getattr(
+                resolve_requests, f"resolve_{method}"
+            )()
+    except (
+        exceptions.RequestException,
+        ValueError,
+        # The file to upload went missing, or the send was cancelled
+        OSError,
+        Cancelled,
+    ) as error:
+        return url, f"{method.upper()} {url}: {error}", None
+
+    timings = resolve_requests.timings
+    phases = [
+        f"{name} {duration * 1000:.1f} ms"
+        for name, duration in timings.phases()
+    ]
+    sizes = [f"{timings.received} B"]
+    if timings.content_encoding:
+        sizes.append(
+            f"{timings.decoded} B {timings.content_encoding}"
+            f" {timings.decompress * 1000:.1f} ms"
+        )
+    summary = " · ".join(
+        [f"{method.upper()} {url}", status, timings.protocol, *phases, *sizes]
+    )
+    if len(resolve_requests.attempts) > 1:
+        summary += f" · {describe_attempts(resolve_requests.attempts)}"
+    return url, summary, body
+
+
+def write_body(body) -> None:
+    """Print a body, one page at a time when it was spilled to disk"""
+    from escambo.response_body import ResponseBody
+
+    if isinstance(body, ResponseBody):
+        for index in range(body.page_count):
+            sys.stdout.write(body.page(index))
+        body.close()
+    else:
+        sys.stdout.write(body)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+def main(argv: list = None) -> int:
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+    pending = read_requests(arguments)
+    if not pending:
+        print(_("Nothing to send"), file=sys.stderr)
+        return 2
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    from escambo.common_scripts import is_valid_url
+    from escambo.transport import Transport
+
+    invalid = [url for method, url in pending if not is_valid_url(url)]
+    if invalid:
+        for url in invalid:
+            print(_("Invalid URL: {url}").format(url=url), file=sys.stderr)
+        return 2
+
+    try:
+        shared_arguments = request_arguments(arguments)
+    except ValueError:
+        print(_("Body must be in JSON format"), file=sys.stderr)
+        return 2
+    except OSError as error:
+        print(error, file=sys.stderr)
+        return 2
+    try:
+        transport = Transport(max(arguments.jobs, 1), arguments.http2)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    if arguments.trace:
+        from escambo import tracing
+
+        tracing.export_to(arguments.trace)
+
+    failed = False
+    with ThreadPoolExecutor(max_workers=max(arguments.jobs, 1)) as executor:
+        results = executor.map(
+            lambda each: send(transport, *each, shared_arguments), pending
+        )
+        for url, summary, body in results:
+            failed = failed or body is None
+            print(summary, file=sys.stderr)
+            if body is not None and not arguments.quiet:
+                write_body(body)
+    transport.close()
+    if arguments.trace:
+        tracing.tracer.close()
+    return 1 if failed else 0
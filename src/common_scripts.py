@@ -4,17 +4,19 @@
 import re
 
 
+URL_REGEX = re.compile(
+    r"^(?:http|ftp)s?://"
+    r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|"
+    r"localhost|"
+    r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"
+    r"(?::\d+)?"
+    r"(?:/?|[/?]\S+)$",
+    re.IGNORECASE,
+)
+
+
 def is_valid_url(url: str) -> bool:
-    regex = re.compile(
-        r"^(?:http|ftp)s?://"
-        r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|"
-        r"localhost|"
-        r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"
-        r"(?::\d+)?"
-        r"(?:/?|[/?]\S+)$",
-        re.IGNORECASE,
-    )
-    return re.match(regex, url)
+    return URL_REGEX.match(url)
 
 
 def has_parameter(url: str) -> bool:
@@ -47,15 +49,15 @@ def str_to_dict_cookie(cookies: str, id: str = None) -> dict:
 
     dict_cookie = {}
 
-    for i in splited_content:
-        splited_values = i.split("=")
-        if splited_content.index(i) == 0:
-            dict_cookie["name"] = splited_values[0]
-            dict_cookie["value"] = splited_values[1]
+    for position, i in enumerate(splited_content):
+        key, _sep, value = i.partition("=")
+        if position == 0:
+            dict_cookie["name"] = key
+            dict_cookie["value"] = value
         else:
             if i.strip() != "":
-                formatted_key = splited_values[0].strip().lower()
-                formatted_value = splited_values[1].strip().lower()
+                formatted_key = key.strip().lower()
+                formatted_value = value.strip().lower()
                 match formatted_key:
                     case "expires":
                         dict_cookie[formatted_key] = formatted_value
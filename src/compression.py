@@ -0,0 +1,158 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import time
+import zlib
+
+import requests
+from escambo.events import read_available
+from escambo.transport import body_errors
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# What the decoders raise on data that isn't what Content-Encoding says
+DECODE_ERRORS = (zlib.error,) + ((zstandard.ZstdError,) if zstandard else ())
+
+# Content-Encoding values a request body can be sent with
+ENCODINGS = ["gzip", "deflate", "zstd"]
+
+
+def compressor(encoding: str):
+    """Streaming encoder with compress() and flush()"""
+    match encoding:
+        case "gzip":
+            return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        case "deflate":
+            return zlib.compressobj(6)
+        case "zstd" if zstandard:
+            return zstandard.ZstdCompressor().compressobj()
+        case "zstd":
+            raise ValueError(_("zstd needs the zstandard module"))
+    raise ValueError(encoding)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    encoder = compressor(encoding)
+    return encoder.compress(data) + encoder.flush()
+
+
+class CompressedStream:
+    """
+    Compress a streamed body chunk by chunk. Its final length is not
+    known up front, so it is sent with Transfer-Encoding: chunked.
+    """
+
+    def __init__(self, chunks, encoding: str) -> None:
+        self.chunks = chunks
+        self.encoder = compressor(encoding)
+        self.encoded = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            data = self.encoder.compress(chunk)
+            if data:
+                self.encoded += len(data)
+                yield data
+        data = self.encoder.flush()
+        self.encoded += len(data)
+        yield data
+
+
+def decompressor(encoding: str):
+    """Streaming decoder of a Content-Encoding, None if not handled"""
+    match encoding:
+        case "gzip" | "x-gzip":
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+        case "deflate":
+            return _DeflateDecoder()
+        case "zstd" if zstandard:
+            return zstandard.ZstdDecompressor().decompressobj()
+    return None
+
+
+class _DeflateDecoder:
+    """Servers send deflate both with and without the zlib header"""
+
+    def __init__(self) -> None:
+        self._decoder = zlib.decompressobj()
+        self._first = b""
+
+    def decompress(self, data: bytes) -> bytes:
+        if self._first is None:
+            return self._decoder.decompress(data)
+
+        self._first += data
+        try:
+            decoded = self._decoder.decompress(data)
+        except zlib.error:
+            self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            data, self._first = self._first, None
+            return self._decoder.decompress(data)
+        if decoded:
+            self._first = None
+        return decoded
+
+    def flush(self) -> bytes:
+        return self._decoder.flush()
+
+
+class DecodingBody:
+    """
+    Stand-in for the urllib3 response that reads the encoded bytes and
+    decodes them chunk by chunk, timing the decoder as it goes. Errors
+    are raised as requests exceptions, as iter_content would.
+    """
+
+    def __init__(self, raw, decoder, timings) -> None:
+        self._raw = raw
+        self._decoder = decoder
+        self._timings = timings
+        self._done = False
+
+    def read(self, amt: int = None, **kwargs) -> bytes:
+        return self.__decode(
+            lambda: self._raw.read(amt, decode_content=False)
+        )
+
+    def read1(self, amt: int = -1) -> bytes:
+        """Decode whatever part of the body already arrived"""
+        return self.__decode(lambda: read_available(self._raw, amt))
+
+    def __decode(self, read) -> bytes:
+        while not self._done:
+            with body_errors():
+                chunk = read()
+            started = time.perf_counter()
+            try:
+                if chunk:
+                    data = self._decoder.decompress(chunk)
+                else:
+                    data = self._decoder.flush()
+                    self._done = True
+            except DECODE_ERRORS as error:
+                raise requests.exceptions.ContentDecodingError(error)
+            self._timings.decompress += time.perf_counter() - started
+            if data:
+                return data
+        return b""
+
+    def tell(self) -> int:
+        return self._raw.tell()
+
+    def release_conn(self) -> None:
+        self._raw.release_conn()
+
+    def close(self) -> None:
+        self._raw.close()
+
+
+def decode_body(response) -> None:
+    """Let the response body be decoded by DecodingBody, when possible"""
+    encoding = response.headers.get("content-encoding", "").strip().lower()
+    decoder = decompressor(encoding)
+    if decoder:
+        response.raw = DecodingBody(response.raw, decoder, response.timings)
+        response.timings.content_encoding = encoding
@@ -0,0 +1,105 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import email.utils
+import threading
+import time
+from urllib.parse import urlsplit
+
+from escambo.common_scripts import str_to_dict_cookie
+
+
+class Cookie:
+    def __init__(self, id: str, content: dict) -> None:
+        self.id = id
+        self.name = content["name"]
+        self.value = content["value"]
+        self.domain = content.get("domain", "").lstrip(".")
+        self.path = content.get("path") or "/"
+        self.expires = None
+        if "expires" in content:
+            try:
+                self.expires = email.utils.parsedate_to_datetime(
+                    content["expires"]
+                ).timestamp()
+            except (TypeError, ValueError):
+                pass
+
+    @property
+    def expired(self) -> bool:
+        return self.expires is not None and self.expires <= time.time()
+
+    def matches_path(self, path: str) -> bool:
+        return path == self.path or path.startswith(
+            self.path if self.path.endswith("/") else f"{self.path}/"
+        )
+
+
+class CookieJar:
+    """
+    Saved cookies parsed once and indexed by domain, so a send only
+    looks at the cookies of the host it goes to. Expired cookies are
+    dropped the first time they are looked at.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._domains = {}
+        self._ids = {}
+        self._expired = []
+
+    def load(self, overrides: dict) -> None:
+        with self._lock:
+            self._domains.clear()
+            self._ids.clear()
+        for id, cookie in overrides.items():
+            self.add(id, cookie)
+
+    def add(self, id: str, cookie: list) -> None:
+        """Index a saved cookie, as [title, cookie string]"""
+        self.remove(id)
+        parsed = Cookie(id, str_to_dict_cookie(cookie))
+        with self._lock:
+            self._domains.setdefault(parsed.domain, {})[id] = parsed
+            self._ids[id] = parsed
+
+    def remove(self, id: str) -> None:
+        with self._lock:
+            cookie = self._ids.pop(id, None)
+            if cookie:
+                del self._domains[cookie.domain][id]
+
+    def find(self, domain: str, path: str, name: str) -> str | None:
+        """Id of the saved cookie with this domain, path and name"""
+        with self._lock:
+            for cookie in self._domains.get(domain.lstrip("."), {}).values():
+                if cookie.path == (path or "/") and cookie.name == name:
+                    return cookie.id
+
+    def matching(self, url: str) -> dict:
+        """Every live cookie that applies to url, by name"""
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        path = parts.path or "/"
+
+        # The host, each parent domain and cookies without a domain
+        labels = host.split(".")
+        domains = [".".join(labels[i:]) for i in range(len(labels))] + [""]
+
+        matched = {}
+        with self._lock:
+            for domain in domains:
+                for cookie in list(self._domains.get(domain, {}).values()):
+                    if cookie.expired:
+                        del self._domains[domain][cookie.id]
+                        del self._ids[cookie.id]
+                        self._expired.append(cookie.id)
+                    elif cookie.matches_path(path):
+                        matched.setdefault(cookie.name, cookie)
+        return matched
+
+    def pop_expired(self) -> list:
+        """Ids of the cookies dropped since the last call"""
+        with self._lock:
+            expired, self._expired = self._expired, []
+        return expired
@@ -0,0 +1,123 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import threading
+
+from escambo.benchmark import format_histogram, run_benchmark
+from escambo.cancellation import Cancellation
+from escambo.restapi import ResolveRequests
+from escambo.transport import Transport
+from gi.repository import Adw, GLib, Gtk
+
+
+@Gtk.Template(
+    resource_path="/io/github/cleomenezesjr/Escambo/gtk/dialog-benchmark.ui"
+)
+class BenchmarkDialog(Adw.Window):
+    __gtype_name__ = "BenchmarkDialog"
+
+    # Region Widgets
+    btn_run = Gtk.Template.Child()
+    spinner = Gtk.Template.Child()
+    spin_total = Gtk.Template.Child()
+    spin_concurrency = Gtk.Template.Child()
+    group_results = Gtk.Template.Child()
+    row_throughput = Gtk.Template.Child()
+    row_errors = Gtk.Template.Child()
+    row_latency = Gtk.Template.Child()
+    label_histogram = Gtk.Template.Child()
+
+    def __init__(self, parent_window, method, url, arguments, **kwargs):
+        super().__init__(**kwargs)
+        self.set_transient_for(parent_window)
+        self.set_title(_("Benchmark"))
+
+        # Common variables and references
+        self.window = parent_window
+        self.method = method
+        self.url = url
+        self.arguments = arguments
+        self.stop_event = threading.Event()
+        # Sends in flight, aborted when the dialog is closed
+        self.cancellations = set()
+        self.cancellations_lock = threading.Lock()
+
+        self.connect("close-request", self.__on_close)
+
+    @Gtk.Template.Callback()
+    def on_run(self, *args) -> None:
+        total = self.spin_total.get_value_as_int()
+        concurrency = self.spin_concurrency.get_value_as_int()
+
+        self.btn_run.props.sensitive = False
+        self.spinner.props.spinning = True
+
+        benchmark_thread = threading.Thread(
+            target=self.__run, args=(total, concurrency)
+        )
+        benchmark_thread.daemon = True
+        benchmark_thread.start()
+
+    def __run(self, total: int, concurrency: int) -> None:
+        # A dedicated pool, so the benchmark can't starve the window's
+        transport = Transport(concurrency, self.window.transport.http2)
+
+        def send() -> bool:
+            arguments = self.arguments | {
+                "parameters": dict(self.arguments["parameters"]),
+                "cancellation": Cancellation(),
+            }
+            with self.cancellations_lock:
+                self.cancellations.add(arguments["cancellation"])
+            if self.stop_event.is_set():
+                # Closed while this send was being set up
+                arguments["cancellation"].cancel()
+            try:
+                resolve_requests = ResolveRequests(
+                    self.url, transport.request_session(), **arguments
+                )
+                response = resolve_requests.request(self.method)
+                response.content
+                response.close()
+                return response.ok
+            finally:
+                with self.cancellations_lock:
+                    self.cancellations.discard(arguments["cancellation"])
+
+        try:
+            summary = run_benchmark(send, total, concurrency, self.stop_event)
+        finally:
+            transport.close()
+        GLib.idle_add(self.__show_summary, summary)
+
+    def __show_summary(self, summary: dict) -> None:
+        self.btn_run.props.sensitive = True
+        self.spinner.props.spinning = False
+        self.group_results.props.visible = True
+
+        completed = summary["completed"] or 1
+        self.row_throughput.set_subtitle(
+            _("{rate:.1f} requests/s over {elapsed:.2f} s").format(
+                rate=summary["throughput"], elapsed=summary["elapsed"]
+            )
+        )
+        self.row_errors.set_subtitle(
+            f"{summary['errors'] / completed:.1%} "
+            f"({summary['errors']}/{summary['completed']})"
+        )
+        self.row_latency.set_subtitle(
+            " / ".join(
+                f"{summary[key] * 1000:.1f} ms"
+                for key in ("p50", "p90", "p99", "max")
+            )
+        )
+        self.label_histogram.set_label(format_histogram(summary["histogram"]))
+
+    def __on_close(self, *args) -> bool:
+        # Queued sends are skipped, the running ones aborted
+        self.stop_event.set()
+        with self.cancellations_lock:
+            cancellations = list(self.cancellations)
+        for cancellation in cancellations:
+            cancellation.cancel()
+        return False
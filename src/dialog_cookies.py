@@ -1,6 +1,7 @@
 from datetime import datetime as dt
 
 from escambo.common_scripts import str_to_dict_cookie, stringfy_cookie
+from escambo.date_row import DateRow
 from gi.repository import Adw, Gtk
 
 
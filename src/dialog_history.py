@@ -0,0 +1,103 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from datetime import datetime as dt
+
+from escambo.history import HistoryEntry
+from gi.repository import Adw, Gio, GLib, GObject, Gtk
+
+
+class HistoryItem(GObject.Object):
+    """A history entry as stored in the list model"""
+
+    def __init__(self, entry: HistoryEntry) -> None:
+        super().__init__()
+        self.entry = entry
+
+
+@Gtk.Template(
+    resource_path="/io/github/cleomenezesjr/Escambo/gtk/dialog-history.ui"
+)
+class HistoryDialog(Adw.Window):
+    __gtype_name__ = "HistoryDialog"
+
+    # Region Widgets
+    search_entry = Gtk.Template.Child()
+    btn_clear = Gtk.Template.Child()
+    stack = Gtk.Template.Child()
+    list_view = Gtk.Template.Child()
+
+    def __init__(self, parent_window, **kwargs):
+        super().__init__(**kwargs)
+        self.set_transient_for(parent_window)
+        self.set_title(_("History"))
+
+        # Common variables and references
+        self.window = parent_window
+        self.history = parent_window.history
+
+        self.store = Gio.ListStore(item_type=HistoryItem)
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self.__on_setup)
+        factory.connect("bind", self.__on_bind)
+        self.list_view.props.model = Gtk.NoSelection(model=self.store)
+        self.list_view.props.factory = factory
+
+        self.__search()
+
+    @Gtk.Template.Callback()
+    def on_search_changed(self, *args) -> None:
+        self.__search()
+
+    @Gtk.Template.Callback()
+    def on_activate(self, list_view, position) -> None:
+        self.window.show_history_entry(self.store.get_item(position).entry.id)
+        self.close()
+
+    @Gtk.Template.Callback()
+    def on_clear(self, *args) -> None:
+        dialog = Adw.MessageDialog.new(
+            self,
+            _("Clear History?"),
+            _("Every recorded request and response will be deleted."),
+        )
+        dialog.add_response("cancel", _("Cancel"))
+        dialog.add_response("ok", _("Clear"))
+        dialog.set_response_appearance(
+            "ok", Adw.ResponseAppearance.DESTRUCTIVE
+        )
+        dialog.connect("response", self.__on_clear_response)
+        dialog.present()
+
+    def __on_clear_response(self, widget, response) -> None:
+        if response == "ok":
+            self.history.clear()
+            self.__search()
+
+    def __search(self) -> None:
+        entries = self.history.search(self.search_entry.get_text())
+        self.store.splice(
+            0,
+            self.store.get_n_items(),
+            [HistoryItem(entry) for entry in entries],
+        )
+        self.stack.props.visible_child_name = (
+            "entries" if entries else "empty"
+        )
+
+    def __on_setup(self, factory, list_item) -> None:
+        list_item.set_child(Adw.ActionRow(activatable=False))
+
+    def __on_bind(self, factory, list_item) -> None:
+        entry = list_item.get_item().entry
+        row = list_item.get_child()
+        row.set_title(GLib.markup_escape_text(f"{entry.method} {entry.url}"))
+        row.set_subtitle(
+            " · ".join(
+                [
+                    entry.status,
+                    dt.fromtimestamp(entry.sent).strftime("%x %X"),
+                    GLib.format_size(entry.size),
+                ]
+            )
+        )
@@ -0,0 +1,139 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from datetime import datetime as dt
+
+from escambo.events import Event
+from gi.repository import Gio, GLib, GObject, Gtk, Pango
+
+# Rows show at most this many lines of the event data
+DATA_LINES = 4
+
+
+class EventItem(GObject.Object):
+    """An event as stored in the list model"""
+
+    def __init__(self, event: Event) -> None:
+        super().__init__()
+        self.event = event
+
+
+class EventRow(Gtk.Box):
+    def __init__(self) -> None:
+        super().__init__(spacing=12, margin_top=6, margin_bottom=6)
+
+        times = Gtk.Box(
+            orientation=Gtk.Orientation.VERTICAL, valign=Gtk.Align.START
+        )
+        self.arrived = Gtk.Label(xalign=0)
+        self.arrived.add_css_class("numeric")
+        self.delta = Gtk.Label(xalign=0)
+        self.delta.add_css_class("dim-label")
+        self.delta.add_css_class("numeric")
+        times.append(self.arrived)
+        times.append(self.delta)
+        self.append(times)
+
+        content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, hexpand=True)
+        self.name = Gtk.Label(xalign=0)
+        self.name.add_css_class("heading")
+        self.data = Gtk.Label(
+            xalign=0,
+            wrap=True,
+            wrap_mode=Pango.WrapMode.WORD_CHAR,
+            ellipsize=Pango.EllipsizeMode.END,
+            lines=DATA_LINES,
+            selectable=True,
+        )
+        self.data.add_css_class("monospace")
+        content.append(self.name)
+        content.append(self.data)
+        self.append(content)
+
+    def bind(self, event: Event) -> None:
+        self.arrived.set_label(
+            dt.fromtimestamp(event.arrived).strftime("%H:%M:%S.%f")[:-3]
+        )
+        self.delta.set_label(f"+{event.delta * 1000:.1f} ms")
+        self.name.set_label(
+            f"#{event.number} {event.name}".strip()
+            + (f" · {event.id}" if event.id else "")
+        )
+        self.data.set_label(event.data)
+
+
+class EventList(Gtk.Box):
+    """
+    Live list of the events of a streamed response. The store works as
+    a ring buffer: past the limit the oldest events are dropped, so a
+    stream that never ends does not grow the window without bounds.
+    """
+
+    __gtype_name__ = "EventList"
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, **kwargs)
+
+        self.limit = 1000
+        self.dropped = 0
+        self.props.vexpand = True
+
+        self.store = Gio.ListStore(item_type=EventItem)
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self.__on_setup)
+        factory.connect("bind", self.__on_bind)
+
+        self.list_view = Gtk.ListView(
+            model=Gtk.NoSelection(model=self.store),
+            factory=factory,
+            show_separators=True,
+            margin_start=12,
+            margin_end=12,
+        )
+        self.scrolled_window = Gtk.ScrolledWindow(
+            vexpand=True, hexpand=True, child=self.list_view
+        )
+        self.append(self.scrolled_window)
+
+    @property
+    def count(self) -> int:
+        """Events received, the dropped ones included"""
+        return self.dropped + self.store.get_n_items()
+
+    def set_limit(self, limit: int) -> None:
+        self.limit = max(limit, 1)
+
+    def clear(self) -> None:
+        self.dropped = 0
+        self.store.remove_all()
+
+    def append_events(self, events: list) -> None:
+        adjustment = self.scrolled_window.get_vadjustment()
+        # Only follow the stream while the user is looking at its end
+        following = (
+            adjustment.get_value() + adjustment.get_page_size()
+            >= adjustment.get_upper() - 1
+        )
+
+        kept = events[-self.limit :]
+        self.dropped += len(events) - len(kept)
+        overflow = self.store.get_n_items() + len(kept) - self.limit
+        if overflow > 0:
+            self.dropped += overflow
+            self.store.splice(0, overflow, [])
+        self.store.splice(
+            self.store.get_n_items(), 0, [EventItem(each) for each in kept]
+        )
+
+        if following:
+            GLib.idle_add(self.__scroll_to_end)
+
+    def __scroll_to_end(self) -> None:
+        adjustment = self.scrolled_window.get_vadjustment()
+        adjustment.set_value(adjustment.get_upper())
+
+    def __on_setup(self, factory, list_item) -> None:
+        list_item.set_child(EventRow())
+
+    def __on_bind(self, factory, list_item) -> None:
+        list_item.get_child().bind(list_item.get_item().event)
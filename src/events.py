@@ -0,0 +1,135 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import codecs
+import re
+import time
+
+SSE = "sse"
+NDJSON = "ndjson"
+
+# Content types whose body is a sequence of events, and their format
+EVENT_TYPES = {
+    "text/event-stream": SSE,
+    "application/x-ndjson": NDJSON,
+    "application/ndjson": NDJSON,
+    "application/jsonl": NDJSON,
+    "application/x-jsonlines": NDJSON,
+    "application/stream+json": NDJSON,
+}
+
+LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
+def event_format(headers) -> str | None:
+    """SSE, NDJSON or None, from the Content-Type of a response"""
+    content_type = headers.get("content-type", "")
+    return EVENT_TYPES.get(content_type.split(";")[0].strip().lower())
+
+
+def read_available(raw, size: int) -> bytes:
+    """
+    Whatever part of the body already arrived, up to size bytes. A plain
+    read would block until size bytes came in, or the body ended.
+    """
+    if hasattr(raw, "read1"):
+        return raw.read1(size)
+    if getattr(raw, "_fp", None) is not None:
+        # http.client under urllib3, which reads chunked bodies too
+        return raw._fp.read1(size)
+    return raw.read(size)
+
+
+class Event:
+    """A server-sent event, or a line of an NDJSON stream"""
+
+    def __init__(self, number, arrived, delta, name, data, id=None) -> None:
+        self.number = number
+        # Wall clock time of arrival and seconds since the previous event
+        self.arrived = arrived
+        self.delta = delta
+        self.name = name
+        self.data = data
+        self.id = id
+
+
+class EventParser:
+    """
+    Turn the bytes of a response into events as they arrive. Lines may
+    be split across reads, so the unfinished one is kept until the rest
+    comes in.
+    """
+
+    def __init__(self, event_format: str, encoding: str = None) -> None:
+        self.format = event_format
+        self.decoder = codecs.getincrementaldecoder(encoding or "utf-8")(
+            errors="replace"
+        )
+        self.count = 0
+        self._previous = time.perf_counter()
+        self._line = ""
+        self._name = ""
+        self._data = []
+        self._id = None
+
+    def feed(self, chunk: bytes) -> list:
+        text = self._line + self.decoder.decode(chunk)
+        # A lone \r may be the first half of \r\n
+        keep = text.endswith("\r")
+        lines = LINE_BREAK.split(text[:-1] if keep else text)
+        self._line = lines.pop() + ("\r" if keep else "")
+
+        events = []
+        for line in lines:
+            event = self.__parse_line(line)
+            if event:
+                events.append(event)
+        return events
+
+    def close(self) -> list:
+        """
+        The last NDJSON line, when the body ends without a line break. An
+        unfinished server-sent event is dropped, as browsers do.
+        """
+        line, self._line = self._line.rstrip("\r"), ""
+        if self.format == NDJSON and (event := self.__parse_line(line)):
+            return [event]
+        return []
+
+    def __parse_line(self, line: str) -> Event | None:
+        if self.format == NDJSON:
+            return self.__event("", line) if line.strip() else None
+
+        if not line:
+            # A blank line dispatches what the previous lines collected
+            data, self._data = self._data, []
+            name, self._name = self._name, ""
+            if data:
+                return self.__event(name or "message", "\n".join(data))
+            return None
+        if line.startswith(":"):
+            return None
+
+        field, _sep, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._name = value
+        elif field == "id":
+            self._id = value
+        return None
+
+    def __event(self, name: str, data: str) -> Event:
+        now = time.perf_counter()
+        self.count += 1
+        event = Event(
+            self.count,
+            time.time(),
+            now - self._previous,
+            name,
+            data,
+            self._id,
+        )
+        self._previous = now
+        return event
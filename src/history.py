@@ -0,0 +1,337 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from urllib.parse import unquote_plus, urlsplit, urlunsplit
+
+# Same directory as GLib.get_user_data_dir(), without importing GLib
+DATA_DIR = os.path.join(
+    os.environ.get("XDG_DATA_HOME")
+    or os.path.join(os.path.expanduser("~"), ".local", "share"),
+    "escambo",
+)
+DATABASE = os.path.join(DATA_DIR, "history.db")
+
+# Bodies are kept up to BODY_LIMIT characters and searchable up to
+# INDEX_LIMIT, which keeps the full-text index small
+BODY_LIMIT = 16 * 1024 * 1024
+INDEX_LIMIT = 256 * 1024
+SEARCH_LIMIT = 200
+
+# Columns of the full-text index, usable as "status:404" in a query
+COLUMNS = ["method", "url", "status", "headers", "body"]
+
+# Headers holding credentials, by name. Their values are never stored
+SENSITIVE_HEADERS = re.compile(
+    r"auth|cookie|token|secret|passw|api-?key|session", re.IGNORECASE
+)
+REDACTED = "••••••••"
+
+
+class HistoryEntry:
+    """A past send as listed by a search, without its body"""
+
+    def __init__(self, id, sent, method, url, status, size) -> None:
+        self.id = id
+        self.sent = sent
+        self.method = method
+        self.url = url
+        self.status = status
+        self.size = size
+
+
+def body_text(body, limit: int = BODY_LIMIT) -> str:
+    """Up to limit characters of a text or ResponseBody response"""
+    if isinstance(body, str):
+        return body[:limit]
+
+    if not body.spilled:
+        return body.getvalue()[:limit].decode(body.encoding, "replace")
+
+    pages = []
+    for index in range(body.page_count):
+        pages.append(body.page(index))
+        if sum(map(len, pages)) >= limit:
+            break
+    return "".join(pages)[:limit]
+
+
+def redact(headers: dict, secret_headers=()) -> dict:
+    """headers with the value of every credential replaced"""
+    secret = {name.lower() for name in secret_headers}
+    return {
+        name: (
+            REDACTED
+            if SENSITIVE_HEADERS.search(name) or name.lower() in secret
+            else value
+        )
+        for name, value in dict(headers).items()
+    }
+
+
+def redact_url(url: str, secret_params=()) -> str:
+    """url with the value of every query parameter in secret_params replaced"""
+    if not secret_params:
+        return url
+
+    parts = urlsplit(url)
+    fields = []
+    for field in parts.query.split("&"):
+        name, separator, _value = field.partition("=")
+        if separator and unquote_plus(name) in secret_params:
+            field = f"{name}={REDACTED}"
+        fields.append(field)
+    return urlunsplit(parts._replace(query="&".join(fields)))
+
+
+def match_query(text: str) -> str:
+    """
+    Turn what was typed into an FTS5 query: every word must appear,
+    the last token of each word as a prefix, and "column:word" looks
+    in a single column.
+    """
+    terms = []
+    for word in text.split():
+        column, separator, value = word.partition(":")
+        if not (separator and column in COLUMNS):
+            column, value = None, word
+
+        tokens = re.findall(r"\w+", value)
+        if tokens:
+            phrase = f'"{" ".join(tokens)}"*'
+            terms.append(f"{column} : {phrase}" if column else phrase)
+    return " ".join(terms)
+
+
+class HistoryStore:
+    """
+    Every send with its response, in SQLite. Bodies are compressed with
+    zlib and indexed by a contentless FTS5 table, so searching thousands
+    of entries by URL, status or body only touches the index. Header
+    values that are credentials are redacted before anything is stored.
+    """
+
+    def __init__(self, max_entries: int, path: str = DATABASE) -> None:
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " id INTEGER PRIMARY KEY,"
+                " sent REAL NOT NULL,"
+                " method TEXT NOT NULL,"
+                " url TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " request_headers TEXT NOT NULL,"
+                " request_body TEXT,"
+                " response_headers TEXT NOT NULL,"
+                " timings TEXT NOT NULL,"
+                " code_type TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " body BLOB NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5("
+                f" {', '.join(COLUMNS)}, content='')"
+            )
+
+        # Compressing happens off the thread that did the send
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self.__write_behind)
+        self._writer.daemon = True
+        self._writer.start()
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        request_headers: dict,
+        request_body: str | None,
+        status: str,
+        response_headers: dict,
+        timings: dict,
+        code_type: str,
+        body: str,
+        secret_headers: list = (),
+        secret_params: list = (),
+    ) -> None:
+        """
+        Queue a send to be stored. secret_headers and secret_params name
+        the headers and query parameters that hold credentials without
+        looking like it, e.g. an API key's.
+        """
+        self._queue.put(
+            (
+                time.time(),
+                method,
+                redact_url(url, secret_params),
+                status,
+                json.dumps(redact(request_headers, secret_headers)),
+                request_body,
+                json.dumps(redact(response_headers)),
+                json.dumps(timings),
+                code_type,
+                body,
+            )
+        )
+
+    def search(self, text: str, limit: int = SEARCH_LIMIT) -> list:
+        """Newest entries matching text, or simply the newest ones"""
+        query = match_query(text)
+        with self._lock:
+            if query:
+                rows = self._connection.execute(
+                    "SELECT id, sent, method, url, status, size "
+                    "FROM entries WHERE id IN "
+                    "(SELECT rowid FROM search WHERE search MATCH ?) "
+                    "ORDER BY id DESC LIMIT ?",
+                    (query, limit),
+                ).fetchall()
+            else:
+                rows = self._connection.execute(
+                    "SELECT id, sent, method, url, status, size "
+                    "FROM entries ORDER BY id DESC LIMIT ?",
+                    (limit,),
+                ).fetchall()
+        return [HistoryEntry(*row) for row in rows]
+
+    def load(self, entry_id: int) -> dict | None:
+        """Everything recorded for an entry, body decompressed"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT id, sent, method, url, status, request_headers, "
+                "request_body, response_headers, timings, code_type, body "
+                "FROM entries WHERE id = ?",
+                (entry_id,),
+            ).fetchone()
+        if not row:
+            return None
+
+        keys = [
+            "id",
+            "sent",
+            "method",
+            "url",
+            "status",
+            "request_headers",
+            "request_body",
+            "response_headers",
+            "timings",
+            "code_type",
+            "body",
+        ]
+        entry = dict(zip(keys, row))
+        for key in ["request_headers", "response_headers", "timings"]:
+            entry[key] = json.loads(entry[key])
+        entry["body"] = zlib.decompress(entry["body"]).decode()
+        return entry
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries")
+            self._connection.execute(
+                "INSERT INTO search (search) VALUES ('delete-all')"
+            )
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._writer.join()
+        with self._lock:
+            self._connection.close()
+
+    def __write_behind(self) -> None:
+        while record := self._queue.get():
+            # A send that can't be stored mustn't stop the ones after it
+            try:
+                self.__insert(*record)
+            except Exception as error:
+                print(
+                    f"History: {record[2]} not stored: {error}",
+                    file=sys.stderr,
+                )
+
+    def __insert(
+        self,
+        sent,
+        method,
+        url,
+        status,
+        request_headers,
+        request_body,
+        response_headers,
+        timings,
+        code_type,
+        body,
+    ) -> None:
+        compressed = zlib.compress(body.encode())
+        index = self.__index_values(
+            method, url, status, request_headers, response_headers, body
+        )
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO entries (sent, method, url, status, "
+                "request_headers, request_body, response_headers, timings, "
+                "code_type, size, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    sent,
+                    method,
+                    url,
+                    status,
+                    request_headers,
+                    request_body,
+                    response_headers,
+                    timings,
+                    code_type,
+                    len(body),
+                    compressed,
+                ),
+            )
+            self._connection.execute(
+                f"INSERT INTO search (rowid, {', '.join(COLUMNS)}) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (cursor.lastrowid, *index),
+            )
+            self.__prune()
+
+    def __prune(self) -> None:
+        """Forget the oldest entries past max_entries"""
+        rows = self._connection.execute(
+            "SELECT id, method, url, status, request_headers, "
+            "response_headers, body FROM entries "
+            "ORDER BY id DESC LIMIT -1 OFFSET ?",
+            (self.max_entries,),
+        ).fetchall()
+        for entry_id, *values, compressed in rows:
+            body = zlib.decompress(compressed).decode()
+            # A contentless index needs the values it was given back
+            self._connection.execute(
+                f"INSERT INTO search (search, rowid, {', '.join(COLUMNS)}) "
+                "VALUES ('delete', ?, ?, ?, ?, ?, ?)",
+                (entry_id, *self.__index_values(*values, body)),
+            )
+            self._connection.execute(
+                "DELETE FROM entries WHERE id = ?", (entry_id,)
+            )
+
+    def __index_values(
+        self, method, url, status, request_headers, response_headers, body
+    ) -> tuple:
+        headers = "\n".join(
+            f"{key}: {value}"
+            for encoded in (request_headers, response_headers)
+            for key, value in json.loads(encoded).items()
+        )
+        return method, url, status, headers, body[:INDEX_LIMIT]
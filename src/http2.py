@@ -0,0 +1,247 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import http.client
+import os
+import ssl
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from escambo.transport import ConnectionStats, DrainingAdapter, Timings
+from requests.cookies import extract_cookies_to_jar
+from requests.structures import CaseInsensitiveDict
+from requests.utils import (
+    DEFAULT_CA_BUNDLE_PATH,
+    get_encoding_from_headers,
+    select_proxy,
+)
+
+try:
+    import h2  # noqa: F401
+    import httpx
+except ImportError:
+    httpx = None
+
+
+def available() -> bool:
+    return httpx is not None
+
+
+def ssl_context(verify, cert) -> ssl.SSLContext:
+    """The TLS settings requests would use, as an SSLContext for httpx"""
+    if isinstance(verify, str):
+        if os.path.isdir(verify):
+            context = ssl.create_default_context(capath=verify)
+        else:
+            context = ssl.create_default_context(cafile=verify)
+    else:
+        context = ssl.create_default_context(cafile=DEFAULT_CA_BUNDLE_PATH)
+        if not verify:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+
+    if isinstance(cert, tuple):
+        context.load_cert_chain(*cert)
+    elif cert:
+        context.load_cert_chain(cert)
+    return context
+
+
+class _Http2Body:
+    """
+    Stand-in for the urllib3 response, reading the still encoded body
+    of an httpx response. Content-Encoding is left to DecodingBody, and
+    httpx errors are raised as the requests ones iter_content raises.
+    """
+
+    def __init__(
+        self, response, message: http.client.HTTPMessage, on_close
+    ) -> None:
+        self._response = response
+        self._on_close = on_close
+        self._chunks = iter(response.stream)
+        self._buffer = bytearray()
+        self._received = 0
+        # Where requests looks for Set-Cookie headers
+        self._original_response = self
+        self.msg = message
+
+    def read(self, amt: int = None, **kwargs) -> bytes:
+        while amt is None or len(self._buffer) < amt:
+            chunk = self.__next_chunk()
+            if not chunk:
+                break
+            self._received += len(chunk)
+            self._buffer += chunk
+
+        if amt is None:
+            amt = len(self._buffer)
+        data = bytes(self._buffer[:amt])
+        del self._buffer[:amt]
+        return data
+
+    def read1(self, amt: int = -1) -> bytes:
+        """What is buffered, or else the next chunk that arrives"""
+        if not self._buffer:
+            chunk = self.__next_chunk()
+            self._received += len(chunk)
+            self._buffer += chunk
+        if amt is None or amt < 0:
+            amt = len(self._buffer)
+        data = bytes(self._buffer[:amt])
+        del self._buffer[:amt]
+        return data
+
+    def __next_chunk(self) -> bytes:
+        """The next chunk of the body, empty once it ended"""
+        try:
+            return next(self._chunks, b"")
+        except httpx.TimeoutException as error:
+            raise requests.exceptions.ConnectionError(error)
+        except (httpx.HTTPError, httpx.StreamError) as error:
+            raise requests.exceptions.ChunkedEncodingError(error)
+
+    def tell(self) -> int:
+        return self._received
+
+    def release_conn(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._response.close()
+        if self._on_close:
+            on_close, self._on_close = self._on_close, None
+            on_close()
+
+
+class Http2Adapter(DrainingAdapter):
+    """
+    Send https:// requests through httpx, which negotiates HTTP/2 with
+    ALPN and falls back to HTTP/1.1. Concurrent sends to a host are
+    multiplexed as streams of a single connection. httpx takes TLS and
+    proxy settings per transport, so there is one transport for each
+    combination of them in use. A send holds the adapter until its body
+    is closed, closing the transport would cut the stream short.
+    """
+
+    def __init__(self, stats: ConnectionStats, pool_size: int) -> None:
+        if not available():
+            raise ValueError(_("HTTP/2 needs the httpx and h2 modules"))
+
+        super().__init__()
+        self.stats = stats
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._transports = {}
+
+    def transport_for(self, verify, cert, proxy) -> "httpx.HTTPTransport":
+        key = (verify, cert, proxy)
+        with self._lock:
+            if key not in self._transports:
+                self._transports[key] = httpx.HTTPTransport(
+                    verify=ssl_context(verify, cert),
+                    http2=True,
+                    limits=httpx.Limits(
+                        max_connections=self.pool_size,
+                        max_keepalive_connections=self.pool_size,
+                    ),
+                    proxy=proxy,
+                )
+            return self._transports[key]
+
+    def send(
+        self,
+        request,
+        stream=False,
+        timeout=None,
+        verify=True,
+        cert=None,
+        proxies=None,
+    ) -> requests.models.Response:
+        timings = Timings()
+        started = {}
+
+        def trace(event: str, info: dict) -> None:
+            name, _sep, state = event.rpartition(".")
+            if state == "started":
+                started[name] = time.perf_counter()
+            elif state == "complete" and name in started:
+                duration = time.perf_counter() - started[name]
+                if name == "connection.connect_tcp":
+                    # Name resolution happens inside the connect
+                    timings.connect = duration
+                    timings.new_connection = True
+                elif name == "connection.start_tls":
+                    timings.tls = duration
+
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+        else:
+            connect_timeout = read_timeout = timeout
+
+        response = None
+        self.acquire()
+        try:
+            transport = self.transport_for(
+                verify, cert, select_proxy(request.url, proxies)
+            )
+            response = transport.handle_request(
+                httpx.Request(
+                    request.method,
+                    request.url,
+                    headers=list(request.headers.items()),
+                    content=request.body,
+                    extensions={
+                        "timeout": {
+                            "connect": connect_timeout,
+                            "read": read_timeout,
+                            "write": read_timeout,
+                            "pool": connect_timeout,
+                        },
+                        "trace": trace,
+                    },
+                )
+            )
+        except httpx.TimeoutException as error:
+            raise requests.exceptions.Timeout(error, request=request)
+        except httpx.TransportError as error:
+            raise requests.exceptions.ConnectionError(error, request=request)
+        finally:
+            if response is None:
+                # There is no body to release the adapter once closed
+                self.release()
+            self.stats.record(
+                urlparse(request.url).netloc, timings.new_connection
+            )
+
+        timings.headers_received()
+        timings.protocol = response.http_version
+        return self.build_response(request, response, timings)
+
+    def build_response(
+        self, request, http2_response, timings: Timings
+    ) -> requests.models.Response:
+        message = http.client.HTTPMessage()
+        for key, value in http2_response.headers.multi_items():
+            message[key] = value
+
+        response = requests.models.Response()
+        response.status_code = http2_response.status_code
+        response.headers = CaseInsensitiveDict(http2_response.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = http2_response.reason_phrase
+        response.raw = _Http2Body(http2_response, message, self.release)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.timings = timings
+        extract_cookies_to_jar(response.cookies, request, response.raw)
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            transports, self._transports = self._transports, {}
+        for transport in transports.values():
+            transport.close()
@@ -20,6 +20,8 @@
 import sys
 
 import gi
+from escambo import startup
+from escambo.tracing import tracer
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
@@ -27,8 +29,12 @@ gi.require_version("GtkSource", "5")
 
 from gi.repository import Adw, Gio, Gtk
 
+startup.mark("gtk")
+
 from .window import EscamboWindow
 
+startup.mark("modules")
+
 
 class EscamboApplication(Adw.Application):
     """The main application singleton class."""
@@ -51,10 +57,22 @@ class EscamboApplication(Adw.Application):
         win = self.props.active_window
         if not win:
             win = EscamboWindow(application=self)
+            startup.mark("window")
         win.present()
 
         self.setup_escambo_actions(win)
 
+    def do_shutdown(self):
+        """Flush pending override writes before leaving."""
+        for win in self.get_windows():
+            if isinstance(win, EscamboWindow):
+                win.cancel_sends()
+                win.store.close()
+                if win.history:
+                    win.history.close()
+        tracer.close()
+        Adw.Application.do_shutdown(self)
+
     def setup_escambo_actions(self, win):
         self.create_action(
             "on_send", win._EscamboWindow__on_send, ["<primary>Return"]
@@ -64,6 +82,13 @@ class EscamboApplication(Adw.Application):
             win._EscamboWindow__set_response_visibility,
             ["<primary>r"],
         )
+        self.add_action(win.settings.create_action("stream-response"))
+        self.add_action(win.settings.create_action("response-cache"))
+        self.add_action(win.settings.create_action("record-history"))
+        self.add_action(win.settings.create_action("request-compression"))
+        self.add_action(win.settings.create_action("preconnect"))
+        self.add_action(win.settings.create_action("http2"))
+        self.create_action("history", win.on_history, ["<primary>h"])
 
     def on_about_action(self, *args):
         """Callback for the app.about action."""
@@ -0,0 +1,127 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from escambo.populator_entry import PopulatorEntry
+from gi.repository import Adw, Gio, GObject, Gtk
+
+
+class OverrideItem(GObject.Object):
+    """A saved override as stored in the list model"""
+
+    def __init__(self, key: str, value) -> None:
+        super().__init__()
+        self.key = key
+        self.value = value
+
+    @property
+    def override(self) -> list:
+        return [self.key, self.value]
+
+    @property
+    def text(self) -> str:
+        """Everything the filter box matches against"""
+        if isinstance(self.value, list):
+            return " ".join([self.key, *self.value]).casefold()
+        return f"{self.key} {self.value}".casefold()
+
+
+class OverrideList(Gtk.Box):
+    """
+    Filterable list of overrides backed by a Gio.ListStore. Rows are
+    recycled by the Gtk.ListView, so only the visible ones have widgets.
+    """
+
+    __gtype_name__ = "OverrideList"
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, **kwargs)
+
+        self.window = None
+        self.kind = None
+        self._items = {}
+
+        self.props.spacing = 12
+        self.props.vexpand = True
+
+        self.search_entry = Gtk.SearchEntry(
+            placeholder_text=_("Filter"), margin_start=12, margin_end=12
+        )
+        self.search_entry.connect("search-changed", self.__on_search)
+        self.append(Adw.Clamp(child=self.search_entry))
+
+        self.description = Gtk.Label(visible=False, wrap=True)
+        self.description.add_css_class("dim-label")
+        self.append(self.description)
+
+        self.store = Gio.ListStore(item_type=OverrideItem)
+        self.filter = Gtk.CustomFilter.new(self.__match)
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self.__on_setup)
+        factory.connect("bind", self.__on_bind)
+
+        list_view = Gtk.ListView(
+            model=Gtk.NoSelection(
+                model=Gtk.FilterListModel(model=self.store, filter=self.filter)
+            ),
+            factory=factory,
+            margin_start=12,
+            margin_end=12,
+            margin_bottom=24,
+        )
+        list_view.add_css_class("boxed-list")
+        self.append(
+            Gtk.ScrolledWindow(
+                vexpand=True,
+                child=Adw.ClampScrollable(
+                    tightening_threshold=300, child=list_view
+                ),
+            )
+        )
+
+    def setup(self, window, kind: str) -> None:
+        self.window = window
+        self.kind = kind
+
+    def set_overrides(self, overrides: dict) -> None:
+        """Replace the whole content of the list in a single step"""
+        self._items = {
+            key: OverrideItem(key, value) for key, value in overrides.items()
+        }
+        self.store.splice(
+            0, self.store.get_n_items(), list(self._items.values())
+        )
+
+    def add_override(self, key: str, value) -> None:
+        self._items[key] = OverrideItem(key, value)
+        self.store.append(self._items[key])
+
+    def update_override(self, key: str, value) -> None:
+        found, position = self.store.find(self._items[key])
+        self._items[key] = OverrideItem(key, value)
+        if found:
+            self.store.splice(position, 1, [self._items[key]])
+
+    def remove_override(self, key: str) -> None:
+        found, position = self.store.find(self._items.pop(key))
+        if found:
+            self.store.remove(position)
+
+    def set_description(self, description: str) -> None:
+        self.description.set_label(description)
+        self.description.props.visible = bool(description)
+
+    def __on_setup(self, factory, list_item) -> None:
+        list_item.set_child(
+            PopulatorEntry(
+                window=self.window, override=None, content=self.kind
+            )
+        )
+
+    def __on_bind(self, factory, list_item) -> None:
+        list_item.get_child().bind(list_item.get_item().override)
+
+    def __match(self, item: OverrideItem) -> bool:
+        return self.search_entry.get_text().casefold() in item.text
+
+    def __on_search(self, *_args) -> None:
+        self.filter.changed(Gtk.FilterChange.DIFFERENT)
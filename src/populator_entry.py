@@ -1,8 +1,3 @@
-import json
-
-from escambo.dialog_body import BodyDialog
-from escambo.dialog_cookies import CookieDialog
-from escambo.dialog_headers import HeaderDialog
 from gi.repository import Adw, Gtk
 
 
@@ -27,10 +22,7 @@ class PopulatorEntry(Adw.ActionRow):
         Set the DLL name as ActionRow title and set the
         combo_type to the type of override
         """
-        if any(i in self.content for i in ["cookies", "headers", "body"]):
-            self.set_title(self.override[1][0] or "—")
-            self.set_subtitle(self.override[1][1] or "—")
-        elif "auths" in self.content:
+        if "auths" in self.content:
             self.window.api_key_auth_key.set_text(self.override["Api Key"][0])
             self.window.api_key_auth_value.set_text(
                 self.override["Api Key"][1]
@@ -41,16 +33,27 @@ class PopulatorEntry(Adw.ActionRow):
             )
 
             self.window.bearer_token.set_text(self.override["Bearer Token"][0])
+        elif self.override:
+            self.bind(self.override)
 
-        # update status
-        self.window.update_subtitle_parameters()
         # connect signals
         self.btn_remove.connect("clicked", self.__remove_override)
 
+    def bind(self, override: list) -> None:
+        """Show another override, rows are recycled by the list view"""
+        self.override = override
+        if any(i in self.content for i in ["cookies", "headers", "body"]):
+            self.set_title(self.override[1][0] or "—")
+            self.set_subtitle(self.override[1][1] or "—")
+        else:
+            self.set_title(self.override[0] or "—")
+            self.set_subtitle(self.override[1] or "—")
+
     def __remove_override(self, *_args) -> None:
         """
         Remove element and destroy the widget
         """
+        key = self.override[0]
 
         def resolve_dialog_response(widget, response):
             if response == "ok":
@@ -64,34 +67,18 @@ class PopulatorEntry(Adw.ActionRow):
                 for file in files:
                     if files[file] in self.content:
                         file_content = getattr(self.window, files[file])
-                        del file_content[self.override[0]]
-                        with open(self.content, "w") as json_content:
-                            json.dump(file_content, json_content, indent=2)
-
-                        self.window.cookies = (
-                            file_content
-                            if "cookie" in file
-                            else self.window.cookies
-                        )
-                        self.window.body = (
-                            file_content
-                            if "body" in file
-                            else self.window.body
-                        )
-                        self.window.param = (
-                            file_content
-                            if "parameter" in file
-                            else self.window.param
-                        )
-                        self.window.headers = (
-                            file_content
-                            if "header" in file
-                            else self.window.headers
+                        del file_content[key]
+                        self.window.store.delete(self.content, key)
+                        self.window.request_model.invalidate(self.content)
+                        if "cookies" in self.content:
+                            self.window.cookie_jar.remove(key)
+
+                        group = getattr(
+                            self.window, f"group_overrides_{files[file]}"
                         )
+                        group.remove_override(key)
                         if len(file_content) == 0:
-                            getattr(
-                                self.window, f"group_overrides_{files[file]}"
-                            ).set_description((f"No {file} added."))
+                            group.set_description((f"No {file} added."))
 
                 # update status
                 self.window.update_subtitle_parameters()
@@ -106,8 +93,6 @@ class PopulatorEntry(Adw.ActionRow):
                 # TODO
                 # Remove query parameter on subtitle
 
-                self.get_parent().remove(self)
-
         subtitle = f"\n{self.get_subtitle()}" if self.get_subtitle() else ""
         dialog = Adw.MessageDialog.new(
             self.window,
@@ -125,23 +110,8 @@ class PopulatorEntry(Adw.ActionRow):
     @Gtk.Template.Callback()
     def on_edit(self, arg) -> None:
         if "cookies" in self.content:
-            new_window = CookieDialog(
-                parent_window=self.window,
-                title=_("Edit Cookie"),
-                content=self,
-            )
-            new_window.present()
+            self.window._show_cookie_dialog(self, _("Edit Cookie"), self)
         elif "headers" in self.content:
-            new_window = HeaderDialog(
-                parent_window=self.window,
-                title=_("Edit Header"),
-                content=self,
-            )
-            new_window.present()
+            self.window._show_header_dialog(self, _("Edit Header"), self)
         elif "body" in self.content:
-            new_window = BodyDialog(
-                parent_window=self.window,
-                title=_("Edit Body"),
-                content=self,
-            )
-            new_window.present()
+            self.window._show_body_dialog(self, _("Edit Body"), self)
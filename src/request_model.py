@@ -0,0 +1,124 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import html
+import json
+from typing import Callable
+from urllib.parse import urlsplit
+
+from escambo.common_scripts import has_parameter, is_valid_url
+from escambo.storage import BODY, COOKIES, HEADERS, PARAM
+
+# Derived values to drop when an input changes
+DEPENDENCIES = {
+    "url": ["valid", "url_parts", "preview"],
+    PARAM: ["param_pairs", "preview"],
+    HEADERS: ["headers"],
+    BODY: ["form_body"],
+    COOKIES: [],
+    "raw": ["raw_body"],
+}
+
+
+class RequestModel:
+    """
+    The request as it would be sent right now. Inputs only invalidate
+    the values that depend on them, and each derived value is computed
+    once and shared by the URL preview and the send.
+    """
+
+    def __init__(self) -> None:
+        self.url = ""
+        self.params = {}
+        self.headers_overrides = {}
+        self.body_overrides = {}
+        self._derived = {}
+
+    def bind(self, params: dict, headers: dict, body: dict) -> None:
+        """Follow the override dicts, which are edited in place"""
+        self.params = params
+        self.headers_overrides = headers
+        self.body_overrides = body
+        self._derived.clear()
+
+    def set_url(self, url: str) -> None:
+        if url != self.url:
+            self.url = url
+            self.invalidate("url")
+
+    def invalidate(self, *inputs: str) -> None:
+        for name in inputs:
+            for derived in DEPENDENCIES[name]:
+                self._derived.pop(derived, None)
+
+    def __derive(self, name: str, compute: Callable):
+        if name not in self._derived:
+            self._derived[name] = compute()
+        return self._derived[name]
+
+    @property
+    def valid(self) -> bool:
+        return self.__derive("valid", lambda: bool(is_valid_url(self.url)))
+
+    @property
+    def headers(self) -> dict:
+        return self.__derive(
+            "headers",
+            lambda: {
+                value[0]: value[1] for value in self.headers_overrides.values()
+            },
+        )
+
+    @property
+    def form_body(self) -> dict:
+        return self.__derive(
+            "form_body",
+            lambda: {
+                value[0]: value[1] for value in self.body_overrides.values()
+            },
+        )
+
+    def raw_body(self, get_text: Callable[[], str]) -> dict | None:
+        """
+        Parsed raw body, re-read only after the raw editor changed.
+        Raise ValueError when it is not JSON.
+        """
+
+        def parse():
+            raw_code = get_text()
+            try:
+                return json.loads(raw_code) if raw_code else None
+            except ValueError as error:
+                return error
+
+        body = self.__derive("raw_body", parse)
+        if isinstance(body, ValueError):
+            raise body
+        return body
+
+    @property
+    def preview(self) -> str:
+        """URL shown under the Query Parameters row"""
+
+        def compute():
+            base, query = self.__derive("url_parts", self.__split_url)
+            parameters = self.__derive(
+                "param_pairs",
+                lambda: [f"{key}={val}" for key, val in self.params.items()],
+            )
+            if query:
+                parameters = parameters + query.split("&")
+            return (
+                f"{'https://' if not self.url else base}"
+                + f"?{html.escape('&').join(parameters)}"
+            )
+
+        return self.__derive("preview", compute)
+
+    def __split_url(self) -> tuple[str, str]:
+        base = (
+            self.url[: self.url.find("?")]
+            if has_parameter(self.url)
+            else self.url
+        )
+        return base, urlsplit(self.url).query
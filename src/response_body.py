@@ -0,0 +1,77 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import math
+import mmap
+import tempfile
+
+# Amount of the body shown at once when it was spilled to disk
+PAGE_SIZE = 1024 * 1024
+
+
+class ResponseBody:
+    """
+    Raw bytes of a response body, kept in memory while they fit under
+    threshold and spilled to a temporary file once they don't. A spilled
+    body is read back one page at a time through a memory map.
+    """
+
+    def __init__(self, threshold: int, encoding: str = None) -> None:
+        self.threshold = threshold
+        self.encoding = encoding or "utf-8"
+        self.size = 0
+        self._buffer = bytearray()
+        self._file = None
+        self._map = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._file is not None
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self._file:
+            self._file.write(chunk)
+        elif len(self._buffer) + len(chunk) > self.threshold:
+            self._file = tempfile.TemporaryFile()
+            self._file.write(self._buffer)
+            self._file.write(chunk)
+            self._buffer = bytearray()
+        else:
+            self._buffer += chunk
+
+    def finish(self) -> None:
+        """Map the spilled file once every chunk has been written"""
+        if self._file and self.size:
+            self._file.flush()
+            self._map = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+    def getvalue(self) -> bytes:
+        """Whole body, only for bodies that were never spilled"""
+        return bytes(self._buffer)
+
+    @property
+    def page_count(self) -> int:
+        return max(math.ceil(self.size / PAGE_SIZE), 1)
+
+    def page(self, index: int) -> str:
+        if not self._map:
+            return ""
+
+        start = self.__char_boundary(index * PAGE_SIZE)
+        end = self.__char_boundary(min((index + 1) * PAGE_SIZE, self.size))
+        return self._map[start:end].decode(self.encoding, errors="replace")
+
+    def close(self) -> None:
+        if self._map:
+            self._map.close()
+        if self._file:
+            self._file.close()
+
+    def __char_boundary(self, offset: int) -> int:
+        """Move back to the start of a UTF-8 sequence"""
+        while 0 < offset < self.size and self._map[offset] & 0xC0 == 0x80:
+            offset -= 1
+        return offset
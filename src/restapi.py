@@ -1,9 +1,46 @@
-import datetime
+import codecs
 import json
+import threading
 import time
+from typing import Callable, Iterator
+from urllib.parse import urlparse
 
 import requests
-from escambo.common_scripts import str_to_dict_cookie
+from escambo import compression
+from escambo.cache import ResponseCache
+from escambo.cancellation import Cancellation
+from escambo.cookie_jar import CookieJar
+from escambo.events import EventParser, read_available
+from escambo.response_body import ResponseBody
+from escambo.retry import RetryPolicy
+from escambo.tracing import tracer
+from escambo.transport import body_errors
+from escambo.upload import FileUpload
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Size of each read from the socket while streaming a response body
+CHUNK_SIZE = 64 * 1024
+# Bodies larger than this are kept in a temporary file, not in memory
+SPILL_THRESHOLD = 16 * 1024 * 1024
+# Seconds to wait for a connection, and between two reads of the answer
+TIMEOUT = (10.0, 30.0)
+
+
+def pretty_json(content: bytes) -> str:
+    """Indent a JSON document, using orjson when it is installed"""
+    if orjson:
+        try:
+            return orjson.dumps(
+                orjson.loads(content), option=orjson.OPT_INDENT_2
+            ).decode()
+        except (ValueError, TypeError):
+            # e.g. integers orjson can't represent, let json handle them
+            pass
+    return json.dumps(json.loads(content), indent=4)
 
 
 class ResolveRequests:
@@ -11,108 +48,381 @@ class ResolveRequests:
         self,
         url: str,
         session: requests.sessions.Session,
-        cookies: dict = None,
+        cookies: CookieJar = None,
         headers: dict = None,
         body: dict = None,
         parameters: dict = None,
-        authorization: dict = None,
+        authorization: list = None,
+        cache: ResponseCache = None,
+        spill_threshold: int = SPILL_THRESHOLD,
+        compression: str = None,
+        upload: FileUpload = None,
+        on_progress: Callable = None,
+        retry: RetryPolicy = None,
+        timeout: tuple = TIMEOUT,
+        cancellation: Cancellation = None,
     ) -> None:
         # common variables and references
         self.url = url
         self.session = session
         self.body = body
-        self.params = parameters
+        # Copies, the session and the caller's dicts are left untouched
+        self.headers = dict(headers or {})
+        self.params = dict(parameters or {})
         self.cookies = cookies
         self.auths = authorization
+        self.cache = cache
+        self.spill_threshold = spill_threshold
+        self.compression = compression
+        # A file sent as the body instead, see FileUpload
+        self.upload = upload
+        self.on_progress = on_progress
+        self.retry = retry
+        self.timeout = timeout
+        self.cancellation = cancellation or Cancellation()
+        # Headers and query parameters set from credentials, which the
+        # history must not keep
+        self.secret_headers = []
+        self.secret_params = []
+        # Every send made for this request, see RetryPolicy.run
+        self.attempts = []
+        self.timings = None
+        # What was actually sent and answered, for the history
+        self.prepared = None
+        self.response = None
+        # Cookies set by the server along the way, redirects included
+        self.response_cookies = []
+        # "cache", "revalidated", "fresh" or None when not cacheable
+        self.cache_status = None
 
-        if self.cookies:
-            self.set_cookie_session()
-        if headers:
-            self.session.headers.update(headers)
         if self.auths:
-            self.set_auth()
+            with tracer.span("auth"):
+                self.set_auth()
         if not self.body:
             self.body = {}
 
     def resolve_get(self) -> list:
-        response = self.session.get(
-            self.url,
-            json=self.body,
-            params=self.params,
-        )
-        return self.formatted_response(response)
+        return self.formatted_response(self.request("get"))
 
     def resolve_post(self) -> list:
-        response = self.session.post(
-            self.url,
-            json=self.body,
-            params=self.params,
-        )
-
-        return self.formatted_response(response)
+        return self.formatted_response(self.request("post"))
 
     def resolve_put(self) -> list:
-        response = self.session.put(
-            self.url,
-            json=self.body,
-            params=self.params,
-        )
-
-        return self.formatted_response(response)
+        return self.formatted_response(self.request("put"))
 
     def resolve_patch(self) -> list:
-        response = self.session.patch(
-            self.url,
-            json=self.body,
-            params=self.params,
-        )
-
-        return self.formatted_response(response)
+        return self.formatted_response(self.request("patch"))
 
     def resolve_delete(self) -> list:
-        response = self.session.patch(
-            self.url,
-            json=self.body,
-            params=self.params,
+        return self.formatted_response(self.request("delete"))
+
+    def request(self, method: str) -> requests.models.Response:
+        """
+        Send the request and return as soon as the response headers
+        arrive, leaving the body unread on the socket.
+        """
+        with tracer.span("prepare"):
+            request = self.session.prepare_request(
+                requests.Request(
+                    method.upper(),
+                    self.url,
+                    headers=self.headers,
+                    json=None if self.upload else self.body,
+                    data=self.upload.stream(self.on_progress)
+                    if self.upload
+                    else None,
+                    params=self.params,
+                    cookies=self.cookie_jar(),
+                )
+            )
+        settings = self.session.merge_environment_settings(
+            request.url, {}, True, None, None
         )
+        settings["timeout"] = self.timeout
+        request.cancellation = self.cancellation
+        if self.upload:
+            request.headers["Content-Type"] = self.upload.content_type
+            request_size = self.upload.size
+        else:
+            request_size = len(request.body or b"")
+        self.prepared = request
+        if self.compression in compression.ENCODINGS and request.body:
+            self.compress_body(request)
+
+        entry = None
+        if self.cache and request.method == "GET":
+            entry = self.cache.lookup(request)
+            if entry and entry.fresh:
+                response = entry.to_response(request)
+                if response:
+                    self.timings = response.timings
+                    self.cache_status = "cache"
+                    self.response = response
+                    return response
+                # The file was evicted meanwhile, a miss after all
+                entry = None
+            if entry:
+                self.cache.revalidate(request, entry)
 
-        return self.formatted_response(response)
+        with tracer.span("network", url=request.url):
+            response = self.send(request, settings)
+        self.timings = response.timings
+        compression.decode_body(response)
+        if self.compression in compression.ENCODINGS and request.body:
+            sent_body = response.request.body
+            self.timings.request_encoding = self.compression
+            self.timings.request_size = request_size
+            self.timings.request_encoded = (
+                sent_body.encoded
+                if isinstance(sent_body, compression.CompressedStream)
+                else len(sent_body)
+            )
+        for each in [*response.history, response]:
+            self.response_cookies += list(each.cookies)
+
+        if entry and response.status_code == 304:
+            response.close()
+            self.cache.refresh(entry, response)
+            timings = self.timings
+            response = entry.to_response(request)
+            if not response:
+                # Nothing left to revalidate, the entry is gone by now
+                return self.request(method)
+            response.timings = self.timings = timings
+            self.cache_status = "revalidated"
+        elif self.cache and request.method == "GET":
+            if self.cache.store(request, response):
+                self.cache_status = "fresh"
+
+        self.response = response
+        return response
 
     def formatted_response(self, response: requests.models.Response) -> list:
+        """
+        Return [body, status, code type]. The body is pretty-printed
+        text, or a ResponseBody to be paged through when it grew past
+        the spill threshold.
+        """
+        status = self.status_of(response)
+
+        started = time.perf_counter()
+        body = ResponseBody(self.spill_threshold, response.encoding)
+        try:
+            with tracer.span("download"):
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    body.write(chunk)
+        except requests.exceptions.RequestException:
+            body.close()
+            self.cancellation.check()
+            raise
+        finally:
+            self.timings.download = time.perf_counter() - started
+            self.timings.received = response.raw.tell()
+            self.timings.decoded = body.size
+            self.__close(response)
+
+        if self.cancellation.cancelled:
+            # What arrived before the socket was shut down is incomplete
+            body.close()
+            self.cancellation.check()
+
+        if body.spilled:
+            body.finish()
+            return [body, status, self.code_type(response)]
+
+        response._content = body.getvalue()
+        with tracer.span("decode", size=len(response._content)):
+            if self.code_type(response) == "json":
+                return [pretty_json(response.content), status, "json"]
+            else:
+                return [response.text, status, "html"]
+
+    def iter_response(
+        self,
+        response: requests.models.Response,
+        stop_event: threading.Event,
+        body: ResponseBody,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> Iterator[tuple[str, int]]:
+        """
+        Yield decoded text chunks together with the amount of bytes
+        received so far, copying the raw bytes into body. Once body has
+        spilled to disk only empty chunks are yielded. The connection is
+        released as soon as the body ends, the stop event is set or the
+        send is cancelled.
+        """
+        decoder = codecs.getincrementaldecoder(
+            response.encoding or "utf-8"
+        )(errors="replace")
+        received = 0
+        started = time.perf_counter()
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if stop_event.is_set():
+                    break
+                received += len(chunk)
+                body.write(chunk)
+                text = "" if body.spilled else decoder.decode(chunk)
+                yield text, received
+            else:
+                if not body.spilled:
+                    yield decoder.decode(b"", final=True), received
+        except Exception:
+            # A cancelled send stops like a stopped one
+            if not self.cancellation.cancelled:
+                raise
+        finally:
+            self.timings.download = time.perf_counter() - started
+            self.timings.received = response.raw.tell()
+            self.timings.decoded = body.size
+            self.__close(response)
+            body.finish()
+
+    def iter_events(
+        self,
+        response: requests.models.Response,
+        stop_event: threading.Event,
+        event_format: str,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> Iterator[list]:
+        """
+        Yield the events completed by every read of a Server-Sent Events
+        or NDJSON body. Each read returns what already arrived instead of
+        waiting for a full chunk, so events show up as they are sent.
+        """
+        parser = EventParser(event_format, response.encoding)
+        received = 0
+        started = time.perf_counter()
+        try:
+            while not stop_event.is_set():
+                # Read past urllib3, whose errors are left untranslated
+                with body_errors():
+                    chunk = read_available(response.raw, chunk_size)
+                if not chunk:
+                    if events := parser.close():
+                        yield events
+                    break
+                received += len(chunk)
+                if events := parser.feed(chunk):
+                    yield events
+        except Exception:
+            if not self.cancellation.cancelled:
+                raise
+        finally:
+            self.timings.download = time.perf_counter() - started
+            self.timings.received = max(response.raw.tell(), received)
+            self.timings.decoded = received
+            self.__close(response)
+
+    def send(
+        self, request: requests.PreparedRequest, settings: dict
+    ) -> requests.models.Response:
+        """
+        Send once, or as many times as the retry policy asks. Raises
+        Cancelled, whatever the send failed with, once cancelled.
+        """
+        self.cancellation.check()
+        try:
+            if not self.retry:
+                return self.session.send(request, **settings)
+
+            response, self.attempts = self.retry.run(
+                lambda: self.__send_again(request, settings),
+                (
+                    requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout,
+                ),
+                urlparse(request.url).netloc,
+                self.cancellation,
+            )
+            return response
+        except requests.exceptions.RequestException:
+            self.cancellation.check()
+            raise
+
+    def __send_again(
+        self, request: requests.PreparedRequest, settings: dict
+    ) -> requests.models.Response:
+        self.cancellation.check()
+        return self.session.send(self.__fresh_copy(request), **settings)
+
+    def __close(self, response: requests.models.Response) -> None:
+        """Give the connection back, it no longer belongs to this send"""
+        self.cancellation.release()
+        response.close()
+
+    def __fresh_copy(
+        self, request: requests.PreparedRequest
+    ) -> requests.PreparedRequest:
+        """An identical request, with a streamed body read from the start"""
+        copy = request.copy()
+        copy.cancellation = self.cancellation
+        if self.upload:
+            copy.body = self.upload.stream(self.on_progress)
+            if self.compression in compression.ENCODINGS:
+                copy.body = compression.CompressedStream(
+                    copy.body, self.compression
+                )
+        return copy
+
+    def compress_body(self, request: requests.PreparedRequest) -> None:
+        """Send the body with the chosen Content-Encoding"""
+        body = request.body
+        request.headers["Content-Encoding"] = self.compression
+        if isinstance(body, (str, bytes)):
+            if isinstance(body, str):
+                body = body.encode()
+            request.body = compression.compress(body, self.compression)
+            request.prepare_content_length(request.body)
+        else:
+            # A streamed body is compressed while it is being sent
+            request.body = compression.CompressedStream(
+                body, self.compression
+            )
+            request.headers.pop("Content-Length", None)
+            request.headers["Transfer-Encoding"] = "chunked"
+
+    def cookie_jar(self) -> requests.cookies.RequestsCookieJar | None:
+        """
+        The saved cookies that apply to the URL, each scoped to its domain
+        and path, so a redirect only carries them where they belong
+        """
+        if not self.cookies:
+            return None
+
+        host = (urlparse(self.url).hostname or "").lower()
+        jar = requests.cookies.RequestsCookieJar()
+        for cookie in self.cookies.matching(self.url).values():
+            # Without a domain the cookie is the host's alone. http.cookiejar
+            # knows hosts without a dot, e.g. localhost, as localhost.local
+            domain = cookie.domain or host
+            if "." not in domain:
+                domain += ".local"
+            jar.set_cookie(
+                requests.cookies.create_cookie(
+                    cookie.name,
+                    cookie.value,
+                    domain=domain,
+                    path=cookie.path,
+                    expires=int(cookie.expires) if cookie.expires else None,
+                )
+            )
+        return jar
+
+    def status_of(self, response: requests.models.Response) -> str:
         status_code = response.status_code
         msg_status_code = requests.status_codes._codes[status_code][0]
-        status = f"{status_code} {msg_status_code}".title().replace("_", " ")
+        return f"{status_code} {msg_status_code}".title().replace("_", " ")
 
+    def code_type(self, response: requests.models.Response) -> str:
         if str(response.headers.get("content-type")).startswith(
             "application/json"
         ):
-            return [json.dumps(response.json(), indent=4), status, "json"]
-        else:
-            return [response.text, status, "html"]
-
-    def set_cookie_session(self) -> None:
-        for id, cookie in self.cookies.items():
-            cookie_dict = {}
-            cookie_content = str_to_dict_cookie(cookie)
-
-            cookie_dict["name"] = cookie_content["name"]
-            cookie_dict["value"] = cookie_content["value"]
-            if "domain" in cookie_content.keys():
-                cookie_dict["domain"] = cookie_content["domain"]
-            if "path" in cookie_content.keys():
-                cookie_dict["path"] = cookie_content["path"]
-            if "expires" in cookie_content.keys():
-                expires_str = cookie_content["expires"]
-                expires_datetime = datetime.datetime.strptime(
-                    expires_str, "%a, %d %b %Y %H:%M:%S %Z"
-                )
-                expires_unix = int(time.mktime(expires_datetime.timetuple()))
-                cookie_dict["expires"] = expires_unix
-
-            self.session.cookies.set(**cookie_dict)
+            return "json"
+        return "html"
 
     def set_auth(self) -> None:
-        auth_type = self.auths[0].props.selected_item.get_string()
+        auth_type = self.auths[0]
         auth_values = self.auths[1]
         match auth_type:
             case "Api Key":
@@ -123,16 +433,16 @@ class ResolveRequests:
                     return
 
                 if auth_values[auth_type][2] == "Query Parameters":
-                    self.params |= {
-                        auth_values[auth_type][0]: auth_values[auth_type][1]
-                    }
+                    key, value = auth_values[auth_type][:2]
+                    self.params |= {key: value}
+                    self.secret_params.append(key)
                 elif auth_values[auth_type][2] == "Header":
-                    self.session.headers.update(
-                        {auth_values[auth_type][0]: auth_values[auth_type][1]}
-                    )
+                    key, value = auth_values[auth_type][:2]
+                    self.headers[key] = value
+                    self.secret_headers.append(key)
             case "Bearer Token":
                 if not auth_values[auth_type][0]:
                     return
-                self.session.headers.update(
-                    {"Authorization": f"Bearer {auth_values[auth_type][0]}"}
+                self.headers["Authorization"] = (
+                    f"Bearer {auth_values[auth_type][0]}"
                 )
@@ -0,0 +1,215 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import collections
+import email.utils
+import queue
+import random
+import threading
+import time
+from typing import Callable
+
+from escambo.cancellation import Cancellation
+
+# Status codes retried unless the policy says otherwise
+RETRY_STATUSES = [429, 502, 503, 504]
+# Latencies remembered per host to work out when to hedge
+LATENCY_SAMPLES = 100
+# Fewer samples than this and no hedge is sent
+HEDGE_MIN_SAMPLES = 10
+# Never wait longer than this between attempts, Retry-After included
+MAX_DELAY = 60.0
+
+
+def parse_statuses(text: str) -> list:
+    """Status codes from a comma or space separated list"""
+    return [
+        int(word) for word in text.replace(",", " ").split() if word.isdigit()
+    ]
+
+
+def describe_attempts(attempts: list) -> str:
+    """One line with the outcome of every attempt, the winner marked"""
+    return " · ".join(
+        f"#{each.number}"
+        + (f" {_('hedge')}" if each.hedge else "")
+        + f" {each.outcome or '…'}"
+        + (" ✓" if each.won else "")
+        for each in attempts
+    )
+
+
+class LatencyTracker:
+    """Recent time to response headers of each host"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def record(self, host: str, latency: float) -> None:
+        with self._lock:
+            self._hosts.setdefault(
+                host, collections.deque(maxlen=LATENCY_SAMPLES)
+            ).append(latency)
+
+    def percentile(self, host: str, rank: float) -> float | None:
+        from escambo.benchmark import percentile
+
+        with self._lock:
+            latencies = sorted(self._hosts.get(host, []))
+        if len(latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        return percentile(latencies, rank)
+
+
+class Attempt:
+    """One send made on behalf of a request"""
+
+    def __init__(self, number: int, hedge: bool = False) -> None:
+        self.number = number
+        self.hedge = hedge
+        self.outcome = ""
+        self.won = False
+
+
+class RetryPolicy:
+    """
+    Retry failed sends with exponential backoff and full jitter,
+    honouring Retry-After, and optionally hedge: when a send has not
+    answered by the given latency percentile of its host, an identical
+    one is started and whichever answers first wins.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 1,
+        statuses: list = RETRY_STATUSES,
+        backoff: float = 0.5,
+        hedge_percentile: float = 0,
+        latencies: LatencyTracker = None,
+    ) -> None:
+        self.attempts = max(attempts, 1)
+        self.statuses = statuses
+        self.backoff = backoff
+        self.hedge_percentile = hedge_percentile
+        self.latencies = latencies or LatencyTracker()
+
+    def delay(self, retry: int, response=None) -> float:
+        """Seconds to wait before the retry-th retry"""
+        retry_after = response is not None and response.headers.get(
+            "retry-after"
+        )
+        if retry_after:
+            if retry_after.strip().isdigit():
+                return min(int(retry_after), MAX_DELAY)
+            try:
+                moment = email.utils.parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                pass
+            else:
+                wait = moment.timestamp() - time.time()
+                return min(max(wait, 0), MAX_DELAY)
+        backoff = min(self.backoff * 2 ** (retry - 1), MAX_DELAY)
+        return random.uniform(0, backoff)
+
+    def run(
+        self,
+        send: Callable,
+        errors: tuple,
+        host: str,
+        cancellation: Cancellation = None,
+    ) -> tuple:
+        """
+        Call send() until it returns a response worth keeping, retrying
+        on the given exceptions and on the retried status codes.
+        Return the response and the list of attempts made. Waiting for
+        the next attempt ends with Cancelled once cancellation is set.
+        """
+        cancellation = cancellation or Cancellation()
+        attempts = []
+        for retry in range(self.attempts):
+            last = retry == self.attempts - 1
+            try:
+                each, response = self.__send_hedged(
+                    send, errors, host, attempts
+                )
+            except errors:
+                if last:
+                    raise
+                cancellation.wait(self.delay(retry + 1))
+                continue
+
+            if last or response.status_code not in self.statuses:
+                each.won = True
+                return response, attempts
+            response.close()
+            cancellation.wait(self.delay(retry + 1, response))
+
+    def __send_hedged(
+        self, send: Callable, errors: tuple, host: str, attempts: list
+    ) -> tuple:
+        """Return the attempt that answered first and its response"""
+        hedge_after = None
+        if self.hedge_percentile:
+            hedge_after = self.latencies.percentile(
+                host, self.hedge_percentile
+            )
+
+        results = queue.Queue()
+
+        def attempt(each: Attempt) -> None:
+            started = time.perf_counter()
+            try:
+                response = send()
+            except Exception as error:
+                # Anything not retried is raised as well, see run()
+                each.outcome = type(error).__name__
+                results.put((each, None, error))
+                return
+            self.latencies.record(host, time.perf_counter() - started)
+            each.outcome = str(response.status_code)
+            results.put((each, response, None))
+
+        def start(hedge: bool) -> None:
+            attempts.append(Attempt(len(attempts) + 1, hedge))
+            thread = threading.Thread(target=attempt, args=(attempts[-1],))
+            thread.daemon = True
+            thread.start()
+
+        if hedge_after is None:
+            # Nothing to race against, send from this thread
+            attempts.append(Attempt(len(attempts) + 1))
+            attempt(attempts[-1])
+            each, response, error = results.get()
+            if error:
+                raise error
+            return each, response
+
+        start(False)
+        running = 1
+        try:
+            each, response, error = results.get(timeout=hedge_after)
+        except queue.Empty:
+            start(True)
+            running += 1
+            each, response, error = results.get()
+        running -= 1
+
+        # Only fail once neither of the two could answer
+        if error and running:
+            each, response, error = results.get()
+            running -= 1
+        if running:
+            threading.Thread(
+                target=self.__close_late, args=(results,), daemon=True
+            ).start()
+
+        if error:
+            raise error
+        return each, response
+
+    def __close_late(self, results: queue.Queue) -> None:
+        """The loser of a hedge still has its connection to give back"""
+        each, response, error = results.get()
+        if response is not None:
+            response.close()
@@ -1,6 +1,29 @@
 # Copyright 2022 Cleo Menezes Jr.
 from gi.repository import Adw, Gtk, GtkSource
 
+_language_manager = None
+_style_schemes = None
+
+
+def language_manager() -> GtkSource.LanguageManager:
+    """One language manager for every view and every response"""
+    global _language_manager
+    if _language_manager is None:
+        _language_manager = GtkSource.LanguageManager.get_default()
+    return _language_manager
+
+
+def style_schemes() -> tuple:
+    """The light and dark schemes, looked up once"""
+    global _style_schemes
+    if _style_schemes is None:
+        ssm = GtkSource.StyleSchemeManager.get_default()
+        _style_schemes = (
+            ssm.get_scheme("Adwaita"),
+            ssm.get_scheme("Adwaita-dark"),
+        )
+    return _style_schemes
+
 
 class SourceView(GtkSource.View):
     __gtype_name__ = "SourceView"
@@ -13,7 +36,7 @@ class SourceView(GtkSource.View):
         self.props.wrap_mode = Gtk.WrapMode.WORD_CHAR
         self.props.hexpand = True
 
-        self._lm = GtkSource.LanguageManager()
+        self._lm = language_manager()
         self.lang = "json"
         language = self._lm.get_language(self.lang)
 
@@ -21,9 +44,7 @@ class SourceView(GtkSource.View):
         self.text_buffer.set_highlight_matching_brackets(True)
         self.text_buffer.set_language(language)
 
-        ssm = GtkSource.StyleSchemeManager()
-        self._adwaita = ssm.get_scheme("Adwaita")
-        self._adwaita_dark = ssm.get_scheme("Adwaita-dark")
+        self._adwaita, self._adwaita_dark = style_schemes()
 
         style_manager = Adw.StyleManager.get_default()
         style_manager.connect("notify::dark", self._on_dark_style)
@@ -0,0 +1,34 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import sys
+import time
+
+# Set ESCAMBO_STARTUP_TIMING=1 to print where the startup time goes
+ENABLED = bool(os.environ.get("ESCAMBO_STARTUP_TIMING"))
+
+_started = time.perf_counter()
+_marks = []
+
+
+def mark(label: str) -> None:
+    """Note that a startup phase just ended"""
+    if ENABLED:
+        _marks.append((label, time.perf_counter()))
+
+
+def report() -> None:
+    """Print each phase and the running total, once"""
+    if not ENABLED or not _marks:
+        return
+
+    previous = _started
+    for label, moment in _marks:
+        print(
+            f"{label:<20} {(moment - previous) * 1000:8.1f} ms"
+            f" {(moment - _started) * 1000:8.1f} ms",
+            file=sys.stderr,
+        )
+        previous = moment
+    _marks.clear()
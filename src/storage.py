@@ -0,0 +1,186 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+import os
+import sqlite3
+import threading
+
+# Same directory as GLib.get_user_config_dir(), without importing GLib
+CONFIG_DIR = os.path.join(
+    os.environ.get("XDG_CONFIG_HOME")
+    or os.path.join(os.path.expanduser("~"), ".config"),
+    "escambo",
+)
+DATABASE = os.path.join(CONFIG_DIR, "overrides.db")
+
+# Override kinds and the JSON files they were kept in before
+COOKIES = "cookies"
+BODY = "body"
+PARAM = "parameters"
+HEADERS = "headers"
+AUTHS = "auths"
+KINDS = [COOKIES, BODY, PARAM, HEADERS, AUTHS]
+
+DEFAULT_AUTHS = {"Api Key": ["", "", "Header"], "Bearer Token": [""]}
+
+
+class OverrideStore:
+    """
+    SQLite database holding every saved override as its own row, so an
+    edit only writes the record that changed.
+    """
+
+    def __init__(self, path: str = DATABASE) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS overrides ("
+                " kind TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " PRIMARY KEY (kind, key))"
+            )
+
+        self.__migrate_json_files(os.path.dirname(path))
+        for auth_type, value in DEFAULT_AUTHS.items():
+            if auth_type not in self.load(AUTHS):
+                self.put(AUTHS, auth_type, value)
+
+    def load(self, kind: str) -> dict:
+        """Return every override of a kind in insertion order"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT key, value FROM overrides WHERE kind = ? "
+                "ORDER BY rowid",
+                (kind,),
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def put(self, kind: str, key: str, value) -> None:
+        self.write([(kind, key, value)], [])
+
+    def put_many(self, records: list) -> None:
+        self.write(records, [])
+
+    def delete(self, kind: str, key: str) -> None:
+        self.write([], [(kind, key)])
+
+    def write(self, records: list, deletions: list) -> None:
+        """
+        Insert or replace (kind, key, value) records and remove
+        (kind, key) pairs, all in one transaction.
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO overrides (kind, key, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (kind, key) DO UPDATE SET value = excluded.value",
+                [
+                    (kind, key, json.dumps(value))
+                    for kind, key, value in records
+                ],
+            )
+            self._connection.executemany(
+                "DELETE FROM overrides WHERE kind = ? AND key = ?",
+                deletions,
+            )
+
+    def flush(self) -> None:
+        """Writes are immediate, see WriteBehindStore"""
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __migrate_json_files(self, directory: str) -> None:
+        """Import the JSON files used by older versions, once"""
+        for kind in KINDS:
+            json_path = os.path.join(directory, f"{kind}.json")
+            if not os.path.exists(json_path):
+                continue
+
+            try:
+                with open(json_path, "r") as json_file:
+                    overrides = json.load(json_file)
+            except ValueError:
+                overrides = {}
+
+            self.put_many(
+                [(kind, key, value) for key, value in overrides.items()]
+            )
+            self.flush()
+            os.replace(json_path, f"{json_path}.migrated")
+
+
+class WriteBehindStore(OverrideStore):
+    """
+    OverrideStore whose writes are queued and flushed by a background
+    thread, coalescing every change made within FLUSH_INTERVAL.
+    """
+
+    FLUSH_INTERVAL = 0.3
+
+    def __init__(self, path: str = DATABASE) -> None:
+        self._pending = {}
+        self._condition = threading.Condition()
+        # Held from taking the pending writes until they are committed,
+        # so two flushes can't commit the same key out of order
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        super().__init__(path)
+
+        self._writer = threading.Thread(target=self.__write_behind)
+        self._writer.daemon = True
+        self._writer.start()
+
+    def load(self, kind: str) -> dict:
+        self.flush()
+        return super().load(kind)
+
+    def write(self, records: list, deletions: list) -> None:
+        with self._condition:
+            for kind, key, value in records:
+                self._pending[(kind, key)] = (True, value)
+            for kind, key in deletions:
+                self._pending[(kind, key)] = (False, None)
+            self._condition.notify()
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._condition:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+
+            records, deletions = [], []
+            for (kind, key), (exists, value) in pending.items():
+                if exists:
+                    records.append((kind, key, value))
+                else:
+                    deletions.append((kind, key))
+            super().write(records, deletions)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._writer.join()
+        self.flush()
+        super().close()
+
+    def __write_behind(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._pending or self._closed
+                )
+                # Let more edits pile up before touching the disk
+                if self._condition.wait_for(
+                    lambda: self._closed, self.FLUSH_INTERVAL
+                ):
+                    return
+            self.flush()
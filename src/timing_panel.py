@@ -0,0 +1,88 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from gi.repository import Gdk, GLib, Gtk
+
+
+class TimingPanel(Gtk.Grid):
+    """Waterfall of the phases of the last send"""
+
+    __gtype_name__ = "TimingPanel"
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.props.row_spacing = 6
+        self.props.column_spacing = 12
+        self.props.margin_start = 6
+        self.props.margin_end = 6
+
+    def set_timings(self, timings: "Timings") -> None:
+        while child := self.get_first_child():
+            self.remove(child)
+
+        total = timings.total or 1
+        offset = 0.0
+        for row, (name, duration) in enumerate(timings.phases()):
+            self.__add_label(name, 0, row, "dim-label")
+
+            bar = Gtk.DrawingArea(hexpand=True, content_height=12)
+            bar.set_draw_func(
+                self._draw_bar, offset / total, (offset + duration) / total
+            )
+            self.attach(bar, 1, row, 1, 1)
+
+            self.__add_label(f"{duration * 1000:.1f} ms", 2, row, "numeric")
+            offset += duration
+
+        row = len(timings.phases())
+        self.__add_label(_("Total"), 0, row, "heading")
+        self.__add_label(f"{timings.total * 1000:.1f} ms", 2, row, "numeric")
+        self.__add_label(_("Received"), 0, row + 1, "dim-label")
+        self.__add_label(
+            GLib.format_size(timings.received), 2, row + 1, "numeric"
+        )
+
+        row += 2
+        if timings.protocol:
+            self.__add_label(_("Protocol"), 0, row, "dim-label")
+            self.__add_label(timings.protocol, 2, row, "numeric")
+            row += 1
+        if timings.content_encoding:
+            self.__add_label(_("Decoded"), 0, row, "dim-label")
+            self.__add_label(
+                f"{GLib.format_size(timings.decoded)}"
+                f" · {timings.content_encoding}",
+                2,
+                row,
+                "numeric",
+            )
+            self.__add_label(_("Decompression"), 0, row + 1, "dim-label")
+            self.__add_label(
+                f"{timings.decompress * 1000:.1f} ms", 2, row + 1, "numeric"
+            )
+            row += 2
+        if timings.request_encoding:
+            self.__add_label(_("Request Body"), 0, row, "dim-label")
+            self.__add_label(
+                f"{GLib.format_size(timings.request_size)}"
+                f" → {GLib.format_size(timings.request_encoded)}"
+                f" · {timings.request_encoding}",
+                2,
+                row,
+                "numeric",
+            )
+
+    def __add_label(self, text: str, column: int, row: int, style: str):
+        label = Gtk.Label(label=text, xalign=0 if column == 0 else 1)
+        label.add_css_class(style)
+        self.attach(label, column, row, 1, 1)
+
+    def _draw_bar(self, area, cr, width, height, start, end) -> None:
+        found, color = area.get_style_context().lookup_color("accent_color")
+        if found:
+            Gdk.cairo_set_source_rgba(cr, color)
+        cr.rectangle(
+            start * width, 0, max((end - start) * width, 1), height
+        )
+        cr.fill()
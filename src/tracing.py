@@ -0,0 +1,193 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import Callable
+
+# Set ESCAMBO_TRACE to a file name to record where the time of every send
+# goes. Names ending in .jsonl get one span per line, anything else is a
+# Chrome trace, to be opened in chrome://tracing or ui.perfetto.dev.
+TRACE_FILE = os.environ.get("ESCAMBO_TRACE")
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+class Span:
+    """A named stage of a send, timed from enter to exit"""
+
+    def __init__(self, tracer: "Tracer", name: str, args: dict) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = 0.0
+        self.duration = 0.0
+        self.thread = 0
+        self.thread_name = ""
+
+    def __enter__(self) -> "Span":
+        thread = threading.current_thread()
+        self.thread = thread.ident
+        self.thread_name = thread.name
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, error_type, error, traceback) -> None:
+        self.duration = time.perf_counter() - self.start
+        if error_type:
+            self.args["error"] = error_type.__name__
+        self.tracer.emit(self)
+
+
+class Tracer:
+    """
+    Hands each finished span to the hooks. Without hooks nothing is
+    timed, so the spans left in the send path cost next to nothing.
+    """
+
+    def __init__(self) -> None:
+        self.hooks = []
+        self.origin = time.perf_counter()
+
+    def add_hook(self, hook: Callable[[Span], None]) -> None:
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[Span], None]) -> None:
+        self.hooks.remove(hook)
+
+    def span(self, name: str, **args):
+        if not self.hooks:
+            return _NO_SPAN
+        return Span(self, name, args)
+
+    def traced(self, name: str, function: Callable) -> Callable:
+        """function, running inside a span of its own when tracing"""
+        if not self.hooks:
+            return function
+
+        def wrapper(*args, **kwargs):
+            with self.span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    def emit(self, span: Span) -> None:
+        for hook in self.hooks:
+            hook(span)
+
+    def flush(self) -> None:
+        """Let the hooks write what they collected so far"""
+        for hook in self.hooks:
+            if hasattr(hook, "flush"):
+                hook.flush()
+
+    def close(self) -> None:
+        self.flush()
+        for hook in self.hooks:
+            if hasattr(hook, "close"):
+                hook.close()
+        self.hooks.clear()
+
+
+class JsonLinesExporter:
+    """Append every span to a file as a line of JSON"""
+
+    def __init__(self, path: str, origin: float) -> None:
+        self.origin = origin
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, span: Span) -> None:
+        line = json.dumps(
+            {
+                "name": span.name,
+                "start": round((span.start - self.origin) * 1000, 3),
+                "duration": round(span.duration * 1000, 3),
+                "thread": span.thread_name,
+                "args": span.args,
+            },
+            default=str,
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class ChromeTraceExporter:
+    """
+    Keep the spans as Chrome trace events and rewrite the file on every
+    flush, so it is complete and valid after each send.
+    """
+
+    def __init__(self, path: str, origin: float) -> None:
+        self.path = path
+        self.origin = origin
+        self._lock = threading.Lock()
+        # Held across the write and the rename, so flushes from two sends
+        # never share the temporary file
+        self._flush_lock = threading.Lock()
+        self._events = []
+        self._threads = set()
+
+    def __call__(self, span: Span) -> None:
+        pid = os.getpid()
+        with self._lock:
+            if span.thread not in self._threads:
+                self._threads.add(span.thread)
+                self._events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": pid,
+                        "tid": span.thread,
+                        "args": {"name": span.thread_name},
+                    }
+                )
+            self._events.append(
+                {
+                    "name": span.name,
+                    "cat": "escambo",
+                    "ph": "X",
+                    "ts": (span.start - self.origin) * 1_000_000,
+                    "dur": span.duration * 1_000_000,
+                    "pid": pid,
+                    "tid": span.thread,
+                    "args": span.args,
+                }
+            )
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                events = list(self._events)
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w", encoding="utf-8") as trace_file:
+                json.dump(
+                    {"traceEvents": events, "displayTimeUnit": "ms"},
+                    trace_file,
+                    default=str,
+                )
+            os.replace(temporary, self.path)
+
+
+def export_to(path: str) -> None:
+    """Record spans into path, in the format its name asks for"""
+    if path.endswith(".jsonl"):
+        tracer.add_hook(JsonLinesExporter(path, tracer.origin))
+    else:
+        tracer.add_hook(ChromeTraceExporter(path, tracer.origin))
+
+
+tracer = Tracer()
+if TRACE_FILE:
+    export_to(TRACE_FILE)
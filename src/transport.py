@@ -0,0 +1,468 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import contextlib
+import http.client
+import socket
+import threading
+import time
+from typing import Callable
+from urllib.parse import urlparse, urlsplit
+
+import requests
+import urllib3
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from urllib3.util.connection import allowed_gai_family
+
+# Timings and Cancellation of the send running in the current thread,
+# see PooledAdapter
+_local = threading.local()
+
+# Version numbers used by http.client and urllib3
+HTTP_VERSIONS = {10: "HTTP/1.0", 11: "HTTP/1.1"}
+# Seconds resolved addresses are reused, getaddrinfo doesn't tell the TTL
+DNS_TTL = 60
+# Hosts remembered at most by the DNS cache
+DNS_ENTRIES = 256
+# Seconds a preconnect may take to open its connection
+PRECONNECT_TIMEOUT = 10
+
+
+class Timings:
+    """Duration in seconds of each phase of a single send"""
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.dns = 0.0
+        self.connect = 0.0
+        self.tls = 0.0
+        self.first_byte = 0.0
+        self.download = 0.0
+        # Body bytes read from the socket, before any decoding
+        self.received = 0
+        # Body bytes once decoded, and the time spent decoding them
+        self.decoded = 0
+        self.decompress = 0.0
+        self.content_encoding = ""
+        # Request body size before and after it was compressed
+        self.request_encoding = ""
+        self.request_size = 0
+        self.request_encoded = 0
+        # Negotiated protocol, such as "HTTP/1.1" or "HTTP/2"
+        self.protocol = ""
+        self.new_connection = False
+
+    def headers_received(self) -> None:
+        elapsed = time.perf_counter() - self.start
+        self.first_byte = elapsed - self.dns - self.connect - self.tls
+
+    def phases(self) -> list[tuple[str, float]]:
+        return [
+            (_("DNS"), self.dns),
+            (_("Connect"), self.connect),
+            (_("TLS"), self.tls),
+            (_("Waiting"), self.first_byte),
+            (_("Download"), self.download),
+        ]
+
+    @property
+    def total(self) -> float:
+        return sum(duration for name, duration in self.phases())
+
+
+@contextlib.contextmanager
+def body_errors():
+    """
+    Raise what reading a response body failed with as the requests
+    exception Response.iter_content would have raised. It only does so
+    for urllib3 responses, not for the stand-ins that wrap them.
+    """
+    try:
+        yield
+    except requests.exceptions.RequestException:
+        raise
+    except (ReadTimeoutError, TimeoutError) as error:
+        raise requests.exceptions.ConnectionError(error)
+    except urllib3.exceptions.SSLError as error:
+        raise requests.exceptions.SSLError(error)
+    except urllib3.exceptions.DecodeError as error:
+        raise requests.exceptions.ContentDecodingError(error)
+    except (ProtocolError, http.client.HTTPException, OSError) as error:
+        raise requests.exceptions.ChunkedEncodingError(error)
+
+
+class DnsCache:
+    """
+    Addresses of the hosts resolved lately, so new connections to them
+    skip the lookup. One cache serves every connection of the process.
+    """
+
+    def __init__(self, ttl: float = DNS_TTL) -> None:
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def resolve(self, host: str, port: int, family: int) -> list:
+        key = (host, port, family)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+
+        addresses = socket.getaddrinfo(host, port, family, socket.SOCK_STREAM)
+        with self._lock:
+            self.misses += 1
+            if self.ttl > 0:
+                if len(self._entries) >= DNS_ENTRIES:
+                    self.__prune(now)
+                self._entries[key] = (now + self.ttl, addresses)
+        return addresses
+
+    def forget(self, host: str) -> None:
+        """Drop the addresses of host, they may no longer be right"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == host]:
+                del self._entries[key]
+
+    def set_ttl(self, ttl: float) -> None:
+        with self._lock:
+            self.ttl = ttl
+            self._entries.clear()
+
+    def describe(self) -> str:
+        with self._lock:
+            hits, lookups = self.hits, self.hits + self.misses
+        if not lookups:
+            return "—"
+        return _("{rate}% hits · {hits} of {lookups}").format(
+            rate=round(hits / lookups * 100), hits=hits, lookups=lookups
+        )
+
+    def __prune(self, now: float) -> None:
+        for key, (expires, _addresses) in list(self._entries.items()):
+            if expires <= now:
+                del self._entries[key]
+        # Still full, the oldest entry goes
+        if len(self._entries) >= DNS_ENTRIES:
+            del self._entries[next(iter(self._entries))]
+
+
+dns_cache = DnsCache()
+
+
+class _TrackedConnection:
+    """Record DNS and TCP connect time whenever a new socket is opened"""
+
+    def _new_conn(self):
+        timings = getattr(_local, "timings", Timings())
+        started = time.perf_counter()
+        addresses = dns_cache.resolve(
+            self._dns_host, self.port, allowed_gai_family()
+        )
+        resolved = time.perf_counter()
+
+        # Connect to the already resolved addresses, in order
+        host = self._dns_host
+        try:
+            for position, address in enumerate(addresses):
+                self._dns_host = address[4][0]
+                try:
+                    sock = super()._new_conn()
+                    break
+                except Exception:
+                    if position == len(addresses) - 1:
+                        # Cached addresses may have gone stale
+                        dns_cache.forget(host)
+                        raise
+        finally:
+            self._dns_host = host
+
+        timings.dns = resolved - started
+        timings.connect = time.perf_counter() - resolved
+        timings.new_connection = True
+
+        cancellation = getattr(_local, "cancellation", None)
+        if cancellation and cancellation.cancelled:
+            # Cancelled while connecting, the socket was not attached yet
+            sock.close()
+            raise ConnectionAbortedError(_("Cancelled"))
+        return sock
+
+    def request(self, *args, **kwargs):
+        self.__attach()
+        return super().request(*args, **kwargs)
+
+    def request_chunked(self, *args, **kwargs):
+        # Chunked bodies take this path with urllib3 1.x
+        self.__attach()
+        return super().request_chunked(*args, **kwargs)
+
+    def __attach(self) -> None:
+        cancellation = getattr(_local, "cancellation", None)
+        if cancellation:
+            cancellation.attach(self)
+
+
+class TrackedHTTPConnection(_TrackedConnection, HTTPConnection):
+    pass
+
+
+class TrackedHTTPSConnection(_TrackedConnection, HTTPSConnection):
+    def connect(self) -> None:
+        started = time.perf_counter()
+        super().connect()
+        timings = getattr(_local, "timings", Timings())
+        timings.tls = (
+            time.perf_counter() - started - timings.dns - timings.connect
+        )
+
+
+class TrackedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TrackedHTTPConnection
+
+
+class TrackedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TrackedHTTPSConnection
+
+
+class ConnectionStats:
+    """Per-host count of sends served by new and by reused connections"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def record(self, host: str, new_connection: bool) -> None:
+        with self._lock:
+            counters = self._hosts.setdefault(host, [0, 0])
+            counters[0 if new_connection else 1] += 1
+
+    def get(self, host: str) -> tuple[int, int]:
+        with self._lock:
+            new, reused = self._hosts.get(host, (0, 0))
+        return new, reused
+
+    def describe(self, host: str) -> str:
+        new, reused = self.get(host)
+        return _("{new} new · {reused} reused").format(new=new, reused=reused)
+
+
+class DrainingAdapter(BaseAdapter):
+    """
+    Adapter that counts the sends using it, so that once replaced it is
+    only closed after the last of them is over. Sends hold it from
+    acquire() to release().
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self._users = 0
+        self._retired = False
+        self._users_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def acquire(self) -> None:
+        with self._users_lock:
+            self._users += 1
+
+    def release(self) -> None:
+        with self._users_lock:
+            self._users -= 1
+            idle = self._retired and not self._users
+        if idle:
+            self.close()
+
+    def retire(self) -> None:
+        """Close now if unused, or else when the last send releases it"""
+        with self._users_lock:
+            self._retired = True
+            idle = not self._users
+        if idle:
+            self.close()
+
+
+def _detaching(method: Callable, cancellation, connection) -> Callable:
+    """method, detaching connection from cancellation before it runs"""
+
+    def detach_first(*args, **kwargs):
+        cancellation.detach(connection)
+        return method(*args, **kwargs)
+
+    return detach_first
+
+
+class PooledAdapter(DrainingAdapter, HTTPAdapter):
+    """
+    A send only holds the adapter until the response headers arrive.
+    Closing the pools later leaves a connection that is still reading
+    its body alone, urllib3 closes it once it is given back.
+    """
+
+    def __init__(self, stats: ConnectionStats, **kwargs) -> None:
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TrackedHTTPConnectionPool,
+            "https": TrackedHTTPSConnectionPool,
+        }
+
+    def send(self, request, *args, **kwargs) -> requests.models.Response:
+        timings = _local.timings = Timings()
+        _local.cancellation = getattr(request, "cancellation", None)
+        self.acquire()
+        try:
+            response = super().send(request, *args, **kwargs)
+        finally:
+            self.release()
+            del _local.timings, _local.cancellation
+            self.stats.record(
+                urlparse(request.url).netloc, timings.new_connection
+            )
+
+        timings.headers_received()
+        timings.protocol = HTTP_VERSIONS.get(response.raw.version, "")
+        response.timings = timings
+        return response
+
+    def build_response(self, req, resp) -> requests.models.Response:
+        cancellation = getattr(_local, "cancellation", None)
+        connection = resp.connection
+        if cancellation and connection:
+            # The connection goes back to the pool, or is closed, with its
+            # response. Past that point it may serve another send, which
+            # cancelling this one must leave alone
+            resp.release_conn = _detaching(
+                resp.release_conn, cancellation, connection
+            )
+            resp.close = _detaching(resp.close, cancellation, connection)
+        return super().build_response(req, resp)
+
+
+class Transport:
+    """
+    Long-lived connection pools shared by every send, so connections are
+    kept alive and repeated requests to a host skip the TCP/TLS setup.
+    """
+
+    def __init__(self, pool_size: int = 10, http2: bool = False) -> None:
+        self.stats = ConnectionStats()
+        self.session = requests.Session()
+        self.http2 = http2
+        self.set_pool_size(pool_size)
+
+    def set_pool_size(self, pool_size: int) -> None:
+        """
+        Mount fresh adapters keeping up to pool_size sockets per host.
+        The old ones are closed once the sends using them are over.
+        """
+        self.pool_size = pool_size
+        for scheme in ("http://", "https://"):
+            if scheme == "https://" and self.http2:
+                from escambo.http2 import Http2Adapter
+
+                new_adapter = Http2Adapter(self.stats, pool_size)
+            else:
+                new_adapter = PooledAdapter(
+                    self.stats, pool_maxsize=pool_size
+                )
+
+            adapter = self.session.adapters.get(scheme)
+            self.session.mount(scheme, new_adapter)
+            if isinstance(adapter, DrainingAdapter):
+                adapter.retire()
+            elif adapter:
+                # Mounted by requests.Session, never used
+                adapter.close()
+
+    def set_http2(self, http2: bool) -> None:
+        """
+        Send https:// requests over HTTP/2 when the server offers it.
+        Raises ValueError, keeping HTTP/1.1, if httpx is missing.
+        """
+        self.http2 = http2
+        try:
+            self.set_pool_size(self.pool_size)
+        except ValueError:
+            self.http2 = False
+            raise
+
+    def preconnect(self, url: str, connect: bool = True) -> None:
+        """
+        Resolve the host of url and, with connect, open a connection to
+        it, TLS handshake included, for the next send to reuse. Errors
+        are left for that send to report.
+        """
+        parts = urlsplit(url)
+        if not parts.hostname:
+            return
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        try:
+            dns_cache.resolve(parts.hostname, port, allowed_gai_family())
+            if connect:
+                self.__open_connection(url)
+        except (OSError, ValueError, urllib3.exceptions.HTTPError):
+            pass
+
+    def __open_connection(self, url: str) -> None:
+        adapter = self.session.get_adapter(url)
+        if not isinstance(adapter, PooledAdapter):
+            # httpx keeps connections of its own
+            return
+
+        # The same pool the send will take its connection from
+        verify = self.session.merge_environment_settings(
+            url, {}, None, None, None
+        )["verify"]
+        if hasattr(adapter, "get_connection_with_tls_context"):
+            pool = adapter.get_connection_with_tls_context(
+                requests.Request("GET", url).prepare(), verify
+            )
+        else:
+            pool = adapter.get_connection(url)
+            adapter.cert_verify(pool, url, verify, None)
+
+        # urllib3 has no public way to open a connection ahead of a
+        # request, and a HEAD would reach the server's logic. The
+        # Flatpak manifest pins urllib3, whose pools have had these two
+        # private methods throughout 1.26 and 2.x. Should they go away,
+        # preconnect falls back to warming up the DNS cache only.
+        if not (hasattr(pool, "_get_conn") and hasattr(pool, "_put_conn")):
+            return
+        connection = pool._get_conn()
+        if connection.sock is not None:
+            # Already open and waiting in the pool
+            pool._put_conn(connection)
+            return
+        connection.timeout = PRECONNECT_TIMEOUT
+        try:
+            connection.connect()
+        except BaseException:
+            connection.close()
+            pool._put_conn(None)
+            raise
+        pool._put_conn(connection)
+
+    def request_session(self) -> requests.Session:
+        """
+        A session for one request, with headers, cookies and redirects of
+        its own on top of the shared adapters. Concurrent sends can't see
+        each other's state and still reuse the pooled connections. Don't
+        close it, that would close the shared pools too.
+        """
+        session = requests.Session()
+        for adapter in session.adapters.values():
+            adapter.close()
+        session.adapters = self.session.adapters
+        return session
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,101 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import mimetypes
+import os
+import uuid
+from typing import Callable
+
+# Read from disk this much at a time, whatever the size of the file
+CHUNK_SIZE = 1024 * 1024
+
+# Same order as the upload mode drop-down
+RAW = "raw"
+CHUNKED = "chunked"
+MULTIPART = "multipart"
+MODES = [RAW, CHUNKED, MULTIPART]
+
+
+class FileUpload:
+    """
+    A file sent as the request body. Every send gets its own stream,
+    which reads the file one chunk at a time instead of loading it.
+    """
+
+    def __init__(self, path: str, mode: str = RAW, field: str = "file"):
+        self.path = path
+        self.mode = mode
+        self.field = field
+        self.size = os.path.getsize(path)
+        self.boundary = uuid.uuid4().hex
+
+    @property
+    def content_type(self) -> str:
+        if self.mode == MULTIPART:
+            return f"multipart/form-data; boundary={self.boundary}"
+        return self.file_type
+
+    @property
+    def file_type(self) -> str:
+        return (
+            mimetypes.guess_type(self.path)[0] or "application/octet-stream"
+        )
+
+    def stream(self, on_progress: Callable = None):
+        """
+        A fresh body for requests. Raw and multipart streams know their
+        length and are sent with Content-Length, a chunked one has no
+        length so it goes out with Transfer-Encoding: chunked.
+        """
+        if self.mode == MULTIPART:
+            return _MultipartStream(self, on_progress)
+        if self.mode == CHUNKED:
+            return _FileStream(self, on_progress)
+        return _SizedFileStream(self, on_progress)
+
+
+class _FileStream:
+    def __init__(self, upload: FileUpload, on_progress: Callable) -> None:
+        self.upload = upload
+        self.on_progress = on_progress
+        self.sent = 0
+
+    def __iter__(self):
+        yield from self._read_file()
+
+    def _read_file(self):
+        with open(self.upload.path, "rb") as file:
+            while chunk := file.read(CHUNK_SIZE):
+                self.sent += len(chunk)
+                if self.on_progress:
+                    self.on_progress(self.sent, self.upload.size)
+                yield chunk
+
+
+class _SizedFileStream(_FileStream):
+    def __len__(self) -> int:
+        return self.upload.size
+
+
+class _MultipartStream(_FileStream):
+    """The file as the single part of a multipart/form-data body"""
+
+    def __init__(self, upload: FileUpload, on_progress: Callable) -> None:
+        super().__init__(upload, on_progress)
+        name = os.path.basename(upload.path).replace('"', "%22")
+        self.head = (
+            f"--{upload.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{upload.field}"; '
+            f'filename="{name}"\r\n'
+            f"Content-Type: {upload.file_type}\r\n"
+            "\r\n"
+        ).encode()
+        self.tail = f"\r\n--{upload.boundary}--\r\n".encode()
+
+    def __len__(self) -> int:
+        return len(self.head) + self.upload.size + len(self.tail)
+
+    def __iter__(self):
+        yield self.head
+        yield from self._read_file()
+        yield self.tail
@@ -17,7 +17,8 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-import html
+import collections
+import email.utils
 import json
 import os
 import threading
@@ -25,23 +26,56 @@ from datetime import datetime as dt
 from typing import Callable
 from urllib.parse import urlparse
 
-from escambo.common_scripts import has_parameter, is_valid_url
-from escambo.date_row import DateRow
-from escambo.dialog_body import BodyDialog
-from escambo.dialog_cookies import CookieDialog
-from escambo.dialog_headers import HeaderDialog
+from escambo.cancellation import Cancellation, Cancelled
+from escambo.common_scripts import stringfy_cookie
+from escambo.cookie_jar import CookieJar
+from escambo.event_list import EventList
+from escambo.events import event_format
+from escambo.history import HistoryStore, body_text
+from escambo.override_list import OverrideList
 from escambo.populator_entry import PopulatorEntry
-from escambo.restapi import ResolveRequests
-from escambo.sourceview import SourceView
+from escambo.request_model import RequestModel
+from escambo.retry import (
+    LatencyTracker,
+    RetryPolicy,
+    describe_attempts,
+    parse_statuses,
+)
+from escambo.response_body import ResponseBody
+from escambo import startup
+from escambo.sourceview import SourceView, language_manager
+from escambo.storage import (
+    AUTHS,
+    BODY,
+    COOKIES,
+    HEADERS,
+    PARAM,
+    WriteBehindStore,
+)
+from escambo.timing_panel import TimingPanel
+from escambo.tracing import tracer
+from escambo.upload import MODES, FileUpload
 from gi.repository import Adw, Gio, GLib, Gtk
-from requests import Session, exceptions
 
 # constants
-COOKIES = os.path.join(GLib.get_user_config_dir(), "escambo", "cookies.json")
-BODY = os.path.join(GLib.get_user_config_dir(), "escambo", "body.json")
-PARAM = os.path.join(GLib.get_user_config_dir(), "escambo", "parameters.json")
-HEADERS = os.path.join(GLib.get_user_config_dir(), "escambo", "headers.json")
-AUTHS = os.path.join(GLib.get_user_config_dir(), "escambo", "auths.json")
+# Streamed text is handed to the main loop in batches of this size and
+# no more than STREAM_PENDING_BATCHES may be waiting at the same time
+STREAM_BATCH_SIZE = 256 * 1024
+STREAM_PENDING_BATCHES = 4
+CACHE_STATUS = {
+    "cache": _("Served from cache"),
+    "revalidated": _("Revalidated"),
+    "fresh": _("Fresh, stored in cache"),
+    None: _("Not cached"),
+}
+# Milliseconds without typing before the URL preview is refreshed
+URL_SETTLE_DELAY = 150
+# Milliseconds without typing before the host of the URL is preconnected
+PRECONNECT_DELAY = 500
+# Above this many characters the response is not highlighted by default
+HIGHLIGHT_LIMIT = 512 * 1024
+# Same order as the entry_method model
+METHODS = ["get", "post", "put", "patch", "delete"]
 
 
 @Gtk.Template(resource_path="/io/github/cleomenezesjr/Escambo/gtk/window.ui")
@@ -58,10 +92,23 @@ class EscamboWindow(Adw.ApplicationWindow):
     response_stack = Gtk.Template.Child()
     response_page = Gtk.Template.Child()
     response_page_header = Gtk.Template.Child()
+    btn_stop_response = Gtk.Template.Child()
+    btn_highlight = Gtk.Template.Child()
+    response_pager = Gtk.Template.Child()
+    label_response_page = Gtk.Template.Child()
+    btn_previous_page = Gtk.Template.Child()
+    btn_next_page = Gtk.Template.Child()
+    row_connections = Gtk.Template.Child()
+    row_cache = Gtk.Template.Child()
+    row_attempts = Gtk.Template.Child()
+    row_dns_cache = Gtk.Template.Child()
+    timing_panel: TimingPanel = Gtk.Template.Child()
     raw_page_body = Gtk.Template.Child()
     form_data_page_body = Gtk.Template.Child()
 
     response_source_view: SourceView = Gtk.Template.Child()
+    response_view = Gtk.Template.Child()
+    event_list: EventList = Gtk.Template.Child()
     raw_source_view_body: SourceView = Gtk.Template.Child()
 
     home = Gtk.Template.Child()
@@ -72,25 +119,37 @@ class EscamboWindow(Adw.ApplicationWindow):
 
     expander_row_body = Gtk.Template.Child()
     create_new_body = Gtk.Template.Child()
-    group_overrides_body = Gtk.Template.Child()
+    group_overrides_body: OverrideList = Gtk.Template.Child()
     counter_label_form_data_body = Gtk.Template.Child()
+    row_upload_file = Gtk.Template.Child()
+    btn_clear_upload = Gtk.Template.Child()
+    upload_mode = Gtk.Template.Child()
+    upload_progress = Gtk.Template.Child()
+    expander_row_retry = Gtk.Template.Child()
+    spin_retry_attempts = Gtk.Template.Child()
+    entry_retry_statuses = Gtk.Template.Child()
+    spin_retry_backoff = Gtk.Template.Child()
+    spin_hedge_percentile = Gtk.Template.Child()
+    spin_connect_timeout = Gtk.Template.Child()
+    spin_read_timeout = Gtk.Template.Child()
 
     entry_param_key = Gtk.Template.Child()
     entry_param_value = Gtk.Template.Child()
     btn_add_parameter = Gtk.Template.Child()
     expander_row_parameters = Gtk.Template.Child()
     form_data_page_parameters = Gtk.Template.Child()
-    group_overrides_param = Gtk.Template.Child()
+    group_overrides_param: OverrideList = Gtk.Template.Child()
 
     switch_cookies = Gtk.Template.Child()
+    switch_persist_cookies = Gtk.Template.Child()
     cookies_page = Gtk.Template.Child()
     create_new_cookie = Gtk.Template.Child()
-    group_overrides_cookies = Gtk.Template.Child()
+    group_overrides_cookies: OverrideList = Gtk.Template.Child()
 
     switch_headers = Gtk.Template.Child()
     headers_page = Gtk.Template.Child()
     create_new_header = Gtk.Template.Child()
-    group_overrides_headers = Gtk.Template.Child()
+    group_overrides_headers: OverrideList = Gtk.Template.Child()
 
     switch_auths = Gtk.Template.Child()
     auths_page = Gtk.Template.Child()
@@ -108,9 +167,25 @@ class EscamboWindow(Adw.ApplicationWindow):
         super().__init__(**kwargs)
 
         self.kwargs = kwargs
-        # Ensure close session
-        with Session() as session:
-            self.session = session
+        self.stop_event = threading.Event()
+        self.cancellation = Cancellation()
+        # Sends may overlap, only the latest one updates the response page
+        self.send_count = 0
+        # Cancellation of each send still running, by what it sends
+        self.in_flight = {}
+        self.response_body = None
+        self.response_page_index = 0
+        self.settings = Gio.Settings.new("io.github.cleomenezesjr.Escambo")
+        self._lm = language_manager()
+
+        # requests is only imported once the first request needs it
+        self._transport = self._response_cache = None
+        self.network_lock = threading.Lock()
+        self.settings.connect("changed::pool-size", self.on_pool_size_changed)
+        self.settings.connect("changed::http2", self.on_http2_changed)
+        self.settings.connect(
+            "changed::dns-cache-ttl", self.on_dns_cache_ttl_changed
+        )
 
         # Connect signals
         self.btn_send_request.connect("clicked", self.__on_send)
@@ -140,14 +215,60 @@ class EscamboWindow(Adw.ApplicationWindow):
         # General
         self.cookies = self.headers = self.auths = self.body = self.param = {}
 
-        self.settings = Gio.Settings.new("io.github.cleomenezesjr.Escambo")
-        self.create_files_if_not_exists()
+        self.history = None
+        self.upload_path = ""
+        self.upload_reported = 0.0
+        # Shared by every send, hedging needs to know the usual latency
+        self.latencies = LatencyTracker()
+        self.request_model = RequestModel()
+        self.cookie_jar = CookieJar()
+        self.url_timeout_id = 0
+        self.preconnect_timeout_id = 0
+        # Origin and mode of the last preconnect, not to repeat it
+        self.preconnected = None
+
+        # Edits land in the dicts above at once, the disk catches up later
+        self.store = WriteBehindStore()
+        self.group_overrides_cookies.setup(self, COOKIES)
+        self.group_overrides_headers.setup(self, HEADERS)
+        self.group_overrides_body.setup(self, BODY)
+        self.group_overrides_param.setup(self, PARAM)
         self.update_states()
+        # Overrides are read once the window had a chance to paint
+        GLib.idle_add(self.__load_overrides)
 
         self.raw_buffer = self.raw_source_view_body.get_buffer()
+        self.raw_buffer.connect(
+            "changed", lambda *_args: self.request_model.invalidate("raw")
+        )
         self.response_buffer = self.response_source_view.get_buffer()
         self.response_source_view.props.editable = False
 
+    @property
+    def transport(self):
+        """Pooled connections, kept alive between sends"""
+        with self.network_lock:
+            if self._transport is None:
+                from escambo.transport import Transport, dns_cache
+
+                dns_cache.set_ttl(self.settings.get_int("dns-cache-ttl"))
+                self._transport = Transport(
+                    self.settings.get_int("pool-size")
+                )
+                if self.settings.get_boolean("http2"):
+                    self.__set_http2(self._transport, True)
+            return self._transport
+
+    @property
+    def response_cache(self):
+        with self.network_lock:
+            if self._response_cache is None:
+                from escambo.cache import ResponseCache
+
+                size = self.settings.get_int("response-cache-size")
+                self._response_cache = ResponseCache(size * 1024 * 1024)
+            return self._response_cache
+
     def __on_send(self, *_args: tuple) -> None:
         """
         This function checks if the submitted URL is validself.
@@ -156,101 +277,708 @@ class EscamboWindow(Adw.ApplicationWindow):
         otherwise it returns a Toast informing that the URL
         is using bad/illegal format or that it is missing.
         """
-        url = self.entry_url.get_text()
+        with tracer.span("validate URL"):
+            url = self.__validated_url()
         method = self.entry_method.get_selected()
 
+        if url:
+            with tracer.span("body type"):
+                body = self.__which_body_type(self.is_raw)
+            headers = self.request_model.headers
+            key = self.__send_key(method, url, headers, body)
+            if key in self.in_flight:
+                # Pressing send again would only pile up threads
+                return self.toast_overlay.add_toast(
+                    Adw.Toast.new(_("This request is already being sent"))
+                )
+
+            self.stop_event = threading.Event()
+            self.cancellation = self.in_flight[key] = Cancellation()
+            self.send_count += 1
+            which_method_thread = threading.Thread(
+                target=self.__traced_send,
+                args=(
+                    key,
+                    self.send_count,
+                    self.stop_event,
+                    self.cancellation,
+                    method,
+                    url,
+                    headers,
+                    body,
+                ),
+            )
+            which_method_thread.daemon = True
+            which_method_thread.start()
+
+            self.upload_reported = 0.0
+            self.upload_progress.set_fraction(0)
+            self.upload_progress.props.visible = bool(
+                self.upload_path and self.settings.get_boolean("body")
+            )
+            self.spinner.props.spinning = True
+            self.leaflet.set_visible_child(self.response_page)
+            self.response_stack.props.visible_child_name = "loading"
+
+    def __validated_url(self) -> str | None:
+        url = self.request_model.url
+
         if not url:
             self.toast_overlay.add_toast(Adw.Toast.new(_("Enter a URL")))
+        elif not self.request_model.valid:
+            self.toast_overlay.add_toast(
+                Adw.Toast.new(_("URL using bad/illegal format or missing URL"))
+            )
         else:
-            if not is_valid_url(url):
-                self.toast_overlay.add_toast(
-                    Adw.Toast.new(
-                        _("URL using bad/illegal format or missing URL")
-                    )
-                )
-            else:
-                body = self.__which_body_type(self.is_raw)
-                headers = {
-                    value[0]: value[1] for key, value in self.headers.items()
-                }
-                which_method_thread = threading.Thread(
-                    target=self.__which_method,
-                    args=(method, url, headers, body),
-                )
-                which_method_thread.daemon = True
-                which_method_thread.start()
+            return url
 
-                self.spinner.props.spinning = True
-                self.leaflet.set_visible_child(self.response_page)
-                self.response_stack.props.visible_child_name = "loading"
+    @Gtk.Template.Callback()
+    def on_benchmark(self, widget) -> None:
+        url = self.__validated_url()
+
+        if url:
+            from escambo.dialog_benchmark import BenchmarkDialog
+
+            body = self.__which_body_type(self.is_raw)
+            headers = self.request_model.headers
+            new_window = BenchmarkDialog(
+                parent_window=self,
+                method=METHODS[self.entry_method.get_selected()],
+                url=url,
+                arguments=self.request_arguments(headers, body),
+            )
+            new_window.present()
+
+    def request_arguments(self, headers: dict, body: dict | None) -> dict:
+        """Keyword arguments of ResolveRequests for the current overrides"""
+        return {
+            "cookies": self.switch_cookies.get_active() and self.cookie_jar,
+            "headers": self.settings.get_boolean("headers") and headers,
+            "body": self.settings.get_boolean("body") and body,
+            "parameters": dict(self.param)
+            if self.settings.get_boolean("parameters")
+            else {},
+            "authorization": [
+                self.auth_type.props.selected_item.get_string(),
+                self.auths,
+            ],
+            "compression": self.settings.get_string("request-compression"),
+            "upload": self.settings.get_boolean("body")
+            and self.__file_upload(),
+            "retry": self.settings.get_boolean("retry")
+            and RetryPolicy(
+                self.settings.get_int("retry-attempts"),
+                parse_statuses(self.settings.get_string("retry-statuses")),
+                self.settings.get_double("retry-backoff"),
+                self.settings.get_int("hedge-percentile"),
+                self.latencies,
+            ),
+            "timeout": (
+                self.settings.get_double("connect-timeout"),
+                self.settings.get_double("read-timeout"),
+            ),
+        }
+
+    def __file_upload(self) -> FileUpload | None:
+        if not self.upload_path:
+            return None
+        try:
+            return FileUpload(
+                self.upload_path, MODES[self.upload_mode.get_selected()]
+            )
+        except OSError:
+            return None
 
     def __which_body_type(self, body_type: bool) -> dict | None:
+        if self.upload_path:
+            # The attached file is sent instead
+            return None
+
         if not body_type:
-            body = {value[0]: value[1] for key, value in self.body.items()}
+            body = self.request_model.form_body
         else:
-            start, end = self.raw_buffer.get_bounds()
-            raw_code = self.raw_buffer.get_text(start, end, True)
-            if not len(raw_code) == 0:
-                try:
-                    body = json.loads(raw_code)
-                except ValueError:
-                    return self.toast_overlay.add_toast(
-                        Adw.Toast.new(_("Body must be in JSON format"))
-                    )
-            else:
-                body = None
+            try:
+                body = self.request_model.raw_body(self.__raw_text)
+            except ValueError:
+                return self.toast_overlay.add_toast(
+                    Adw.Toast.new(_("Body must be in JSON format"))
+                )
 
         return body
 
+    def __raw_text(self) -> str:
+        start, end = self.raw_buffer.get_bounds()
+        return self.raw_buffer.get_text(start, end, True)
+
+    def __send_key(
+        self, method: int, url: str, headers: dict, body: dict | None
+    ) -> str:
+        """What tells two sends of the same request apart from others"""
+        return json.dumps(
+            [METHODS[method], url, headers, body, self.upload_path],
+            sort_keys=True,
+            default=str,
+        )
+
+    def __traced_send(
+        self,
+        key: str,
+        send_id: int,
+        stop_event: threading.Event,
+        cancellation: Cancellation,
+        method: int,
+        *args,
+    ) -> None:
+        """Send in a span of its own and write the trace once done"""
+        try:
+            with tracer.span("send", method=METHODS[method], send=send_id):
+                self.__which_method(
+                    send_id, stop_event, cancellation, method, *args
+                )
+        finally:
+            GLib.idle_add(self.__end_send, key, cancellation)
+            tracer.flush()
+
+    def __end_send(self, key: str, cancellation: Cancellation) -> None:
+        if self.in_flight.get(key) is cancellation:
+            del self.in_flight[key]
+
+    def cancel_sends(self) -> None:
+        """Abort every send still running, their sockets included"""
+        for cancellation in self.in_flight.values():
+            cancellation.cancel()
+
+    @Gtk.Template.Callback()
+    def on_cancel_send(self, widget) -> None:
+        self.cancellation.cancel()
+        self.leaflet.set_visible_child(self.home)
+        self.toast_overlay.add_toast(Adw.Toast.new(_("Request cancelled")))
+
+    def __show(self, send_id: int, callback: Callable, *args) -> None:
+        """Update the response page, unless a later send took it over"""
+        if send_id == self.send_count:
+            callback(*args)
+
+    def __show_batch(
+        self,
+        send_id: int,
+        pending: threading.Semaphore,
+        callback: Callable,
+        *args,
+    ) -> None:
+        """As __show, always making room for the stream's next batch"""
+        try:
+            self.__show(send_id, callback, *args)
+        finally:
+            pending.release()
+
+    def __show_body(self, send_id: int, body: ResponseBody | None) -> None:
+        if send_id == self.send_count:
+            self.__set_response_body(body)
+        elif body:
+            body.close()
+
     def __which_method(
         self,
+        send_id: int,
+        stop_event: threading.Event,
+        cancellation: Cancellation,
         method: int,
         url: str,
         headers: dict | None,
         body: dict | None,
     ) -> Callable | None:
+        from escambo.restapi import ResolveRequests
+        from escambo.transport import dns_cache
+        from requests import exceptions
+
         try:
-            method_list = {
-                0: "get",
-                1: "post",
-                2: "put",
-                3: "patch",
-                4: "delete",
-            }
-            resolve_requests = ResolveRequests(
-                url,
-                self.session,
-                cookies=self.switch_cookies.get_active() and self.cookies,
-                headers=self.settings.get_boolean("headers") and headers,
-                body=self.settings.get_boolean("body") and body,
-                parameters=self.settings.get_boolean("parameters")
-                and self.param,
-                authorization=[self.auth_type, self.auths],
+            with tracer.span("build request"):
+                resolve_requests = ResolveRequests(
+                    url,
+                    self.transport.request_session(),
+                    cache=self.settings.get_boolean("response-cache")
+                    and self.response_cache,
+                    spill_threshold=self.settings.get_int("spill-threshold")
+                    * 1024
+                    * 1024,
+                    on_progress=lambda sent, total: self.__on_upload_progress(
+                        send_id, sent, total
+                    ),
+                    cancellation=cancellation,
+                    **self.request_arguments(headers, body),
+                )
+            with tracer.span("request"):
+                response = resolve_requests.request(METHODS[method])
+            # Event streams may never end, they are always read live
+            events = event_format(response.headers)
+            streamed = events or self.settings.get_boolean("stream-response")
+            if not streamed:
+                with tracer.span("format response"):
+                    (
+                        response,
+                        status_code,
+                        code_type,
+                    ) = resolve_requests.formatted_response(response)
+        except Cancelled:
+            # Whoever cancelled already left the loading page
+            return
+        except (exceptions.RequestException, ValueError, OSError) as error:
+            GLib.idle_add(
+                self.__show, send_id, self.leaflet.set_visible_child, self.home
             )
-            get_resolve_requests_attr = getattr(
-                resolve_requests, f"resolve_{method_list[method]}"
+            return self.__show_error(send_id, error)
+
+        if events:
+            self.__stream_events(
+                send_id, stop_event, resolve_requests, response, events
+            )
+        elif streamed:
+            self.__stream_response(
+                send_id, stop_event, resolve_requests, response
+            )
+        else:
+            self.__record_history(
+                resolve_requests, status_code, code_type, response
             )
-            response, status_code, code_type = get_resolve_requests_attr()
-        except exceptions.ConnectionError:
-            self.leaflet.set_visible_child(self.home)
-            return self.toast_overlay.add_toast(
-                Adw.Toast.new(_("Error: Couldn't resolve host name "))
+            self.__show_response(
+                send_id, response, str(status_code), code_type
             )
 
-        # Dynamically change syntax highlight
-        self._lm = SourceView()._lm
+        for callback, *args in [
+            (self.timing_panel.set_timings, resolve_requests.timings),
+            (
+                self.row_cache.set_subtitle,
+                CACHE_STATUS[resolve_requests.cache_status],
+            ),
+            (
+                self.row_connections.set_subtitle,
+                self.transport.stats.describe(urlparse(url).netloc),
+            ),
+            (
+                self.row_attempts.set_subtitle,
+                describe_attempts(resolve_requests.attempts) or "—",
+            ),
+            (self.row_dns_cache.set_subtitle, dns_cache.describe()),
+        ]:
+            GLib.idle_add(self.__show, send_id, callback, *args)
+
+        # Saved whichever send is on screen
+        GLib.idle_add(
+            self.__update_cookies,
+            resolve_requests.response_cookies,
+            self.cookie_jar.pop_expired(),
+        )
+
+    def __show_error(self, send_id: int, error: Exception) -> None:
+        from requests import exceptions
+        from urllib3.exceptions import ReadTimeoutError
+
+        # A read timeout within the body comes wrapped in ConnectionError
+        reason = error.args[0] if error.args else None
+        if isinstance(error, exceptions.Timeout) or isinstance(
+            reason, ReadTimeoutError
+        ):
+            message = _("Error: The server took too long to answer")
+        elif isinstance(error, exceptions.ConnectionError):
+            message = _("Error: Couldn't resolve host name ")
+        else:
+            message = str(error)
+        GLib.idle_add(
+            self.__show,
+            send_id,
+            self.toast_overlay.add_toast,
+            Adw.Toast.new(message),
+        )
+
+    def __show_response(
+        self,
+        send_id: int,
+        response: str | ResponseBody,
+        status: str,
+        code_type: str,
+    ) -> None:
         language = self._lm.get_language(code_type)
-        GLib.idle_add(self.response_buffer.set_language, language)
+        GLib.idle_add(
+            self.__show,
+            send_id,
+            tracer.traced("set language", self.response_buffer.set_language),
+            language,
+        )
+        if isinstance(response, ResponseBody):
+            GLib.idle_add(
+                tracer.traced("show page", self.__show_body), send_id, response
+            )
+        else:
+            GLib.idle_add(self.__show_body, send_id, None)
+            GLib.idle_add(
+                self.__show, send_id, self.__adapt_highlighting, len(response)
+            )
+            GLib.idle_add(
+                self.__show,
+                send_id,
+                tracer.traced("fill buffer", self.response_buffer.set_text),
+                response,
+                -1,
+            )
+        GLib.idle_add(
+            self.__show,
+            send_id,
+            self.response_page_header.set_subtitle,
+            status,
+        )
+        GLib.idle_add(
+            self.__show,
+            send_id,
+            self.response_stack.set_visible_child_name,
+            "response",
+        )
+
+    def __on_upload_progress(
+        self, send_id: int, sent: int, total: int
+    ) -> None:
+        """Called from the worker thread after each chunk of the file"""
+        if send_id != self.send_count:
+            return
+        fraction = sent / total if total else 1.0
+        if fraction - self.upload_reported >= 0.01 or sent == total:
+            self.upload_reported = fraction
+            GLib.idle_add(self.__show_upload_progress, fraction, sent, total)
+
+    def __show_upload_progress(
+        self, fraction: float, sent: int, total: int
+    ) -> None:
+        self.upload_progress.set_fraction(fraction)
+        self.upload_progress.set_text(
+            f"{GLib.format_size(sent)} / {GLib.format_size(total)}"
+        )
+
+    def __stream_response(
+        self,
+        send_id: int,
+        stop_event: threading.Event,
+        resolve_requests: "ResolveRequests",
+        response,
+    ) -> None:
+        """
+        Read the body in the worker thread and hand it to the response
+        buffer in bounded batches, so the main loop never has to swallow
+        the whole payload at once. A body cut short by an error is kept
+        as far as it came.
+        """
+        from requests import exceptions
+        status = resolve_requests.status_of(response)
+        language = self._lm.get_language(resolve_requests.code_type(response))
+        GLib.idle_add(
+            self.__show, send_id, self.__start_stream, language, status
+        )
+
+        body = ResponseBody(
+            resolve_requests.spill_threshold, response.encoding
+        )
+        pending = threading.Semaphore(STREAM_PENDING_BATCHES)
+        batch, batch_size, received, reported = [], 0, 0, 0
+        failed = False
+        try:
+            for text, received in resolve_requests.iter_response(
+                response, stop_event, body
+            ):
+                batch.append(text)
+                batch_size += len(text)
+                # Past the spill threshold only the byte counter moves
+                if (
+                    batch_size >= STREAM_BATCH_SIZE
+                    or received - reported >= STREAM_BATCH_SIZE
+                ):
+                    pending.acquire()
+                    GLib.idle_add(
+                        self.__show_batch,
+                        send_id,
+                        pending,
+                        tracer.traced("fill buffer", self.__append_response),
+                        "".join(batch),
+                        status,
+                        received,
+                    )
+                    batch, batch_size, reported = [], 0, received
+        except (exceptions.RequestException, ValueError, OSError) as error:
+            failed = True
+            self.__show_error(send_id, error)
+        finally:
+            # The stop button goes away however the stream ended
+            pending.acquire()
+            GLib.idle_add(
+                self.__show_batch,
+                send_id,
+                pending,
+                tracer.traced("fill buffer", self.__append_response),
+                "".join(batch),
+                status,
+                received,
+                True,
+                failed or stop_event.is_set(),
+            )
+        code_type = resolve_requests.code_type(response)
+        self.__record_history(resolve_requests, status, code_type, body)
+        GLib.idle_add(self.__show_body, send_id, body)
 
-        # Setup response
-        GLib.idle_add(self.response_buffer.set_text, response, -1)
-        GLib.idle_add(self.response_page_header.set_subtitle, str(status_code))
+    def __stream_events(
+        self,
+        send_id: int,
+        stop_event: threading.Event,
+        resolve_requests: "ResolveRequests",
+        response,
+        events: str,
+    ) -> None:
+        """
+        Read a Server-Sent Events or NDJSON body in the worker thread and
+        add its events to the event list as they arrive.
+        """
+        from requests import exceptions
+
+        status = resolve_requests.status_of(response)
+        limit = self.settings.get_int("event-buffer-size")
+        GLib.idle_add(self.__show, send_id, self.__start_events, status, limit)
+
+        # What history keeps, the same events the list ends up with
+        retained = collections.deque(maxlen=limit)
+        pending = threading.Semaphore(STREAM_PENDING_BATCHES)
+        failed = False
+        try:
+            for batch in resolve_requests.iter_events(
+                response, stop_event, events
+            ):
+                retained.extend(each.data for each in batch)
+                pending.acquire()
+                GLib.idle_add(
+                    self.__show_batch,
+                    send_id,
+                    pending,
+                    tracer.traced("add events", self.__append_events),
+                    batch,
+                    status,
+                )
+        except (exceptions.RequestException, ValueError, OSError) as error:
+            failed = True
+            self.__show_error(send_id, error)
+        finally:
+            pending.acquire()
+            GLib.idle_add(
+                self.__show_batch,
+                send_id,
+                pending,
+                self.__append_events,
+                [],
+                status,
+                True,
+                failed or stop_event.is_set(),
+            )
+        code_type = resolve_requests.code_type(response)
+        self.__record_history(
+            resolve_requests, status, code_type, "\n".join(retained)
+        )
+
+    def __record_history(
+        self,
+        resolve_requests: "ResolveRequests",
+        status: str,
+        code_type: str,
+        body: str | ResponseBody,
+    ) -> None:
+        """
+        Save the send and its response. The body is copied here, before
+        the main loop gets a chance to close it.
+        """
+        if not self.history or not self.settings.get_boolean("record-history"):
+            return
+
+        request = resolve_requests.prepared
+        request_body = request.body
+        if isinstance(request_body, bytes):
+            request_body = request_body.decode(errors="replace")
+        elif not isinstance(request_body, str):
+            request_body = None
+
+        self.history.record(
+            request.method,
+            request.url,
+            request.headers,
+            request_body,
+            status,
+            resolve_requests.response.headers,
+            vars(resolve_requests.timings),
+            code_type,
+            body_text(body),
+            resolve_requests.secret_headers,
+            resolve_requests.secret_params,
+        )
+
+    def on_history(self, *_args) -> None:
+        from escambo.dialog_history import HistoryDialog
+
+        new_window = HistoryDialog(parent_window=self)
+        new_window.present()
+
+    def show_history_entry(self, entry_id: int) -> None:
+        """Show a past response again, without sending anything"""
+        from escambo.transport import Timings
+
+        entry = self.history.load(entry_id)
+        if not entry:
+            return
+
+        timings = Timings()
+        for name, value in entry["timings"].items():
+            setattr(timings, name, value)
+
+        self.__set_response_body(None)
+        self.response_buffer.set_language(
+            self._lm.get_language(entry["code_type"])
+        )
+        self.__adapt_highlighting(len(entry["body"]))
+        self.response_buffer.set_text(entry["body"], -1)
+        self.response_page_header.set_subtitle(
+            f"{entry['status']} · {entry['method']} {entry['url']}"
+        )
+        self.timing_panel.set_timings(timings)
+        self.row_cache.set_subtitle(_("Opened from history"))
+        self.row_connections.set_subtitle("")
+        self.row_attempts.set_subtitle("—")
+        self.row_dns_cache.set_subtitle("—")
+        self.btn_stop_response.props.visible = False
         self.response_stack.props.visible_child_name = "response"
+        self.leaflet.set_visible_child(self.response_page)
 
-        # Clenup session
-        self.session.cookies.clear()
-        self.session.headers.clear()
-        # TODO cleanup auth
+    def __start_events(self, status: str, limit: int) -> None:
+        self.__set_response_body(None)
+        self.response_buffer.set_text("", -1)
+        self.event_list.set_limit(limit)
+        self.event_list.clear()
+        self.response_view.props.visible_child_name = "events"
+        self.response_page_header.set_subtitle(status)
+        self.btn_stop_response.props.visible = True
+        self.response_stack.props.visible_child_name = "response"
+
+    def __append_events(
+        self,
+        events: list,
+        status: str,
+        finished: bool = False,
+        stopped: bool = False,
+    ) -> None:
+        self.event_list.append_events(events)
+        subtitle = f"{status} · " + _("{count} events").format(
+            count=self.event_list.count
+        )
+        if self.event_list.dropped:
+            subtitle += " · " + _("{dropped} dropped").format(
+                dropped=self.event_list.dropped
+            )
+        if finished:
+            self.btn_stop_response.props.visible = False
+            if stopped:
+                subtitle += f" · {_('Stopped')}"
+        self.response_page_header.set_subtitle(subtitle)
+
+    def __start_stream(self, language, status: str) -> None:
+        self.response_buffer.set_language(language)
+        self.__adapt_highlighting(0)
+        self.response_buffer.set_text("", -1)
+        self.response_view.props.visible_child_name = "text"
+        self.response_page_header.set_subtitle(status)
+        self.btn_stop_response.props.visible = True
+        self.response_stack.props.visible_child_name = "response"
+
+    def __append_response(
+        self,
+        text: str,
+        status: str,
+        received: int,
+        finished: bool = False,
+        stopped: bool = False,
+    ) -> None:
+        self.response_buffer.insert(
+            self.response_buffer.get_end_iter(), text, -1
+        )
+        if self.response_buffer.get_highlight_syntax():
+            self.__adapt_highlighting(self.response_buffer.get_char_count())
+        subtitle = f"{status} · {GLib.format_size(received)}"
+        if finished:
+            self.btn_stop_response.props.visible = False
+            if stopped:
+                subtitle += f" · {_('Stopped')}"
+        self.response_page_header.set_subtitle(subtitle)
+
+    @Gtk.Template.Callback()
+    def on_stop_response(self, widget) -> None:
+        self.stop_event.set()
+        # A read blocked on a quiet server returns right away
+        self.cancellation.cancel()
+
+    def __set_response_body(self, body: ResponseBody | None) -> None:
+        """Page through a spilled body, or forget the previous one"""
+        if self.response_body:
+            self.response_body.close()
+        self.response_view.props.visible_child_name = "text"
+
+        if not (body and body.spilled):
+            if body:
+                body.close()
+            self.response_body = None
+            self.response_pager.props.revealed = False
+            return
+
+        self.response_body = body
+        self.response_page_index = 0
+        self.response_pager.props.revealed = True
+        self.__show_response_page()
+
+    def __show_response_page(self) -> None:
+        body = self.response_body
+        page = body.page(self.response_page_index)
+        self.__adapt_highlighting(len(page))
+        self.response_buffer.set_text(page, -1)
+        self.label_response_page.set_label(
+            _("Page {page} of {pages}").format(
+                page=self.response_page_index + 1, pages=body.page_count
+            )
+        )
+        self.btn_previous_page.props.sensitive = self.response_page_index > 0
+        self.btn_next_page.props.sensitive = (
+            self.response_page_index < body.page_count - 1
+        )
+
+    def __adapt_highlighting(self, size: int) -> None:
+        """Leave big responses plain, highlighting is slow on them"""
+        highlight = size <= HIGHLIGHT_LIMIT
+        self.response_buffer.set_highlight_syntax(highlight)
+        self.response_buffer.set_highlight_matching_brackets(highlight)
+        self.btn_highlight.props.visible = not highlight
+
+    @Gtk.Template.Callback()
+    def on_highlight(self, widget) -> None:
+        """Highlight a big response starting from what is on screen"""
+        view = self.response_source_view
+        rect = view.get_visible_rect()
+        start = view.get_iter_at_location(rect.x, rect.y)[1]
+        end = view.get_iter_at_location(
+            rect.x + rect.width, rect.y + rect.height
+        )[1]
+
+        self.response_buffer.set_highlight_syntax(True)
+        self.response_buffer.set_highlight_matching_brackets(True)
+        self.response_buffer.ensure_highlight(start, end)
+        widget.props.visible = False
+
+    @Gtk.Template.Callback()
+    def on_previous_page(self, widget) -> None:
+        self.response_page_index -= 1
+        self.__show_response_page()
+
+    @Gtk.Template.Callback()
+    def on_next_page(self, widget) -> None:
+        self.response_page_index += 1
+        self.__show_response_page()
 
     def __set_response_visibility(self, args, kwargs):
         self.leaflet.set_visible_child(self.response_page)
@@ -263,6 +991,35 @@ class EscamboWindow(Adw.ApplicationWindow):
         else:
             self.leaflet.set_visible_child(self.form_data_page_body)
 
+    @Gtk.Template.Callback()
+    def on_choose_upload(self, widget) -> None:
+        dialog = Gtk.FileDialog(title=_("Choose a File to Send"))
+        dialog.open(self, None, self.__on_upload_chosen)
+
+    def __on_upload_chosen(self, dialog, result) -> None:
+        try:
+            file = dialog.open_finish(result)
+        except GLib.Error:
+            return
+        self.__set_upload_path(file.get_path() or "")
+
+    @Gtk.Template.Callback()
+    def on_clear_upload(self, widget) -> None:
+        self.__set_upload_path("")
+
+    def __set_upload_path(self, path: str) -> None:
+        self.upload_path = path
+        self.settings.set_string("upload-file", path)
+        self.btn_clear_upload.props.visible = bool(path)
+        if path:
+            self.row_upload_file.set_subtitle(
+                GLib.markup_escape_text(path)
+            )
+        else:
+            self.row_upload_file.set_subtitle(
+                _("Send a file instead of the body")
+            )
+
     @Gtk.Template.Callback()
     def on_edit_param_btn(self, widget) -> None:
         self.leaflet.set_visible_child(self.form_data_page_parameters)
@@ -272,38 +1029,59 @@ class EscamboWindow(Adw.ApplicationWindow):
         self.leaflet.set_visible_child(self.home)
 
     def update_subtitle_parameters(self, *_args) -> None:
-        if self.settings.get_boolean("parameters"):
-            url_entry = self.entry_url.get_text()
-            parameters = [f"{i}={self.param[i]}" for i in self.param]
-            parsed_url = urlparse(url_entry)
-            url_query_params = parsed_url.query.split("&")
-
-            if parsed_url.query:
-                parameters += url_query_params
-
-            param_position = url_entry.find("?")
-            url = (
-                url_entry[:param_position]
-                if has_parameter(url_entry)
-                else url_entry
-            )
+        self.request_model.invalidate(PARAM)
+        self.__update_preview()
 
-            subtitle = (
-                f"{'https://' if not url_entry else url}"
-                + f"?{html.escape('&').join(parameters)}"
-            )
+    def __update_preview(self) -> None:
+        if self.settings.get_boolean("parameters"):
+            subtitle = self.request_model.preview
         else:
             subtitle = ""
 
-        GLib.idle_add(self.expander_row_parameters.set_subtitle, subtitle)
+        self.expander_row_parameters.set_subtitle(subtitle)
+
+    def __on_url_settled(self) -> bool:
+        """Typing paused, catch up with everything derived from the URL"""
+        self.url_timeout_id = 0
+        self.settings.set_string("entry-url", self.request_model.url)
+        self.__update_preview()
+        return GLib.SOURCE_REMOVE
+
+    def __on_url_paused(self) -> bool:
+        """Typing paused long enough, get the host ready for the send"""
+        self.preconnect_timeout_id = 0
+        mode = self.settings.get_string("preconnect")
+        url = self.request_model.url
+        parts = urlparse(url)
+        origin = (parts.scheme, parts.netloc, mode)
+        if (
+            mode != "off"
+            and self.request_model.valid
+            and origin != self.preconnected
+        ):
+            self.preconnected = origin
+            threading.Thread(
+                target=self.__preconnect,
+                args=(url, mode == "connect"),
+                daemon=True,
+            ).start()
+        return GLib.SOURCE_REMOVE
+
+    def __preconnect(self, url: str, connect: bool) -> None:
+        with tracer.span("preconnect", connect=connect):
+            self.transport.preconnect(url, connect)
 
     def _show_cookie_dialog(self, widget, title, content=None):
+        from escambo.dialog_cookies import CookieDialog
+
         new_window = CookieDialog(
             parent_window=self, title=title, content=content
         )
         new_window.present()
 
     def _show_header_dialog(self, widget, title, content=None):
+        from escambo.dialog_headers import HeaderDialog
+
         new_window = HeaderDialog(
             parent_window=self, title=title, content=content
         )
@@ -316,22 +1094,13 @@ class EscamboWindow(Adw.ApplicationWindow):
         new_window.present()
 
     def _show_body_dialog(self, widget, title, content=None):
+        from escambo.dialog_body import BodyDialog
+
         new_window = BodyDialog(
             parent_window=self, title=title, content=content
         )
         new_window.present()
 
-    def create_files_if_not_exists(self) -> None:
-        files = [COOKIES, BODY, PARAM, HEADERS, AUTHS]
-        auths = {"Api Key": ["", "", "Header"], "Bearer Token": [""]}
-        for file in files:
-            if not os.path.exists(file):
-                os.makedirs(os.path.dirname(file), exist_ok=True)
-                with open(file, "w") as json_file:
-                    json_file.write(
-                        json.dumps(auths if "auths" in file else {})
-                    )
-
     @Gtk.Template.Callback()
     def on_auth_entry_active(self, widget, args) -> None:
         auth_type = self.auth_type.props.selected_item.get_string()
@@ -352,18 +1121,10 @@ class EscamboWindow(Adw.ApplicationWindow):
         }
 
         # Insert Auth
-        with open(AUTHS, "r+") as file:
-            file_content = json.load(file)
-            file_content[auth_type][
-                entries_position[auth_type][args]
-            ] = entry_content
-            file.truncate(0)
-            file.seek(0)
-            json.dump(file_content, file, indent=2)
-
         self.auths[auth_type][
             entries_position[auth_type][args]
         ] = entry_content
+        self.store.put(AUTHS, auth_type, self.auths[auth_type])
 
     def __save_override(self, *_args: tuple) -> None:
         """
@@ -379,43 +1140,14 @@ class EscamboWindow(Adw.ApplicationWindow):
                 insertion_date = id or dt.today().isoformat()
 
                 # Insert Cookie
-                with open(COOKIES, "r+") as file:
-                    file_content = json.load(file)
-                    # Save Cookies
-                    file_content[insertion_date] = [title, subtitle]
-                    file.truncate(0)
-                    file.seek(0)
-                    json.dump(file_content, file, indent=2)
-
-                    # Populate UI
-                    _entry = PopulatorEntry(
-                        window=self,
-                        override=[
-                            insertion_date,
-                            [title, subtitle],
-                        ],
-                        content=COOKIES,
+                if self.__store_cookie(insertion_date, title, subtitle):
+                    self.toast_overlay.add_toast(
+                        Adw.Toast.new(_("Cookie created"))
+                    )
+                else:
+                    self.toast_overlay.add_toast(
+                        Adw.Toast.new(_("Cookie edited"))
                     )
-                    if not any(
-                        [i == insertion_date for i in self.cookies.keys()]
-                    ):
-                        GLib.idle_add(
-                            self.group_overrides_cookies.add,
-                            _entry,
-                        )
-                        self.toast_overlay.add_toast(
-                            Adw.Toast.new(_("Cookie created"))
-                        )
-                    else:
-                        self.toast_overlay.add_toast(
-                            Adw.Toast.new(_("Cookie edited"))
-                        )
-
-                self.cookies = file_content
-                self.cookies_page.set_badge_number(len(file_content))
-
-                # Clean up field
-                self.group_overrides_cookies.set_description("")
             case "headers":
                 title: str = _args[2].strip()
                 subtitle: str = _args[3].strip()
@@ -423,37 +1155,28 @@ class EscamboWindow(Adw.ApplicationWindow):
                 insertion_date = id or dt.today().isoformat()
 
                 # Insert Header
-                with open(HEADERS, "r+") as file:
-                    file_content = json.load(file)
-                    # Save Header
-                    file_content[insertion_date] = [title, subtitle]
-                    file.truncate(0)
-                    file.seek(0)
-                    json.dump(file_content, file, indent=2)
-
-                    # Populate UI
-                    _entry = PopulatorEntry(
-                        window=self,
-                        override=[
-                            insertion_date,
-                            [title, subtitle],
-                        ],
-                        content=HEADERS,
+                is_new = insertion_date not in self.headers
+                self.headers[insertion_date] = [title, subtitle]
+                self.request_model.invalidate(HEADERS)
+                self.store.put(HEADERS, insertion_date, [title, subtitle])
+
+                # Populate UI
+                if is_new:
+                    self.group_overrides_headers.add_override(
+                        insertion_date, [title, subtitle]
+                    )
+                    self.toast_overlay.add_toast(
+                        Adw.Toast.new(_("Header created"))
+                    )
+                else:
+                    self.group_overrides_headers.update_override(
+                        insertion_date, [title, subtitle]
+                    )
+                    self.toast_overlay.add_toast(
+                        Adw.Toast.new(_("Header edited"))
                     )
-                    if not any(
-                        [i == insertion_date for i in self.headers.keys()]
-                    ):
-                        GLib.idle_add(self.group_overrides_headers.add, _entry)
-                        self.toast_overlay.add_toast(
-                            Adw.Toast.new(_("Header created"))
-                        )
-                    else:
-                        self.toast_overlay.add_toast(
-                            Adw.Toast.new(_("Header edited"))
-                        )
 
-                self.headers = file_content
-                self.headers_page.set_badge_number(len(file_content))
+                self.headers_page.set_badge_number(len(self.headers))
 
                 # Clean up field
                 self.group_overrides_headers.set_description("")
@@ -470,37 +1193,28 @@ class EscamboWindow(Adw.ApplicationWindow):
                     return
 
                 # Insert Body
-                with open(BODY, "r+") as file:
-                    file_content = json.load(file)
-                    # Save Body
-                    file_content[insertion_date] = [title, subtitle]
-                    file.truncate(0)
-                    file.seek(0)
-                    json.dump(file_content, file, indent=2)
-
-                    # Populate UI
-                    _entry = PopulatorEntry(
-                        window=self,
-                        override=[
-                            insertion_date,
-                            [title, subtitle],
-                        ],
-                        content=BODY,
+                is_new = insertion_date not in self.body
+                self.body[insertion_date] = [title, subtitle]
+                self.request_model.invalidate(BODY)
+                self.store.put(BODY, insertion_date, [title, subtitle])
+
+                # Populate UI
+                if is_new:
+                    self.group_overrides_body.add_override(
+                        insertion_date, [title, subtitle]
+                    )
+                    self.toast_overlay.add_toast(
+                        Adw.Toast.new(_("Body created"))
+                    )
+                else:
+                    self.group_overrides_body.update_override(
+                        insertion_date, [title, subtitle]
+                    )
+                    self.toast_overlay.add_toast(
+                        Adw.Toast.new(_("Body edited"))
                     )
-                    if not any(
-                        [i == insertion_date for i in self.body.keys()]
-                    ):
-                        GLib.idle_add(self.group_overrides_body.add, _entry)
-                        self.toast_overlay.add_toast(
-                            Adw.Toast.new(_("Body created"))
-                        )
-                    else:
-                        self.toast_overlay.add_toast(
-                            Adw.Toast.new(_("Body edited"))
-                        )
 
-                self.body = file_content
-                self.body_counter(file_content)
+                self.body_counter(self.body)
 
                 # Clean up field
                 self.group_overrides_body.set_description("")
@@ -509,31 +1223,20 @@ class EscamboWindow(Adw.ApplicationWindow):
                 param_value = self.entry_param_value.get_text()
 
                 if param_key != "" and param_value != "":
-                    with open(PARAM, "r+") as file:
-                        file_content = json.load(file)
-                        if not any(
-                            [i == param_key for i in file_content.keys()]
-                        ):
-                            # Save Parameters
-                            file_content.update({param_key: param_value})
-                            file.seek(0)
-                            json.dump(file_content, file, indent=2)
-
-                            # Populate UI
-                            _entry = PopulatorEntry(
-                                window=self,
-                                override=[param_key, param_value],
-                                content=PARAM,
-                            )
-                            GLib.idle_add(
-                                self.group_overrides_param.add, _entry
-                            )
-                        else:
-                            return self.toast_overlay.add_toast(
-                                Adw.Toast.new(_("Key already exists"))
-                            )
-
-                    self.param = file_content
+                    if param_key in self.param:
+                        return self.toast_overlay.add_toast(
+                            Adw.Toast.new(_("Key already exists"))
+                        )
+
+                    # Save Parameters
+                    self.param[param_key] = param_value
+                    self.store.put(PARAM, param_key, param_value)
+
+                    # Populate UI
+                    self.group_overrides_param.add_override(
+                        param_key, param_value
+                    )
+
                     self.update_subtitle_parameters()
 
                     # Clean up fields
@@ -541,11 +1244,58 @@ class EscamboWindow(Adw.ApplicationWindow):
                     self.entry_param_key.set_text("")
                     self.entry_param_value.set_text("")
 
+    def __store_cookie(self, id: str, title: str, subtitle: str) -> bool:
+        """Save a cookie and show it, return whether it is a new one"""
+        is_new = id not in self.cookies
+        self.cookies[id] = [title, subtitle]
+        self.store.put(COOKIES, id, [title, subtitle])
+        self.cookie_jar.add(id, [title, subtitle])
+
+        # Populate UI
+        if is_new:
+            self.group_overrides_cookies.add_override(id, [title, subtitle])
+        else:
+            self.group_overrides_cookies.update_override(id, [title, subtitle])
+        self.cookies_page.set_badge_number(len(self.cookies))
+
+        # Clean up field
+        self.group_overrides_cookies.set_description("")
+        return is_new
+
+    def __update_cookies(self, response_cookies: list, expired: list) -> None:
+        """Forget expired cookies and keep the ones the server set"""
+        for id in expired:
+            if id in self.cookies:
+                del self.cookies[id]
+                self.store.delete(COOKIES, id)
+                self.group_overrides_cookies.remove_override(id)
+
+        if self.settings.get_boolean("persist-cookies"):
+            for position, cookie in enumerate(response_cookies):
+                domain = cookie.domain.lstrip(".")
+                expires = (
+                    email.utils.formatdate(cookie.expires, usegmt=True)
+                    if cookie.expires
+                    else ""
+                )
+                id = self.cookie_jar.find(domain, cookie.path, cookie.name)
+                self.__store_cookie(
+                    id or f"{dt.today().isoformat()}-{position}",
+                    domain,
+                    stringfy_cookie(
+                        cookie.name, cookie.value, expires, domain, cookie.path
+                    ),
+                )
+
+        self.cookies_page.set_badge_number(len(self.cookies))
+        if not self.cookies:
+            self.group_overrides_cookies.set_description("No cookie added.")
+
     def populate_overrides_list(self) -> None:
         # TODO populate url preview with parameters
 
         """
-        This function populate rows from json files
+        This function populate rows from the override store
         """
         files = {
             "cookie": [COOKIES, "cookies"],
@@ -556,43 +1306,18 @@ class EscamboWindow(Adw.ApplicationWindow):
         }
 
         for file in files:
-            with open(files[file][0], "r") as json_file:
-                overrides = json.load(json_file)
-                self.cookies = overrides if "cookie" in file else self.cookies
-                self.body = overrides if "body" in file else self.body
-                self.param = overrides if "parameter" in file else self.param
-                self.headers = overrides if "header" in file else self.headers
-                self.auths = (
-                    overrides if "authorization" in file else self.auths
+            overrides = self.store.load(files[file][0])
+            setattr(self, files[file][1], overrides)
+            if file != "authorization":
+                group = getattr(self, f"group_overrides_{files[file][1]}")
+                group.set_overrides(overrides)
+                group.set_description("" if overrides else f"No {file} added.")
+            else:
+                PopulatorEntry(
+                    window=self,
+                    override=overrides,
+                    content=files[file][0],
                 )
-                if file != "authorization":
-                    if not bool(overrides):
-                        getattr(
-                            self, f"group_overrides_{files[file][1]}"
-                        ).set_description((f"No {file} added."))
-                    else:
-                        getattr(
-                            self, f"group_overrides_{files[file][1]}"
-                        ).set_description("")
-                        for override in overrides:
-                            _entry = PopulatorEntry(
-                                window=self,
-                                override=[override, overrides[override]],
-                                content=files[file][0],
-                            )
-
-                            GLib.idle_add(
-                                getattr(
-                                    self, f"group_overrides_{files[file][1]}"
-                                ).add,
-                                _entry,
-                            )
-                else:
-                    PopulatorEntry(
-                        window=self,
-                        override=overrides,
-                        content=files[file][0],
-                    )
 
     def body_counter(self, overrides) -> None:
         """Body counter and its visibility"""
@@ -609,10 +1334,23 @@ class EscamboWindow(Adw.ApplicationWindow):
             switch_state = getattr(self, f"switch_{switch}").get_active()
             getattr(self, f"{switch}_page").set_needs_attention(switch_state)
 
-    def update_states(self) -> None:
-        # populate lists
+    def __load_overrides(self) -> bool:
+        """Fill the lists and everything that counts on them"""
+        startup.mark("first paint")
+        self.history = HistoryStore(self.settings.get_int("history-size"))
         self.populate_overrides_list()
+        self.request_model.bind(self.param, self.headers, self.body)
+        self.cookie_jar.load(self.cookies)
+
+        self.update_subtitle_parameters()
+        self.body_counter(self.body)
+        self.cookies_page.set_badge_number(len(self.cookies))
+        self.headers_page.set_badge_number(len(self.headers))
+        startup.mark("overrides loaded")
+        startup.report()
+        return GLib.SOURCE_REMOVE
 
+    def update_states(self) -> None:
         # method
         method = self.settings.get_int("method-type")
         self.entry_method.set_selected(method)
@@ -620,6 +1358,11 @@ class EscamboWindow(Adw.ApplicationWindow):
         # url entry
         url_entry = self.settings.get_string("entry-url")
         self.entry_url.set_text(url_entry)
+        # Only typing preconnects, restoring the URL isn't a reason to
+        # import requests and reach the network right after startup
+        if self.preconnect_timeout_id:
+            GLib.source_remove(self.preconnect_timeout_id)
+            self.preconnect_timeout_id = 0
 
         # parameters
         self.expander_row_parameters.set_enable_expansion(
@@ -631,17 +1374,44 @@ class EscamboWindow(Adw.ApplicationWindow):
         self.expander_row_body.set_enable_expansion(
             self.settings.get_boolean("body")
         )
-        self.body_counter(self.body)
         self.is_raw = self.settings.get_boolean("body-type")
         self.form_data_toggle_button_body.props.active = not self.is_raw
+        upload_path = self.settings.get_string("upload-file")
+        self.__set_upload_path(
+            upload_path if os.path.isfile(upload_path) else ""
+        )
+        self.settings.bind(
+            "upload-mode",
+            self.upload_mode,
+            "selected",
+            Gio.SettingsBindFlags.DEFAULT,
+        )
+
+        # retries
+        for key, widget, prop in [
+            ("retry", self.expander_row_retry, "enable-expansion"),
+            ("retry-attempts", self.spin_retry_attempts, "value"),
+            ("retry-statuses", self.entry_retry_statuses, "text"),
+            ("retry-backoff", self.spin_retry_backoff, "value"),
+            ("hedge-percentile", self.spin_hedge_percentile, "value"),
+            ("connect-timeout", self.spin_connect_timeout, "value"),
+            ("read-timeout", self.spin_read_timeout, "value"),
+        ]:
+            self.settings.bind(
+                key, widget, prop, Gio.SettingsBindFlags.DEFAULT
+            )
 
         # cookies
         self.switch_cookies.set_active(self.settings.get_boolean("cookies"))
-        self.cookies_page.set_badge_number(len(self.cookies))
+        self.settings.bind(
+            "persist-cookies",
+            self.switch_persist_cookies,
+            "active",
+            Gio.SettingsBindFlags.DEFAULT,
+        )
 
         # headers
         self.switch_headers.set_active(self.settings.get_boolean("headers"))
-        self.headers_page.set_badge_number(len(self.headers))
 
         # auths
         self.switch_auths.set_active(self.settings.get_boolean("auths"))
@@ -650,14 +1420,47 @@ class EscamboWindow(Adw.ApplicationWindow):
 
         self.set_needs_attention()
 
+    def on_pool_size_changed(self, settings, key) -> None:
+        if self._transport is not None:
+            self._transport.set_pool_size(settings.get_int(key))
+
+    def on_dns_cache_ttl_changed(self, settings, key) -> None:
+        if self._transport is not None:
+            from escambo.transport import dns_cache
+
+            dns_cache.set_ttl(settings.get_int(key))
+
+    def on_http2_changed(self, settings, key) -> None:
+        if self._transport is not None:
+            self.__set_http2(self._transport, settings.get_boolean(key))
+
+    def __set_http2(self, transport, http2: bool) -> None:
+        try:
+            transport.set_http2(http2)
+        except ValueError as error:
+            GLib.idle_add(self.__on_http2_unavailable, str(error))
+
+    def __on_http2_unavailable(self, message: str) -> None:
+        self.toast_overlay.add_toast(Adw.Toast.new(message))
+        self.settings.set_boolean("http2", False)
+
     @Gtk.Template.Callback()
     def on_entry_method_changed(self, widget, args) -> None:
         self.settings.set_int("method-type", widget.get_selected())
 
     @Gtk.Template.Callback()
     def on_entry_url_changed(self, widget) -> None:
-        self.settings.set_string("entry-url", widget.get_text())
-        self.update_subtitle_parameters()
+        self.request_model.set_url(widget.get_text())
+        if self.url_timeout_id:
+            GLib.source_remove(self.url_timeout_id)
+        self.url_timeout_id = GLib.timeout_add(
+            URL_SETTLE_DELAY, self.__on_url_settled
+        )
+        if self.preconnect_timeout_id:
+            GLib.source_remove(self.preconnect_timeout_id)
+        self.preconnect_timeout_id = GLib.timeout_add(
+            PRECONNECT_DELAY, self.__on_url_paused
+        )
 
     @Gtk.Template.Callback()
     def on_param_switch_changed(self, widget, args) -> None:
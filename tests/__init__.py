@@ -0,0 +1,27 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Tests of the parts of Escambo that don't need a display. src/ is
+imported as the escambo package, as meson installs it.
+
+    python3 -m pytest tests
+"""
+
+import gettext
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+gettext.install("escambo")
+if "escambo" not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        "escambo",
+        os.path.join(ROOT, "src", "__init__.py"),
+        submodule_search_locations=[os.path.join(ROOT, "src")],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["escambo"] = module
+    spec.loader.exec_module(module)
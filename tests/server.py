@@ -0,0 +1,198 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import http.server
+import os
+import socket
+import ssl
+import subprocess
+import threading
+import time
+
+
+class Reply:
+    """What the server answers to a path"""
+
+    def __init__(
+        self,
+        body: bytes = b"",
+        status: int = 200,
+        headers: dict = None,
+        stall_after: int = None,
+        stall: float = 0,
+    ) -> None:
+        self.body = body
+        self.status = status
+        self.headers = headers or {}
+        # Stop sending for stall seconds after this many bytes of body
+        self.stall_after = stall_after
+        self.stall = stall
+
+
+class Server(http.server.ThreadingHTTPServer):
+    """
+    HTTP/1.1 server on a free local port, answering every path with
+    the Reply registered for it. Use it as a context manager.
+    """
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.replies = {}
+        self.requests = []
+
+    def url(self, path: str, reply: Reply) -> str:
+        self.replies[path] = reply
+        return f"http://127.0.0.1:{self.server_port}{path}"
+
+    def __enter__(self) -> "Server":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        # Escambo sends a JSON body even with GET
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests.append((self.command, self.path, self.headers))
+        reply = self.server.replies.get(self.path)
+        if reply is None:
+            self.send_error(404)
+            return
+
+        self.send_response(reply.status)
+        for name, value in reply.headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(reply.body)))
+        self.end_headers()
+
+        if reply.stall_after is None:
+            self.wfile.write(reply.body)
+            return
+        self.wfile.write(reply.body[: reply.stall_after])
+        self.wfile.flush()
+        time.sleep(reply.stall)
+        try:
+            self.wfile.write(reply.body[reply.stall_after :])
+        except OSError:
+            # The client gave up waiting
+            pass
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class Http2Server:
+    """
+    HTTP/2 over TLS on a free local port, answering every request with
+    the same JSON body. Its certificate is made with openssl and is
+    trusted by nobody, cert is the file to verify it with.
+    """
+
+    def __init__(self, directory: str, body: bytes) -> None:
+        self.body = body
+        self.cert = os.path.join(directory, "cert.pem")
+        key = os.path.join(directory, "key.pem")
+        subprocess.run(
+            [
+                "openssl",
+                "req",
+                "-x509",
+                "-newkey",
+                "rsa:2048",
+                "-nodes",
+                "-days",
+                "1",
+                "-subj",
+                "/CN=localhost",
+                "-addext",
+                "subjectAltName=IP:127.0.0.1,DNS:localhost",
+                "-keyout",
+                key,
+                "-out",
+                self.cert,
+            ],
+            check=True,
+            capture_output=True,
+        )
+        self.context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        self.context.load_cert_chain(self.cert, key)
+        self.context.set_alpn_protocols(["h2"])
+        self.socket = socket.create_server(("127.0.0.1", 0))
+        # Protocol agreed with ALPN, for every connection made
+        self.protocols = []
+
+    def url(self, path: str) -> str:
+        return f"https://127.0.0.1:{self.socket.getsockname()[1]}{path}"
+
+    def __enter__(self) -> "Http2Server":
+        threading.Thread(target=self.__accept, daemon=True).start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.socket.close()
+
+    def __accept(self) -> None:
+        while True:
+            try:
+                sock, _address = self.socket.accept()
+            except OSError:
+                return
+            threading.Thread(
+                target=self.__serve, args=(sock,), daemon=True
+            ).start()
+
+    def __serve(self, sock: socket.socket) -> None:
+        import h2.config
+        import h2.connection
+
+        try:
+            tls = self.context.wrap_socket(sock, server_side=True)
+        except OSError:
+            # The client didn't trust the certificate
+            return
+        self.protocols.append(tls.selected_alpn_protocol())
+        connection = h2.connection.H2Connection(
+            h2.config.H2Configuration(client_side=False)
+        )
+        connection.initiate_connection()
+        with tls:
+            try:
+                self.__exchange(tls, connection)
+            except OSError:
+                # The client went away
+                pass
+
+    def __exchange(self, tls, connection) -> None:
+        import h2.events
+
+        tls.sendall(connection.data_to_send())
+        while True:
+            data = tls.recv(65535)
+            if not data:
+                return
+            for event in connection.receive_data(data):
+                if isinstance(event, h2.events.DataReceived):
+                    connection.acknowledge_received_data(
+                        event.flow_controlled_length, event.stream_id
+                    )
+                elif isinstance(event, h2.events.StreamEnded):
+                    connection.send_headers(
+                        event.stream_id,
+                        [
+                            (":status", "200"),
+                            ("content-type", "application/json"),
+                            ("content-length", str(len(self.body))),
+                        ],
+                    )
+                    connection.send_data(
+                        event.stream_id, self.body, end_stream=True
+                    )
+            tls.sendall(connection.data_to_send())
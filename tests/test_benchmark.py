@@ -0,0 +1,43 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import itertools
+import threading
+import unittest
+
+from escambo.benchmark import histogram, percentile, run_benchmark
+
+
+class RunBenchmarkTest(unittest.TestCase):
+    def test_every_send_is_counted(self) -> None:
+        outcomes = itertools.cycle(["ok", "failed", "raised"])
+        lock = threading.Lock()
+
+        def send() -> bool:
+            with lock:
+                outcome = next(outcomes)
+            if outcome == "raised":
+                raise ValueError("not a requests exception")
+            return outcome == "ok"
+
+        summary = run_benchmark(send, 30, 4, threading.Event())
+        self.assertEqual(summary["completed"], 30)
+        self.assertEqual(summary["errors"], 20)
+
+    def test_stopped_before_starting(self) -> None:
+        stop_event = threading.Event()
+        stop_event.set()
+        summary = run_benchmark(lambda: True, 10, 2, stop_event)
+        self.assertEqual(summary["completed"], 0)
+
+
+class StatisticsTest(unittest.TestCase):
+    def test_percentile(self) -> None:
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_histogram_counts_every_value(self) -> None:
+        bars = histogram([0.1, 0.2, 0.2, 0.9], bins=4)
+        self.assertEqual(sum(count for bound, count in bars), 4)
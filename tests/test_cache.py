@@ -0,0 +1,70 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import tempfile
+import unittest
+
+import requests
+from escambo.cache import ResponseCache
+from escambo.restapi import ResolveRequests
+from escambo.transport import Transport
+
+from tests.server import Reply, Server
+
+BODY = b"<p>Escambo means exchange or barter.</p>\n" * 1000
+CACHEABLE = {"Cache-Control": "max-age=600", "Content-Type": "text/html"}
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(1024 * 1024, self.directory.name)
+        self.server = Server().__enter__()
+        self.transport = Transport()
+
+    def tearDown(self) -> None:
+        self.transport.close()
+        self.server.__exit__()
+        self.directory.cleanup()
+
+    def send(self, url: str, timeout: tuple = (5, 5)) -> ResolveRequests:
+        resolve_requests = ResolveRequests(
+            url,
+            self.transport.request_session(),
+            cache=self.cache,
+            timeout=timeout,
+        )
+        resolve_requests.resolve_get()
+        return resolve_requests
+
+    def test_served_from_cache(self) -> None:
+        url = self.server.url("/page", Reply(BODY, headers=CACHEABLE))
+        self.assertEqual(self.send(url).cache_status, "fresh")
+        self.assertEqual(self.send(url).cache_status, "cache")
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_missing_file_is_a_miss(self) -> None:
+        url = self.server.url("/page", Reply(BODY, headers=CACHEABLE))
+        first = self.send(url)
+        os.unlink(self.cache.path_of(self.cache.key_of(first.prepared)))
+
+        second = self.send(url)
+        self.assertEqual(second.cache_status, "fresh")
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.send(url).cache_status, "cache")
+
+    def test_read_timeout_is_a_requests_error(self) -> None:
+        url = self.server.url(
+            "/page",
+            Reply(BODY, headers=CACHEABLE, stall_after=100, stall=2),
+        )
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.send(url, timeout=(5, 0.3))
+        # Nothing half-read was kept
+        stored = [
+            name
+            for name in os.listdir(self.directory.name)
+            if not name.startswith("index.db")
+        ]
+        self.assertEqual(stored, [])
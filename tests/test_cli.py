@@ -0,0 +1,91 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from escambo import cli, http2
+from escambo.cancellation import Cancellation
+from escambo.transport import Transport
+from escambo.upload import FileUpload
+
+from tests.server import Http2Server, Reply, Server
+
+ARGUMENTS = {
+    "cookies": None,
+    "headers": None,
+    "body": None,
+    "parameters": {},
+    "authorization": None,
+    "timeout": (5, 5),
+}
+
+
+def missing_upload() -> FileUpload:
+    with tempfile.NamedTemporaryFile(delete=False) as upload_file:
+        upload_file.write(b"escambo")
+    upload = FileUpload(upload_file.name)
+    os.unlink(upload_file.name)
+    return upload
+
+
+class SendTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = Server().__enter__()
+        self.transport = Transport()
+        self.url = self.server.url("/", Reply(b"{}"))
+
+    def tearDown(self) -> None:
+        self.transport.close()
+        self.server.__exit__()
+
+    def send(self, **arguments) -> tuple:
+        return cli.send(self.transport, "get", self.url, ARGUMENTS | arguments)
+
+    def test_sent(self) -> None:
+        url, summary, body = self.send()
+        self.assertIn("200 Ok", summary)
+        self.assertEqual(body, "{}")
+
+    def test_missing_upload_is_a_failure(self) -> None:
+        url, summary, body = self.send(upload=missing_upload())
+        self.assertEqual(url, self.url)
+        self.assertIn(self.url, summary)
+        self.assertIsNone(body)
+
+    def test_cancelled_is_a_failure(self) -> None:
+        cancellation = Cancellation()
+        cancellation.cancel()
+        url, summary, body = self.send(cancellation=cancellation)
+        self.assertIn(self.url, summary)
+        self.assertIsNone(body)
+
+
+@unittest.skipUnless(http2.available(), "needs the httpx and h2 modules")
+@unittest.skipUnless(shutil.which("openssl"), "needs openssl")
+class Http2SendTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.server = Http2Server(self.directory.name, b"{}").__enter__()
+        self.transport = Transport(http2=True)
+
+    def tearDown(self) -> None:
+        self.transport.close()
+        self.server.__exit__()
+        self.directory.cleanup()
+
+    def test_missing_upload_is_a_failure(self) -> None:
+        url = self.server.url("/")
+        environment = {"REQUESTS_CA_BUNDLE": self.server.cert}
+        with mock.patch.dict(os.environ, environment):
+            _url, summary, body = cli.send(
+                self.transport,
+                "get",
+                url,
+                ARGUMENTS | {"upload": missing_upload()},
+            )
+        self.assertIn(url, summary)
+        self.assertIsNone(body)
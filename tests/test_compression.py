@@ -0,0 +1,49 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import unittest
+
+import requests
+from escambo.compression import compress
+from escambo.restapi import ResolveRequests
+from escambo.transport import Transport
+
+from tests.server import Reply, Server
+
+BODY = b'{"escambo": "' + b"barter " * 20000 + b'"}'
+GZIP = {"Content-Encoding": "gzip", "Content-Type": "application/json"}
+
+
+class DecodingBodyTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = Server().__enter__()
+        self.transport = Transport()
+
+    def tearDown(self) -> None:
+        self.transport.close()
+        self.server.__exit__()
+
+    def send(self, reply: Reply, timeout: tuple = (5, 5)) -> list:
+        url = self.server.url("/body", reply)
+        return ResolveRequests(
+            url, self.transport.request_session(), timeout=timeout
+        ).resolve_get()
+
+    def test_decodes_gzip(self) -> None:
+        body, status, code_type = self.send(
+            Reply(compress(BODY, "gzip"), headers=GZIP)
+        )
+        self.assertEqual(status, "200 Ok")
+        self.assertIn('"escambo": "barter', body)
+
+    def test_read_timeout_is_a_requests_error(self) -> None:
+        encoded = compress(BODY, "gzip")
+        reply = Reply(
+            encoded, headers=GZIP, stall_after=len(encoded) // 2, stall=2
+        )
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.send(reply, timeout=(5, 0.3))
+
+    def test_corrupt_body_is_a_decoding_error(self) -> None:
+        with self.assertRaises(requests.exceptions.ContentDecodingError):
+            self.send(Reply(b"not gzip at all", headers=GZIP))
@@ -0,0 +1,113 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import unittest
+
+from escambo.cookie_jar import CookieJar
+from escambo.restapi import ResolveRequests
+from escambo.transport import Transport
+
+from tests.server import Reply, Server
+
+FUTURE = "Wed, 21 Oct 2099 07:28:00 GMT"
+PAST = "Wed, 21 Oct 2015 07:28:00 GMT"
+
+
+def jar_of(*cookies: str) -> CookieJar:
+    jar = CookieJar()
+    jar.load(
+        {
+            f"cookie-{index}": [f"Cookie {index}", cookie]
+            for index, cookie in enumerate(cookies)
+        }
+    )
+    return jar
+
+
+class MatchingTest(unittest.TestCase):
+    def test_domain(self) -> None:
+        jar = jar_of(
+            "site=1; Domain=example.com",
+            "api=2; Domain=api.example.com",
+            "other=3; Domain=example.org",
+            "anywhere=4",
+        )
+        self.assertEqual(
+            sorted(jar.matching("https://api.example.com/")),
+            ["anywhere", "api", "site"],
+        )
+        self.assertEqual(
+            sorted(jar.matching("https://www.example.com/")),
+            ["anywhere", "site"],
+        )
+
+    def test_path(self) -> None:
+        jar = jar_of("v1=1; Domain=example.com; Path=/v1")
+        self.assertIn("v1", jar.matching("https://example.com/v1"))
+        self.assertIn("v1", jar.matching("https://example.com/v1/items"))
+        self.assertNotIn("v1", jar.matching("https://example.com/v10"))
+        self.assertNotIn("v1", jar.matching("https://example.com/"))
+
+    def test_expiry(self) -> None:
+        jar = jar_of(
+            f"live=1; Expires={FUTURE}; Domain=example.com",
+            f"gone=2; Expires={PAST}; Domain=example.com",
+        )
+        self.assertEqual(list(jar.matching("https://example.com/")), ["live"])
+        self.assertEqual(jar.pop_expired(), ["cookie-1"])
+        self.assertEqual(jar.pop_expired(), [])
+
+
+class SendTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = Server().__enter__()
+        self.transport = Transport()
+
+    def tearDown(self) -> None:
+        self.transport.close()
+        self.server.__exit__()
+
+    def cookie_headers(self, url: str, jar: CookieJar) -> dict:
+        ResolveRequests(
+            url, self.transport.request_session(), cookies=jar
+        ).resolve_get()
+        return {
+            path: headers.get("Cookie")
+            for _method, path, headers in self.server.requests
+        }
+
+    def test_sent_to_its_host(self) -> None:
+        url = self.server.url("/", Reply(b"{}"))
+        jar = jar_of(f"token=1; Expires={FUTURE}; Domain=127.0.0.1")
+        self.assertEqual(self.cookie_headers(url, jar), {"/": "token=1"})
+
+    def test_not_sent_across_a_redirect(self) -> None:
+        port = self.server.server_port
+        self.server.url("/landing", Reply(b"{}"))
+        url = self.server.url(
+            "/redirect",
+            Reply(
+                status=302,
+                headers={"Location": f"http://localhost:{port}/landing"},
+            ),
+        )
+        jar = jar_of("token=1; Domain=127.0.0.1", "local=2; Domain=localhost")
+        self.assertEqual(
+            self.cookie_headers(url, jar),
+            {"/redirect": "token=1", "/landing": None},
+        )
+
+    def test_host_only_cookie_stays_on_its_host(self) -> None:
+        port = self.server.server_port
+        self.server.url("/landing", Reply(b"{}"))
+        url = self.server.url(
+            "/redirect",
+            Reply(
+                status=302,
+                headers={"Location": f"http://localhost:{port}/landing"},
+            ),
+        )
+        self.assertEqual(
+            self.cookie_headers(url, jar_of("session=1")),
+            {"/redirect": "session=1", "/landing": None},
+        )
@@ -0,0 +1,144 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from escambo.history import REDACTED, HistoryStore, redact_url
+from escambo.restapi import ResolveRequests
+from escambo.transport import Transport
+
+from tests.server import Reply, Server
+
+SECRET = "s3cr3tvalue"
+
+
+class HistoryStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "history.db")
+        self.history = HistoryStore(100, self.path)
+
+    def tearDown(self) -> None:
+        self.history.close()
+        self.directory.cleanup()
+
+    def record(
+        self,
+        request_headers: dict,
+        secret_headers=(),
+        url: str = "https://example.com/items",
+        secret_params=(),
+    ) -> dict:
+        self.history.record(
+            "GET",
+            url,
+            request_headers,
+            None,
+            "200 Ok",
+            {"Set-Cookie": f"session={SECRET}", "Server": "escambo"},
+            {},
+            "json",
+            "[]",
+            secret_headers,
+            secret_params,
+        )
+        # Closing waits for the write behind
+        self.history.close()
+        self.history = HistoryStore(100, self.path)
+        return self.history.load(self.history.search("")[0].id)
+
+    def test_credentials_are_not_stored(self) -> None:
+        entry = self.record(
+            {
+                "Authorization": f"Bearer {SECRET}",
+                "Cookie": f"id={SECRET}",
+                "X-Api-Key": SECRET,
+                "X-Custom": SECRET,
+                "Accept": "application/json",
+            },
+            ["x-custom"],
+        )
+        self.assertEqual(
+            entry["request_headers"],
+            {
+                "Authorization": REDACTED,
+                "Cookie": REDACTED,
+                "X-Api-Key": REDACTED,
+                "X-Custom": REDACTED,
+                "Accept": "application/json",
+            },
+        )
+        self.assertEqual(entry["response_headers"]["Set-Cookie"], REDACTED)
+        self.assertEqual(self.history.search(SECRET), [])
+        with open(self.path, "rb") as database:
+            self.assertNotIn(SECRET.encode(), database.read())
+
+    def test_other_headers_are_searchable(self) -> None:
+        self.record({"Accept": "application/json"})
+        self.assertEqual(len(self.history.search("headers:escambo")), 1)
+
+    def test_secret_query_parameters_are_not_stored(self) -> None:
+        entry = self.record(
+            {"Accept": "application/json"},
+            url=f"https://example.com/items?page=2&api_key={SECRET}",
+            secret_params=["api_key"],
+        )
+        self.assertEqual(
+            entry["url"],
+            f"https://example.com/items?page=2&api_key={REDACTED}",
+        )
+        self.assertEqual(self.history.search(SECRET), [])
+        with open(self.path, "rb") as database:
+            self.assertNotIn(SECRET.encode(), database.read())
+
+    def test_api_key_in_the_query_is_not_stored(self) -> None:
+        with Server() as server:
+            transport = Transport()
+            resolve_requests = ResolveRequests(
+                server.url("/items", Reply(b"[]")),
+                transport.request_session(),
+                authorization=[
+                    "Api Key",
+                    {"Api Key": ["api_key", SECRET, "Query Parameters"]},
+                ],
+            )
+            resolve_requests.resolve_get()
+            transport.close()
+
+        entry = self.record(
+            {},
+            url=resolve_requests.prepared.url,
+            secret_params=resolve_requests.secret_params,
+        )
+        self.assertTrue(entry["url"].endswith(f"/items?api_key={REDACTED}"))
+        self.assertEqual(self.history.search(SECRET), [])
+
+    def test_failed_write_keeps_the_writer_going(self) -> None:
+        # sqlite can't store a dict, so this record fails on insert
+        self.history.record(
+            "POST", "https://example.com/bad", {}, {}, "200 Ok", {}, {}, "", ""
+        )
+        with contextlib.redirect_stderr(io.StringIO()) as errors:
+            entry = self.record({"Accept": "application/json"})
+        self.assertIn("https://example.com/bad", errors.getvalue())
+        self.assertEqual(entry["url"], "https://example.com/items")
+        self.assertEqual(len(self.history.search("")), 1)
+
+
+class RedactUrlTest(unittest.TestCase):
+    def test_only_secret_values_are_replaced(self) -> None:
+        self.assertEqual(
+            redact_url(
+                "https://example.com/?api%5Fkey=1&key=2&flag&q=a+b#top",
+                ["api_key"],
+            ),
+            f"https://example.com/?api%5Fkey={REDACTED}&key=2&flag&q=a+b#top",
+        )
+
+    def test_nothing_secret(self) -> None:
+        url = "https://example.com/?api_key=1"
+        self.assertEqual(redact_url(url), url)
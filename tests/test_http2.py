@@ -0,0 +1,69 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+from escambo import http2
+from escambo.restapi import ResolveRequests
+from escambo.transport import Transport
+
+from tests.server import Http2Server
+
+BODY = b'{"escambo": "exchange or barter"}'
+
+
+@unittest.skipUnless(http2.available(), "needs the httpx and h2 modules")
+@unittest.skipUnless(shutil.which("openssl"), "needs openssl")
+class Http2AdapterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.server = Http2Server(self.directory.name, BODY).__enter__()
+        self.transport = Transport(http2=True)
+
+    def tearDown(self) -> None:
+        self.transport.close()
+        self.server.__exit__()
+        self.directory.cleanup()
+
+    def send(self) -> ResolveRequests:
+        resolve_requests = ResolveRequests(
+            self.server.url("/"), self.transport.request_session()
+        )
+        self.body, self.status, _code_type = resolve_requests.resolve_get()
+        return resolve_requests
+
+    def test_sends_over_http2(self) -> None:
+        environment = {"REQUESTS_CA_BUNDLE": self.server.cert}
+        with mock.patch.dict(os.environ, environment):
+            first = self.send()
+            self.assertEqual(self.status, "200 Ok")
+            self.assertIn('"exchange or barter"', self.body)
+            second = self.send()
+
+        self.assertEqual(first.timings.protocol, "HTTP/2")
+        self.assertTrue(first.timings.new_connection)
+        self.assertFalse(second.timings.new_connection)
+        self.assertEqual(self.server.protocols, ["h2"])
+
+    def test_verifies_the_certificate(self) -> None:
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.send()
+
+    def test_sends_without_verifying(self) -> None:
+        adapter = self.transport.session.get_adapter(self.server.url("/"))
+        request = requests.Request("GET", self.server.url("/")).prepare()
+        response = adapter.send(request, timeout=5, verify=False)
+        self.assertEqual(response.content, BODY)
+
+    def test_pool_size_change_keeps_streams_open(self) -> None:
+        url = self.server.url("/")
+        request = requests.Request("GET", url).prepare()
+        adapter = self.transport.session.get_adapter(url)
+        response = adapter.send(request, timeout=5, verify=self.server.cert)
+        self.transport.set_pool_size(3)
+        self.assertEqual(response.content, BODY)
@@ -0,0 +1,56 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import threading
+import unittest
+
+import requests
+from escambo.response_body import ResponseBody
+from escambo.restapi import ResolveRequests
+from escambo.transport import Transport
+
+from tests.server import Reply, Server
+
+EVENTS = b"data: one\n\ndata: two\n\n" * 100
+SSE = {"Content-Type": "text/event-stream"}
+
+
+class StreamTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = Server().__enter__()
+        self.transport = Transport()
+
+    def tearDown(self) -> None:
+        self.transport.close()
+        self.server.__exit__()
+
+    def stalled(self, headers: dict) -> tuple:
+        url = self.server.url(
+            "/stream",
+            Reply(EVENTS, headers=headers, stall_after=30, stall=2),
+        )
+        resolve_requests = ResolveRequests(
+            url, self.transport.request_session(), timeout=(5, 0.3)
+        )
+        return resolve_requests, resolve_requests.request("get")
+
+    def test_events_read_timeout_is_a_requests_error(self) -> None:
+        resolve_requests, response = self.stalled(SSE)
+        events = []
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            for batch in resolve_requests.iter_events(
+                response, threading.Event(), "sse"
+            ):
+                events += batch
+        self.assertEqual([each.data for each in events], ["one", "two"])
+
+    def test_response_read_timeout_is_a_requests_error(self) -> None:
+        resolve_requests, response = self.stalled({})
+        body = ResponseBody(1024 * 1024, "utf-8")
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            for _chunk in resolve_requests.iter_response(
+                response, threading.Event(), body
+            ):
+                pass
+        # Timings are filled in however the body ended
+        self.assertGreater(resolve_requests.timings.download, 0)
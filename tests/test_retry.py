@@ -0,0 +1,45 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import threading
+import time
+import unittest
+
+from escambo.cancellation import Cancellation, Cancelled
+from escambo.retry import RetryPolicy
+from requests.structures import CaseInsensitiveDict
+
+
+class Answer:
+    def __init__(self, status_code: int, headers: dict = None) -> None:
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+
+    def close(self) -> None:
+        pass
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_retries_until_answered(self) -> None:
+        answers = iter([Answer(503), Answer(503), Answer(200)])
+        response, attempts = RetryPolicy(3, backoff=0.01).run(
+            lambda: next(answers), (ConnectionError,), "example.com"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [each.outcome for each in attempts], ["503", "503", "200"]
+        )
+
+    def test_cancel_ends_the_backoff(self) -> None:
+        def send() -> Answer:
+            # Ask for the longest wait there is
+            return Answer(503, {"Retry-After": "3600"})
+
+        cancellation = Cancellation()
+        threading.Timer(0.2, cancellation.cancel).start()
+        started = time.perf_counter()
+        with self.assertRaises(Cancelled):
+            RetryPolicy(3).run(
+                send, (ConnectionError,), "example.com", cancellation
+            )
+        self.assertLess(time.perf_counter() - started, 5)
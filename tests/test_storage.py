@@ -0,0 +1,54 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from escambo.storage import HEADERS, OverrideStore, WriteBehindStore
+
+
+class WriteBehindStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = WriteBehindStore(
+            os.path.join(self.directory.name, "overrides.db")
+        )
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_load_sees_pending_writes(self) -> None:
+        self.store.put(HEADERS, "Accept", ["application/json", True])
+        self.store.delete(HEADERS, "Accept")
+        self.store.put(HEADERS, "Accept", ["text/html", True])
+        self.assertEqual(
+            self.store.load(HEADERS), {"Accept": ["text/html", True]}
+        )
+
+    def test_flushes_commit_in_order(self) -> None:
+        write = OverrideStore.write
+        slow = threading.Event()
+
+        def slow_write(store, records, deletions) -> None:
+            if slow.is_set():
+                slow.clear()
+                # Give the second flush time to overtake this one
+                time.sleep(0.3)
+            write(store, records, deletions)
+
+        with mock.patch.object(OverrideStore, "write", slow_write):
+            self.store.put(HEADERS, "Accept", ["old", True])
+            slow.set()
+            first = threading.Thread(target=self.store.flush)
+            first.start()
+            time.sleep(0.1)
+            self.store.put(HEADERS, "Accept", ["new", True])
+            self.store.flush()
+            first.join()
+
+        self.assertEqual(self.store.load(HEADERS), {"Accept": ["new", True]})
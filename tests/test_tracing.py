@@ -0,0 +1,42 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from escambo.tracing import ChromeTraceExporter, Span
+
+
+class ChromeTraceExporterTest(unittest.TestCase):
+    def test_concurrent_flushes(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            exporter = ChromeTraceExporter(path, 0)
+            for index in range(200):
+                span = Span(None, f"span {index}", {"index": index})
+                span.thread = threading.get_ident()
+                exporter(span)
+
+            errors = []
+
+            def flush() -> None:
+                try:
+                    for _each in range(20):
+                        exporter.flush()
+                except OSError as error:
+                    errors.append(error)
+
+            workers = [threading.Thread(target=flush) for _each in range(8)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+            self.assertEqual(errors, [])
+            with open(path, encoding="utf-8") as trace_file:
+                events = json.load(trace_file)["traceEvents"]
+            self.assertEqual(len(events), 201)
+            self.assertEqual(os.listdir(directory), ["trace.json"])
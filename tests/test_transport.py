@@ -0,0 +1,106 @@
+# Copyright 2023 Cleo Menezes Jr.
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import unittest
+from unittest import mock
+
+import requests
+from escambo.cancellation import Cancellation
+from escambo.restapi import ResolveRequests
+from escambo.transport import DnsCache, Transport
+
+from tests.server import Reply, Server
+
+
+class PreconnectTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = Server().__enter__()
+        self.transport = Transport()
+        self.url = self.server.url("/", Reply(b"{}"))
+
+    def tearDown(self) -> None:
+        self.transport.close()
+        self.server.__exit__()
+
+    def send(self) -> ResolveRequests:
+        resolve_requests = ResolveRequests(
+            self.url, self.transport.request_session()
+        )
+        resolve_requests.resolve_get()
+        return resolve_requests
+
+    def test_send_reuses_the_preconnected_socket(self) -> None:
+        self.transport.preconnect(self.url)
+        self.assertFalse(self.send().timings.new_connection)
+
+    def test_dns_only(self) -> None:
+        self.transport.preconnect(self.url, connect=False)
+        self.assertTrue(self.send().timings.new_connection)
+
+
+class DnsCacheTest(unittest.TestCase):
+    def test_hits_within_ttl(self) -> None:
+        cache = DnsCache(ttl=60)
+        for _each in range(3):
+            cache.resolve("localhost", 80, 0)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_no_ttl_no_cache(self) -> None:
+        cache = DnsCache(ttl=0)
+        for _each in range(3):
+            cache.resolve("localhost", 80, 0)
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+
+class PoolSizeTest(unittest.TestCase):
+    def test_adapter_in_use_is_closed_once_released(self) -> None:
+        transport = Transport()
+        adapter = transport.session.get_adapter("http://example.com")
+        with mock.patch.object(adapter, "close") as close:
+            adapter.acquire()
+            transport.set_pool_size(5)
+            close.assert_not_called()
+            self.assertIsNot(
+                transport.session.get_adapter("http://example.com"), adapter
+            )
+            adapter.release()
+            close.assert_called_once()
+        transport.close()
+
+    def test_idle_adapter_is_closed_at_once(self) -> None:
+        transport = Transport()
+        adapter = transport.session.get_adapter("http://example.com")
+        with mock.patch.object(adapter, "close") as close:
+            transport.set_pool_size(5)
+            close.assert_called_once()
+        transport.close()
+
+
+class CancellationTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = Server().__enter__()
+        self.transport = Transport()
+
+    def tearDown(self) -> None:
+        self.transport.close()
+        self.server.__exit__()
+
+    def send(self, url: str, cancellation: Cancellation):
+        request = requests.Request("GET", url).prepare()
+        request.cancellation = cancellation
+        adapter = self.transport.session.get_adapter(url)
+        return adapter.send(request, stream=True, timeout=5)
+
+    def test_closed_response_leaves_its_connection(self) -> None:
+        first = Cancellation()
+        response = self.send(self.server.url("/", Reply(b"{}")), first)
+        response.content
+        response.close()
+
+        # The same pooled connection, now serving another send
+        body = b"x" * 1000
+        url = self.server.url("/slow", Reply(body, stall_after=10, stall=0.3))
+        response = self.send(url, Cancellation())
+        first.cancel()
+        self.assertEqual(response.content, body)
+        self.assertFalse(response.timings.new_connection)